@@ -8,7 +8,23 @@ RESOURCE_DIR = BASE_DIR / "src" / "resources"
 
 # Database
 DATABASE = {
-    "path": DATA_DIR / "workspace.db"
+    "path": DATA_DIR / "workspace.db",
+    # 连接参数，未列出的使用 connection_manager.DEFAULT_PRAGMAS
+    "pragmas": {
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "read_pool_size": 4
+}
+
+# 在线备份，保存在 DATA_DIR/backups 中
+BACKUP = {
+    "directory": DATA_DIR / "backups",
+    "interval_hours": 24,
+    "keep": 7,
+    "pages_per_step": 256,
 }
 
 # Window settings
@@ -6,7 +6,9 @@ import tkinter as tk
 from tkinter import messagebox
 from PIL import Image, ImageDraw
 import PIL.ImageTk  # 改用这种方式导入
+from config import DATABASE, BACKUP
 from src.models.database import Database
+from src.models.backup import BackupScheduler
 from src.views.main_window import MainWindow
 
 def setup_logging():
@@ -37,11 +39,29 @@ def main():
         ensure_data_directory()
 
         # Initialize database
-        db = Database()
+        db = Database(pragmas=DATABASE["pragmas"],
+                      read_pool_size=DATABASE["read_pool_size"])
+
+        # 后台定时备份
+        backups = BackupScheduler(db, BACKUP["directory"],
+                                  interval=BACKUP["interval_hours"] * 3600,
+                                  keep=BACKUP["keep"],
+                                  pages=BACKUP["pages_per_step"])
+        backups.start()
 
         # Create and run main window
-        app = MainWindow(db)
+        app = MainWindow(db, backups=backups)
         
+        def shutdown(code=0):
+            """停止后台备份，等待写队列中剩余的写操作提交后退出进程"""
+            try:
+                backups.stop()
+                db.close()
+            except Exception as e:
+                logger.error(f"Error closing database: {e}")
+                code = code or 1
+            os._exit(code)
+
         def on_closing():
             """处理窗口关闭事件"""
             try:
@@ -55,10 +75,10 @@ def main():
                     logger.info("User confirmed exit")
                     app.quit()
                     app.destroy()
-                    os._exit(0)  # 使用 os._exit() 替代 sys.exit()
+                    shutdown(0)  # 使用 os._exit() 替代 sys.exit()
             except Exception as e:
                 logger.error(f"Error in on_closing: {e}")
-                os._exit(1)
+                shutdown(1)
 
         def quit_app(icon=None):
             """处理系统托盘的退出事件"""
@@ -81,7 +101,7 @@ def main():
                     
                     if response:
                         logger.info("User confirmed exit from tray")
-                        app.after(100, lambda: os._exit(0))  # 延迟退出以确保对话框关闭
+                        app.after(100, shutdown)  # 延迟退出以确保对话框关闭
                     else:
                         # 如果用户取消退出，恢复系统托盘
                         if icon:
@@ -92,11 +112,11 @@ def main():
                 if app.winfo_exists():
                     app.after(0, show_confirm_dialog)
                 else:
-                    os._exit(0)
+                    shutdown(0)
                 
             except Exception as e:
                 logger.error(f"Error in quit_app: {e}")
-                os._exit(1)
+                shutdown(1)
 
         def restore_window(icon):
             """从系统托盘恢复窗口"""
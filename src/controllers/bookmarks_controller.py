@@ -2,7 +2,12 @@ import logging
 import webbrowser
 import os
 import subprocess
+import threading
 from ..models.bookmarks_model import BookmarksModel
+from ..models.bookmark_import import (
+    IMPORT_CHUNK_SIZE, ImportJob, ImportProgress, SourceFile,
+    detect_browser, detect_format, iter_chunks, read_bookmarks,
+)
 
 class BookmarksController:
     def __init__(self, db):
@@ -52,29 +57,25 @@ class BookmarksController:
             self.logger.error(f"Error getting categories: {e}")
             raise
 
-    def add_category(self, name):
+    # 写操作交给后台写线程执行并返回 Future，on_done / on_error 在界面线程中回调
+
+    def add_category(self, name, on_done=None, on_error=None):
         """添加新分类"""
-        try:
-            return self.model.add_category(name)
-        except Exception as e:
-            self.logger.error(f"Error adding category: {e}")
-            raise
+        return self.db.writes.submit(
+            self.model.add_category, name,
+            on_done=on_done, on_error=on_error, description="adding category")
 
-    def update_category(self, category_id, name):
+    def update_category(self, category_id, name, on_done=None, on_error=None):
         """更新分类"""
-        try:
-            return self.model.update_category(category_id, name)
-        except Exception as e:
-            self.logger.error(f"Error updating category: {e}")
-            raise
+        return self.db.writes.submit(
+            self.model.update_category, category_id, name,
+            on_done=on_done, on_error=on_error, description="updating category")
 
-    def delete_category(self, category_id):
+    def delete_category(self, category_id, on_done=None, on_error=None):
         """删除分类"""
-        try:
-            return self.model.delete_category(category_id)
-        except Exception as e:
-            self.logger.error(f"Error deleting category: {e}")
-            raise
+        return self.db.writes.submit(
+            self.model.delete_category, category_id,
+            on_done=on_done, on_error=on_error, description="deleting category")
 
     def get_bookmarks(self, category_id=None):
         """获取书签"""
@@ -84,29 +85,41 @@ class BookmarksController:
             self.logger.error(f"Error getting bookmarks: {e}")
             raise
 
-    def add_bookmark(self, category_id, name, url, browser):
-        """添加书签"""
+    def get_bookmarks_page(self, category_id=None, token=None):
+        """获取一页书签，返回 Page"""
         try:
-            return self.model.add_bookmark(category_id, name, url, browser)
+            return self.model.get_bookmarks_page(category_id, token)
         except Exception as e:
-            self.logger.error(f"Error adding bookmark: {e}")
+            self.logger.error(f"Error getting bookmarks: {e}")
             raise
 
-    def update_bookmark(self, bookmark_id, name, url, browser):
+    def fetch_bookmarks(self, category_id=None, token=None, on_done=None, on_error=None):
+        """在后台读线程中获取一页书签，回调 Page；切换分类时旧请求的结果被丢弃
+
+        token 为上一页的 next_token，为 None 时从第一页开始。
+        """
+        return self.db.reads.submit(
+            self.model.get_bookmarks_page, category_id, token,
+            on_done=on_done, on_error=on_error,
+            key='bookmarks', description=f"getting bookmarks for category {category_id}")
+
+    def add_bookmark(self, category_id, name, url, browser, on_done=None, on_error=None):
+        """添加书签"""
+        return self.db.writes.submit(
+            self.model.add_bookmark, category_id, name, url, browser,
+            on_done=on_done, on_error=on_error, description="adding bookmark")
+
+    def update_bookmark(self, bookmark_id, name, url, browser, on_done=None, on_error=None):
         """更新书签"""
-        try:
-            return self.model.update_bookmark(bookmark_id, name, url, browser)
-        except Exception as e:
-            self.logger.error(f"Error updating bookmark: {e}")
-            raise
+        return self.db.writes.submit(
+            self.model.update_bookmark, bookmark_id, name, url, browser,
+            on_done=on_done, on_error=on_error, description="updating bookmark")
 
-    def delete_bookmark(self, bookmark_id):
+    def delete_bookmark(self, bookmark_id, on_done=None, on_error=None):
         """删除书签"""
-        try:
-            return self.model.delete_bookmark(bookmark_id)
-        except Exception as e:
-            self.logger.error(f"Error deleting bookmark: {e}")
-            raise
+        return self.db.writes.submit(
+            self.model.delete_bookmark, bookmark_id,
+            on_done=on_done, on_error=on_error, description="deleting bookmark")
 
     def open_bookmark(self, url, browser):
         """打开书签"""
@@ -165,29 +178,101 @@ class BookmarksController:
             raise
 
     def import_bookmarks(self, bookmarks_data):
+        """批量导入书签（由写线程在一个事务中执行并等待完成），返回 (导入数量, 跳过数量)"""
+        return self.db.writes.call(self._import_bookmarks, bookmarks_data)
+
+    def import_bookmarks_file(self, path, on_progress=None, on_done=None, on_error=None,
+                              chunk_size=IMPORT_CHUNK_SIZE):
+        """在后台线程中流式导入书签文件，返回 ImportJob
+
+        支持书签 CSV、浏览器导出的书签 HTML 和 Chromium 的 Bookmarks JSON，
+        按文件名判断格式；路径中有名为 Edge 的目录时书签使用 Edge 打开
+        （按完整的路径组成部分比较，见 detect_browser）。文件逐条解析，
+        每 chunk_size 条交给写线程作为一个事务提交，内存占用与文件大小无关。
+        on_progress / on_done 收到 ImportProgress，回调都在界面线程中执行；
+        取消后已提交的部分保留。
+        """
+        job = ImportJob()
+        thread = threading.Thread(
+            target=self._run_import,
+            args=(job, path, chunk_size, on_progress, on_done, on_error),
+            name="bookmark-import", daemon=True)
+        thread.start()
+        return job
+
+    def _run_import(self, job, path, chunk_size, on_progress, on_done, on_error):
+        """导入线程：解析、分块写入并报告进度"""
+        rows = imported = skipped = invalid = 0
+        fraction = 0.0
+        try:
+            category_ids = {category.name: category.id
+                            for category in self.model.get_categories()}
+            fmt = detect_format(path)
+            browser = detect_browser(path)
+            with SourceFile(path) as source:
+                bookmarks_iter = read_bookmarks(source.text, fmt, browser)
+                for chunk in iter_chunks(bookmarks_iter, chunk_size):
+                    if job.cancelled:
+                        break
+                    bookmarks = [bookmark for bookmark in chunk if bookmark]
+                    rows += len(chunk)
+                    invalid += len(chunk) - len(bookmarks)
+                    if bookmarks:
+                        added, dup = self.db.writes.call(
+                            self._import_bookmarks, bookmarks, category_ids)
+                        imported += added
+                        skipped += dup
+                    fraction = source.fraction
+                    if on_progress is not None:
+                        self.db.writes.notify(on_progress, ImportProgress(
+                            fraction, rows, imported, skipped, invalid, False))
+                else:
+                    fraction = 1.0
+            result = ImportProgress(fraction, rows, imported, skipped, invalid, job.cancelled)
+            self.logger.info(f"Bookmark import from {path} finished: {result}")
+        except Exception as e:
+            self.logger.error(f"Error importing bookmarks from {path}: {e}")
+            job.future.set_exception(e)
+            if on_error is not None:
+                self.db.writes.notify(on_error, e)
+            return
+        job.future.set_result(result)
+        if on_done is not None:
+            self.db.writes.notify(on_done, result)
+
+    def _import_bookmarks(self, bookmarks_data, category_ids=None):
         """批量导入书签
         Args:
             bookmarks_data: 包含书签信息的列表，每个元素应该是一个字典，包含：
-                          category_id, name, url, browser
+                          category（分类名称，不存在时自动创建）或 category_id,
+                          name, url, browser，以及可选的 username
+            category_ids: 分类名称到 ID 的映射，跨多次调用复用；
+                          事务提交后才加入新建的分类
         Returns:
-            导入成功的书签数量
+            (导入成功的书签数量, 因重复而跳过的数量)
         """
         try:
-            success_count = 0
-            for bookmark in bookmarks_data:
-                try:
-                    self.model.add_bookmark(
-                        category_id=bookmark['category_id'],
-                        name=bookmark['name'],
-                        url=bookmark['url'],
-                        browser=bookmark['browser']
-                    )
-                    success_count += 1
-                except Exception as e:
-                    self.logger.error(f"Error importing bookmark {bookmark}: {e}")
-                    continue
-            
-            return success_count
+            known = category_ids if category_ids is not None else {}
+            created = {}
+            rows = []
+            with self.db.transaction("import bookmarks") as stats:
+                for bookmark in bookmarks_data:
+                    category_id = bookmark.get('category_id')
+                    if category_id is None:
+                        name = bookmark['category']
+                        category_id = known.get(name) or created.get(name)
+                        if category_id is None:
+                            category_id = (self.model.find_category(name)
+                                           or self.model.add_category(name))
+                            created[name] = category_id
+                    rows.append({**bookmark, 'category_id': category_id})
+                success_count, skipped_count = self.model.batch_add_bookmarks(rows)
+            known.update(created)
+            self.logger.debug(
+                f"Imported {success_count} bookmarks ({skipped_count} skipped): "
+                f"{stats.statements} statements in {stats.elapsed_ms:.1f} ms"
+            )
+            return success_count, skipped_count
         except Exception as e:
             self.logger.error(f"Error in batch import: {e}")
             raise
\ No newline at end of file
@@ -17,31 +17,34 @@ class FilesController:
             self.logger.error(f"Error getting files: {e}")
             raise
 
-    def add_file(self, file_path):
+    def fetch_files(self, on_done=None, on_error=None):
+        """在后台读线程中获取文件快捷方式，返回 Future；较新的请求会替代旧请求"""
+        return self.db.reads.submit(
+            self.model.get_files,
+            on_done=on_done, on_error=on_error, key='files', description="getting files")
+
+    # 写操作交给后台写线程执行并返回 Future，on_done / on_error 在界面线程中回调
+
+    def add_file(self, file_path, on_done=None, on_error=None):
         """添加文件快捷方式"""
-        try:
-            file_name = os.path.splitext(os.path.basename(file_path))[0]
-            return self.model.add_file(file_name, file_path)
-        except Exception as e:
-            self.logger.error(f"Error adding file '{file_path}': {e}")
-            raise
+        file_name = os.path.splitext(os.path.basename(file_path))[0]
+        return self.db.writes.submit(
+            self.model.add_file, file_name, file_path,
+            on_done=on_done, on_error=on_error, description=f"adding file '{file_path}'")
 
-    def update_file(self, file_id, new_path):
+    def update_file(self, file_id, new_path, on_done=None, on_error=None):
         """更新文件路径"""
-        try:
-            file_name = os.path.splitext(os.path.basename(new_path))[0]
-            return self.model.update_file(file_id, file_name, new_path)
-        except Exception as e:
-            self.logger.error(f"Error updating file ID '{file_id}' to '{new_path}': {e}")
-            raise
+        file_name = os.path.splitext(os.path.basename(new_path))[0]
+        return self.db.writes.submit(
+            self.model.update_file, file_id, file_name, new_path,
+            on_done=on_done, on_error=on_error,
+            description=f"updating file ID '{file_id}' to '{new_path}'")
 
-    def delete_file(self, file_id):
+    def delete_file(self, file_id, on_done=None, on_error=None):
         """删除文件快捷方式"""
-        try:
-            return self.model.delete_file(file_id)
-        except Exception as e:
-            self.logger.error(f"Error deleting file ID '{file_id}': {e}")
-            raise
+        return self.db.writes.submit(
+            self.model.delete_file, file_id,
+            on_done=on_done, on_error=on_error, description=f"deleting file ID '{file_id}'")
 
     def open_file(self, file_path):
         """打开文件"""
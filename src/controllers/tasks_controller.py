@@ -1,33 +1,26 @@
 import logging
+import sqlite3
 import os
-from datetime import datetime, timedelta
-from ..models.tasks_model import TasksModel
+from concurrent.futures import Future
+from datetime import timedelta
+from ..models.tasks_model import TasksModel, ARCHIVE_BATCH_SIZE
+from ..models.work_calendar import WorkCalendar
+from ..models.holidays_model import HolidaysModel
+from ..models.statutory_holidays import get_statutory_holidays, has_statutory_holidays
+from ..models.lunar_dates import get_lunar_month
 
 class TasksController:
     def __init__(self, db):
         self.db = db
         self.model = TasksModel(db)
+        self.calendar = WorkCalendar.for_db(db)
+        self.holidays = HolidaysModel.for_db(db)
         self.logger = logging.getLogger(__name__)
 
     def is_holiday(self, date):
         """检查日期是否为节假日（包括周末）"""
         try:
-            cursor = self.db.conn.cursor()
-            
-            # 首先检查是否在节假日表中
-            cursor.execute('''
-                SELECT is_workday 
-                FROM holidays 
-                WHERE date = ?
-            ''', (date.strftime('%Y-%m-%d'),))
-            
-            result = cursor.fetchone()
-            if result:
-                return not result['is_workday']  # 如果是工作日返回False，否则返回True
-            
-            # 如果不在节假日表中，检查是否为周末
-            return date.weekday() >= 5  # 5是周六，6是周日
-            
+            return self.calendar.is_holiday(date)
         except Exception as e:
             self.logger.error(f"Error checking holiday: {e}")
             return False
@@ -35,14 +28,7 @@ class TasksController:
     def get_last_workday_before(self, target_date):
         """获取指定日期前的最后一个工作日"""
         try:
-            current_date = target_date - timedelta(days=1)  # 从前一天开始检查
-            
-            # 继续向前查找，直到找到工作日
-            while self.is_holiday(current_date):
-                current_date -= timedelta(days=1)
-            
-            return current_date
-            
+            return self.calendar.nth_workday_before(target_date, 1)
         except Exception as e:
             self.logger.error(f"Error getting last workday: {e}")
             return target_date - timedelta(days=1)  # 返回前一天作为默认值
@@ -55,7 +41,21 @@ class TasksController:
             self.logger.error(f"Error getting tasks: {e}")
             raise
 
-    def add_task(self, name, due_date, file_path=None, importance='普通'):
+    def fetch_tasks(self, include_completed=False, token=None, on_done=None, on_error=None):
+        """在后台读线程中获取一页任务，回调 Page；较新的同类请求会替代未完成的旧请求
+
+        token 为上一页的 next_token，为 None 时从第一页开始。
+        """
+        return self.db.reads.submit(
+            self.model.get_tasks_page, include_completed, token,
+            on_done=on_done, on_error=on_error,
+            key=('tasks', include_completed), description="getting tasks")
+
+    # 写操作都交给后台写线程执行，返回 Future；
+    # on_done(结果) / on_error(异常) 在界面线程中回调
+
+    def add_task(self, name, due_date, file_path=None, importance='普通',
+                 on_done=None, on_error=None):
         """添加任务"""
         try:
             # 如果提供了文件路径，使用文件名作为任务名
@@ -64,12 +64,14 @@ class TasksController:
             elif not name:
                 raise ValueError("Task name cannot be empty")
                 
-            return self.model.add_task(name, due_date, file_path, importance)
+            return self.db.writes.submit(
+                self.model.add_task, name, due_date, file_path, importance,
+                on_done=on_done, on_error=on_error, description="adding task")
         except Exception as e:
             self.logger.error(f"Error adding task: {e}")
             raise
 
-    def update_task(self, task_id, name, due_date, importance):
+    def update_task(self, task_id, name, due_date, importance, on_done=None, on_error=None):
         """更新任务信息"""
         try:
             # 验证重要程度是否为有效值
@@ -78,105 +80,65 @@ class TasksController:
                 raise ValueError(f"Invalid importance value. Must be one of: {', '.join(valid_importance)}")
                 
             # 调用模型更新任务
-            return self.model.update_task(task_id, name, due_date, importance)
+            return self.db.writes.submit(
+                self.model.update_task, task_id, name, due_date, importance,
+                on_done=on_done, on_error=on_error, description=f"updating task {task_id}")
         except Exception as e:
             self.logger.error(f"Error updating task {task_id}: {e}")
             raise
 
-    def complete_task(self, task_id):
+    def complete_task(self, task_id, on_done=None, on_error=None):
         """完成任务"""
-        try:
-            return self.model.complete_task(task_id)
-        except Exception as e:
-            self.logger.error(f"Error completing task: {e}")
-            raise
+        return self.db.writes.submit(
+            self.model.complete_task, task_id,
+            on_done=on_done, on_error=on_error, description="completing task")
+
+    def cleanup_completed_tasks(self, on_done=None, on_error=None):
+        """把已完成超过5个工作日的任务分批移入归档表
+
+        每批是写队列中的一个独立命令，批与批之间其他写操作可以插入执行。
+        返回 Future，完成后回调移动的任务总数。
+        """
+        future = Future()
+        cutoff = self.model.archive_cutoff()
+        moved = [0]
+
+        def next_batch(count=None):
+            if count is not None:
+                moved[0] += count
+                if count < ARCHIVE_BATCH_SIZE:
+                    if moved[0]:
+                        self.logger.info(f"Archived {moved[0]} completed tasks")
+                    future.set_result(moved[0])
+                    if on_done is not None:
+                        on_done(moved[0])
+                    return
+            self.db.writes.submit(
+                self.model.archive_completed_tasks, cutoff, ARCHIVE_BATCH_SIZE,
+                on_done=next_batch, on_error=failed, description="archiving tasks")
 
-    def cleanup_completed_tasks(self):
-        """清理已完成任务"""
+        def failed(e):
+            future.set_exception(e)
+            if on_error is not None:
+                on_error(e)
+
+        next_batch()
+        return future
+
+    def get_due_buckets(self, today=None):
+        """从数据库直接获取到期提醒分类"""
         try:
-            return self.model.cleanup_completed_tasks()
+            return self.model.get_due_buckets(today)
         except Exception as e:
-            self.logger.error(f"Error cleaning up tasks: {e}")
+            self.logger.error(f"Error getting due buckets: {e}")
             raise
 
-    def check_due_date(self, due_date_str, task=None):
-        """检查任务到期情况，返回是否需要提醒和提醒消息"""
-        try:
-            due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
-            today = datetime.now().date()
-            
-            self.logger.info(f"\n=== 检查任务到期状态 ===")
-            self.logger.info(f"到期日期: {due_date_str}")
-            
-            if task:
-                task_dict = dict(task)
-                self.logger.info(f"任务名称: {task_dict.get('name')}")
-                self.logger.info(f"重要程度: {task_dict.get('importance')}")
-                
-                # 如果是紧急任务
-                if task_dict.get('importance') == '紧急':
-                    # 检查截止日期是否为节假日或节假日后的第一个工作日
-                    is_holiday_period = False
-                    
-                    # 检查截止日期是否为节假日
-                    if self.is_holiday(due_date):
-                        is_holiday_period = True
-                    else:
-                        # 检查前一天是否为节假日（即是否为节假日后的第一个工作日）
-                        prev_day = due_date - timedelta(days=1)
-                        if self.is_holiday(prev_day):
-                            is_holiday_period = True
-                    
-                    if is_holiday_period:
-                        # 获取节假日前的最后两个工作日
-                        last_workday = self.get_last_workday_before(due_date)
-                        second_last_workday = self.get_last_workday_before(last_workday)
-                        
-                        self.logger.info(f"是否节假日期间: {is_holiday_period}")
-                        self.logger.info(f"最后工作日: {last_workday}")
-                        self.logger.info(f"倒数第二个工作日: {second_last_workday}")
-                        self.logger.info(f"今天: {today}")
-                        
-                        if today <= second_last_workday:
-                            return True, "需要今天完成"
-                        elif today == last_workday:
-                            return True, "需要今天完成"
-                    
-                    # 对于非节假日期间的紧急任务
-                    days_left = (due_date - today).days
-                    if days_left <= 2:
-                        if days_left == 0:
-                            return True, "今天到期"
-                        elif days_left == 1:
-                            return True, "明天到期"
-                        else:
-                            return True, "后天到期"
-            
-            # 如果已经过期
-            if due_date < today:
-                return True, "已过期"
-                
-            # 计算剩余天数
-            days_left = (due_date - today).days
-            
-            # 如果是今天到期
-            if days_left == 0:
-                return True, "今天到期"
-                
-            # 如果是明天到期
-            if days_left == 1:
-                return True, "明天到期"
-                
-            # 如果是后天到期
-            if days_left == 2:
-                if not self.is_holiday(due_date):
-                    return True, "后天到期"
-            
-            return False, ""
-                
-        except Exception as e:
-            self.logger.error(f"Error checking due date: {e}")
-            return False, ""
+    def fetch_due_buckets(self, on_done=None, on_error=None, today=None):
+        """在后台读线程中获取到期提醒分类（可能需要等待工作日历表扩展），回调分类字典"""
+        return self.db.reads.submit(
+            self.model.get_due_buckets, today,
+            on_done=on_done, on_error=on_error,
+            key='due buckets', description="getting due buckets")
 
     def get_today_new_tasks_count(self):
         """获取今日新增的未完成任务数"""
@@ -194,115 +156,43 @@ class TasksController:
             self.logger.error(f"Error getting pending tasks count: {e}")
             raise
 
-    def restore_task(self, task_id):
+    def restore_task(self, task_id, on_done=None, on_error=None):
         """恢复任务到未完成状态"""
-        try:
-            return self.model.restore_task(task_id)
-        except Exception as e:
-            self.logger.error(f"Error restoring task: {e}")
-            raise
+        return self.db.writes.submit(
+            self.model.restore_task, task_id,
+            on_done=on_done, on_error=on_error, description="restoring task")
 
-    def test_due_dates(self):
-        """测试截止日期检查功能"""
-        test_cases = [
-            # 格式：(截止日期, 今天的日期, 预期结果)
-            ('2024-10-01', '2024-09-29', True),   # 国庆节前两个工作日
-            ('2024-10-01', '2024-09-28', False),  # 国庆节前三天（周六）
-            ('2024-10-01', '2024-09-27', True),   # 国庆节前最后一个工作日
-            ('2024-05-01', '2024-04-29', True),   # 劳动节前两个工作日
-            ('2024-05-04', '2024-05-02', True),   # 劳动节后第一个工作日
-            ('2024-01-01', '2023-12-29', True),   # 元旦前最后一个工作日
-            ('2024-03-15', '2024-03-14', True),   # 普通工作日
-            ('2024-03-16', '2024-03-14', False),  # 普通周末
-        ]
-
-        results = []
-        for due_date, today, expected in test_cases:
-            # 模拟当前日期
-            current_date = datetime.strptime(today, '%Y-%m-%d').date()
-            # 检查结果
-            actual = self.is_due_soon(due_date)
-            results.append({
-                'due_date': due_date,
-                'today': today,
-                'expected': expected,
-                'actual': actual,
-                'passed': expected == actual
-            })
-
-        return results
-
-    # 添加一个运行测试的方法
-    def run_due_date_tests(self):
-        """运行截止日期测试并显示结果"""
-        results = self.test_due_dates()
-        print("\n截止日期检查测试结果:")
-        print("-" * 60)
-        print(f"{'截止日期':<12} {'今天':<12} {'预期':<8} {'实际':<8} {'结果':<8}")
-        print("-" * 60)
-        for r in results:
-            print(f"{r['due_date']:<12} {r['today']:<12} {str(r['expected']):<8} "
-                  f"{str(r['actual']):<8} {'通过' if r['passed'] else '失败':<8}")
-        print("-" * 60)
-
-    def repair_tasks_data(self):
+    def repair_tasks_data(self, on_done=None, on_error=None):
         """修复任务数据"""
-        try:
-            # 获取所有任务
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                SELECT id, name, file_path, due_date, status, completed_at 
-                FROM pending_tasks
-            ''')
-            all_tasks = cursor.fetchall()
-            
-            # 修复每个任务的状态
-            for task in all_tasks:
-                # 如果任务有完成时间但状态不是completed，或者状态是completed但没有完成时间
-                if (task['completed_at'] and task['status'] != 'completed') or \
-                   (not task['completed_at'] and task['status'] == 'completed'):
-                    # 重置为未完成状态
-                    cursor.execute('''
-                        UPDATE pending_tasks 
-                        SET status = 'pending', completed_at = NULL 
-                        WHERE id = ?
-                    ''', (task['id'],))
-            
-            self.db.conn.commit()
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error repairing tasks data: {e}")
-            return False
+        return self.db.writes.submit(
+            self._repair_tasks_data,
+            on_done=on_done, on_error=on_error, description="repairing tasks data")
 
-    def is_due_soon(self, due_date_str):
-        """检查任务是否即将到期"""
+    def _repair_tasks_data(self):
         try:
-            due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
-            today = datetime.now().date()
-            
-            # 如果已经过期
-            if due_date <= today:
-                return True
-            
-            # 计算剩余天数
-            days_left = (due_date - today).days
-            
-            # 如果止日期是节假日，获取节假日前两个工作日
-            if self.is_holiday(due_date):
-                check_date = self.get_last_workday_before(due_date)
-                if today <= check_date:
-                    return True
-            
-            # 如果是未来两天内
-            if 0 <= days_left <= 2:
-                return True
-            
-            return False
-            
-        except Exception as e:
-            self.logger.error(f"Error checking due soon: {e}")
-            return False
+            with self.db.transaction("repair tasks"):
+                # 获取所有任务
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    SELECT id, name, file_path, due_date, status, completed_at 
+                    FROM pending_tasks
+                ''')
+                all_tasks = cursor.fetchall()
+                
+                # 修复每个任务的状态
+                for task in all_tasks:
+                    # 如果任务有完成时间但状态不是completed，或者状态是completed但没有完成时间
+                    if (task['completed_at'] and task['status'] != 'completed') or \
+                       (not task['completed_at'] and task['status'] == 'completed'):
+                        # 重置为未完成状态
+                        cursor.execute('''
+                            UPDATE pending_tasks 
+                            SET status = 'pending', completed_at = NULL 
+                            WHERE id = ?
+                        ''', (task['id'],))
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
 
     def get_task(self, task_id):
         """获取单个任务详情"""
@@ -312,171 +202,124 @@ class TasksController:
             self.logger.error(f"Error getting task: {e}")
             raise
 
-    def delete_task(self, task_id):
+    def delete_task(self, task_id, on_done=None, on_error=None):
         """删除任务"""
-        try:
-            return self.model.delete_task(task_id)
-        except Exception as e:
-            self.logger.error(f"Error deleting task: {e}")
-            raise
+        return self.db.writes.submit(
+            self.model.delete_task, task_id,
+            on_done=on_done, on_error=on_error, description="deleting task")
 
-    def init_holidays(self, year):
+    def init_holidays(self, year, on_done=None, on_error=None):
         """初始化指定年份的节假日"""
-        try:
-            cursor = self.db.conn.cursor()
-            
-            # 清空指定年份的节假日数据
-            cursor.execute('''
-                DELETE FROM holidays 
-                WHERE strftime('%Y', date) = ?
-            ''', (str(year),))
-            
-            # 添加法定节假日
-            holidays = [
-                # 元旦
-                (f"{year}-01-01", "元旦"),
-                
-                # 春节（预设）
-                (f"{year}-02-10", "春节"),
-                (f"{year}-02-11", "春节"),
-                (f"{year}-02-12", "春节"),
-                (f"{year}-02-13", "春节"),
-                (f"{year}-02-14", "春节"),
-                (f"{year}-02-15", "春节"),
-                (f"{year}-02-16", "春节"),
-                
-                # 清明节（预设）
-                (f"{year}-04-04", "清明节"),
-                (f"{year}-04-05", "清明节"),
-                
-                # 劳动节
-                (f"{year}-05-01", "劳动节"),
-                (f"{year}-05-02", "劳动节"),
-                (f"{year}-05-03", "劳动节"),
-                (f"{year}-05-04", "劳动节"),
-                (f"{year}-05-05", "动节"),
-                
-                # 端午节（预设）
-                (f"{year}-06-22", "端午节"),
-                (f"{year}-06-23", "端午"),
-                (f"{year}-06-24", "端午节"),
-                
-                # 中秋节（预设）
-                (f"{year}-09-29", "中秋节"),
-                (f"{year}-09-30", "中秋节"),
-                
-                # 国庆节
-                (f"{year}-10-01", "国庆节"),
-                (f"{year}-10-02", "国庆节"),
-                (f"{year}-10-03", "国庆节"),
-                (f"{year}-10-04", "国庆节"),
-                (f"{year}-10-05", "国庆节"),
-                (f"{year}-10-06", "国庆节"),
-                (f"{year}-10-07", "国庆节"),
-            ]
-            
-            # 批量插入节假日
-            cursor.executemany('''
-                INSERT INTO holidays (date, name, is_workday)
-                VALUES (?, ?, 0)
-            ''', holidays)
-            
-            self.db.conn.commit()
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error initializing holidays: {e}")
-            return False
+        return self.init_holidays_range(year, year, on_done=on_done, on_error=on_error)
+
+    def has_statutory_holidays(self, year):
+        """是否有指定年份的官方放假安排"""
+        return has_statutory_holidays(year)
+
+    def init_holidays_range(self, start_year, end_year, on_done=None, on_error=None):
+        """初始化多个年份的法定节假日和调休上班日，完成后回调已初始化的年份列表
+
+        没有官方放假安排的年份保留现有设置，不会被清空。
+        """
+        years = {}
+        for year in range(start_year, end_year + 1):
+            holidays = get_statutory_holidays(year)
+            if not holidays:
+                self.logger.warning(f"Keeping existing holidays for {year}: no official data")
+                continue
+            years[year] = holidays
+        return self.db.writes.submit(
+            self._replace_years, years,
+            on_done=on_done, on_error=on_error, description="initializing holidays")
+
+    def _replace_years(self, years):
+        """逐年替换节假日设置（在写线程中执行）"""
+        for year, holidays in years.items():
+            self.holidays.replace_year(year, holidays)
+        return list(years)
 
     def get_holidays(self, year, month):
         """获取指定月份的节假日数据"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                SELECT date, is_workday 
-                FROM holidays 
-                WHERE strftime('%Y', date) = ? 
-                AND strftime('%m', date) = ?
-            ''', (str(year), str(month).zfill(2)))
-            
-            holidays = {}
-            for row in cursor.fetchall():
-                date = datetime.strptime(row['date'], '%Y-%m-%d').date()
-                holidays[date] = bool(row['is_workday'])
-                
-            return holidays
-            
+            return self.holidays.get_month(year, month)
         except Exception as e:
             self.logger.error(f"Error getting holidays: {e}")
             return {}
 
-    def toggle_holiday(self, date, is_workday):
-        """切换日期的节假日状态"""
+    def get_year_holidays(self, year):
+        """获取整年的节假日数据（一次查询）"""
         try:
-            cursor = self.db.conn.cursor()
-            
-            # 检查是否已存在
-            cursor.execute('SELECT id FROM holidays WHERE date = ?', 
-                         (date.strftime('%Y-%m-%d'),))
-            
-            if cursor.fetchone():
-                # 更新现有记录
-                cursor.execute('''
-                    UPDATE holidays 
-                    SET is_workday = ?, name = ?
-                    WHERE date = ?
-                ''', (1 if is_workday else 0, 
-                     "调休" if is_workday else "节假日",
-                     date.strftime('%Y-%m-%d')))
-            else:
-                # 添加新记录
-                cursor.execute('''
-                    INSERT INTO holidays (date, name, is_workday)
-                    VALUES (?, ?, ?)
-                ''', (date.strftime('%Y-%m-%d'),
-                     "调休" if is_workday else "节假",
-                     1 if is_workday else 0))
-                
-            self.db.conn.commit()
-            return True
-            
+            return self.holidays.get_year(year)
         except Exception as e:
-            self.logger.error(f"Error toggling holiday: {e}")
+            self.logger.error(f"Error getting holidays: {e}")
+            return {}
+
+    def get_lunar_month(self, year, month):
+        """获取指定月份每一天的农历，返回 {日期: LunarDay}"""
+        try:
+            return get_lunar_month(year, month)
+        except Exception as e:
+            self.logger.error(f"Error getting lunar dates: {e}")
+            return {}
+
+    def get_holiday(self, date):
+        """获取指定日期的节假日设置，返回是否调休上班，未设置时返回 None"""
+        try:
+            return self.holidays.get_day(date)
+        except Exception as e:
+            self.logger.error(f"Error getting holiday: {e}")
             raise
 
+    def toggle_holiday(self, date, is_workday, on_done=None, on_error=None):
+        """切换日期的节假日状态"""
+        return self.db.writes.submit(
+            self.holidays.upsert, date, "调休" if is_workday else "节假日", is_workday,
+            on_done=on_done, on_error=on_error, description="toggling holiday")
+
+    def set_holiday_range(self, start_date, end_date, is_workday, on_done=None, on_error=None):
+        """将 [start_date, end_date] 内的每一天设为节假日或调休上班（一次提交）"""
+        name = "调休" if is_workday else "节假日"
+        days = (end_date - start_date).days + 1
+        return self.db.writes.submit(
+            self.holidays.upsert_many,
+            [(start_date + timedelta(days=i), name, is_workday) for i in range(days)],
+            on_done=on_done, on_error=on_error, description="setting holiday range")
+
+    def clear_holiday(self, date, on_done=None, on_error=None):
+        """清除日期的节假日设置，恢复默认状态"""
+        return self.db.writes.submit(
+            self.holidays.delete, date,
+            on_done=on_done, on_error=on_error, description="clearing holiday")
+
     def check_holiday_status(self, date):
         """检查指定日期的节假日状态"""
         try:
-            cursor = self.db.conn.cursor()
-            
-            # 查询指定日期的节假日记录
-            cursor.execute('''
-                SELECT date, name, is_workday 
-                FROM holidays 
-                WHERE date = ?
-            ''', (date.strftime('%Y-%m-%d'),))
-            
-            result = cursor.fetchone()
-            if result:
-                status = "工作日" if result['is_workday'] else "节假日"
-                return f"{result['date']}: {status} ({result['name']})"
-            else:
-                # 如果不在节假日表中，检查是否为周末
-                if date.weekday() >= 5:  # 5是周六，6是周日
-                    return f"{date.strftime('%Y-%m-%d')}: 节假日 (周末)"
-                else:
-                    return f"{date.strftime('%Y-%m-%d')}: 工作日"
-            
+            return next(self.iter_dates_status(date, date))
         except Exception as e:
             self.logger.error(f"Error checking holiday status: {e}")
             return f"Error checking status for {date.strftime('%Y-%m-%d')}"
 
-    def check_dates_status(self, start_date, end_date):
-        """���查一段时间内的节假日状态"""
+    def iter_dates_status(self, start_date, end_date):
+        """逐日生成一段时间内的节假日状态
+
+        整个区间只执行一次按日期索引的查询，节假日记录与周末规则在
+        内存中合并，结果逐条生成，多年的区间也不会占用大量内存。
+        """
+        rows = self.holidays.iter_range(start_date, end_date + timedelta(days=1))
+        row = next(rows, None)
         current_date = start_date
-        results = []
         while current_date <= end_date:
-            status = self.check_holiday_status(current_date)
-            results.append(status)
+            date_str = current_date.strftime('%Y-%m-%d')
+            if row is not None and row.day == current_date.toordinal():
+                status = "工作日" if row.is_workday else "节假日"
+                yield f"{row.date}: {status} ({row.name})"
+                row = next(rows, None)
+            elif current_date.weekday() >= 5:  # 5是周六，6是周日
+                yield f"{date_str}: 节假日 (周末)"
+            else:
+                yield f"{date_str}: 工作日"
             current_date += timedelta(days=1)
-        return results
\ No newline at end of file
+
+    def check_dates_status(self, start_date, end_date):
+        """检查一段时间内的节假日状态"""
+        return list(self.iter_dates_status(start_date, end_date))
@@ -0,0 +1,49 @@
+import logging
+import threading
+from concurrent.futures import Future
+from ..models.holidays_model import HolidaysModel
+from ..models.workspace_export import export_workspace, restore_workspace
+
+class WorkspaceController:
+    def __init__(self, db):
+        self.db = db
+        self.logger = logging.getLogger(__name__)
+
+    # 导出和恢复在后台线程中执行并返回 Future，on_done / on_error 在界面线程中回调
+
+    def export_data(self, directory, fmt='jsonl', compress=False, on_done=None, on_error=None):
+        """导出工作区数据，完成后回调 {表名: 行数}"""
+        return self._run_in_background(
+            "workspace-export", export_workspace, (self.db, directory, fmt, compress),
+            on_done, on_error)
+
+    def restore_data(self, directory, on_done=None, on_error=None):
+        """从导出目录恢复工作区数据，完成后回调 {表名: TableRestore}"""
+        return self._run_in_background(
+            "workspace-restore", self._restore_data, (directory,), on_done, on_error)
+
+    def _restore_data(self, directory):
+        try:
+            return restore_workspace(self.db, directory)
+        finally:
+            # 节假日可能已被覆盖，清除缓存并重建工作日历
+            HolidaysModel.for_db(self.db).invalidate()
+
+    def _run_in_background(self, name, func, args, on_done, on_error):
+        future = Future()
+
+        def run():
+            try:
+                result = func(*args)
+            except Exception as e:
+                self.logger.error(f"Error in {name}: {e}")
+                future.set_exception(e)
+                if on_error is not None:
+                    self.db.writes.notify(on_error, e)
+                return
+            future.set_result(result)
+            if on_done is not None:
+                self.db.writes.notify(on_done, result)
+
+        threading.Thread(target=run, name=name, daemon=True).start()
+        return future
@@ -0,0 +1,181 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+
+# 每一步复制的页数，步与步之间让出写锁和 CPU
+BACKUP_PAGES_PER_STEP = 256
+
+# 每一步之间的暂停秒数
+BACKUP_STEP_SLEEP = 0.005
+
+# 保留的备份份数
+BACKUP_KEEP = 7
+
+# 自动备份间隔（秒）
+BACKUP_INTERVAL = 24 * 60 * 60
+
+# 启动后第一次检查是否需要备份的延迟（秒），避开启动时的加载
+BACKUP_STARTUP_DELAY = 60
+
+_PREFIX = 'workspace-'
+_SUFFIX = '.db'
+_TIME_FORMAT = '%Y%m%d-%H%M%S'
+
+logger = logging.getLogger(__name__)
+
+
+def list_backups(directory):
+    """目录中的备份文件，按时间从旧到新排列"""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob(f'{_PREFIX}*{_SUFFIX}'))
+
+
+def backup_database(db, target, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP):
+    """用 sqlite3 备份 API 把数据库在线复制到 target
+
+    从只读连接池借一个连接，在一个读事务中按 pages 页一步复制，WAL 模式下
+    写线程可以继续提交，备份内容是开始时刻的快照。先写入临时文件，完成后
+    再改名，中断的备份不会留下不完整的备份文件。
+    Returns:
+        备份文件的字节数
+    """
+    if db.connections.in_memory:
+        raise ValueError("Cannot back up an in-memory database")
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(target.name + '.tmp')
+
+    dest = sqlite3.connect(partial)
+    try:
+        with db.reader() as conn:
+            # 保持读事务直到复制结束，其他连接的提交不会使备份重新开始
+            conn.execute("BEGIN")
+            try:
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone()
+                conn.backup(dest, pages=pages,
+                            progress=lambda status, remaining, total: time.sleep(sleep))
+            finally:
+                conn.rollback()
+        dest.close()
+        os.replace(partial, target)
+    except BaseException:
+        dest.close()
+        partial.unlink(missing_ok=True)
+        raise
+    return target.stat().st_size
+
+
+def rotate_backups(directory, keep=BACKUP_KEEP):
+    """只保留最新的 keep 份备份，并清理中断留下的临时文件"""
+    directory = Path(directory)
+    for partial in directory.glob(f'{_PREFIX}*{_SUFFIX}.tmp'):
+        partial.unlink(missing_ok=True)
+    backups = list_backups(directory)
+    removed = backups[:-keep] if keep > 0 else backups
+    for path in removed:
+        path.unlink(missing_ok=True)
+    return removed
+
+
+class BackupScheduler:
+    """后台定时备份
+
+    在 "db-backup" 线程中按 interval 秒的间隔备份数据库到 directory，
+    文件名带时间戳，只保留最新的 keep 份。备份在后台线程中分步进行，
+    不会阻塞界面和写线程。
+    """
+
+    def __init__(self, db, directory, interval=BACKUP_INTERVAL, keep=BACKUP_KEEP,
+                 pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP):
+        self.db = db
+        self.directory = Path(directory)
+        self.interval = interval
+        self.keep = keep
+        self.pages = pages
+        self.sleep = sleep
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, delay=BACKUP_STARTUP_DELAY):
+        """启动定时备份线程；上次备份已超过 interval 时在 delay 秒后备份"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(delay,),
+                                        name="db-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """停止定时备份，最多等待 timeout 秒让正在进行的备份完成"""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def backup_now(self, on_done=None, on_error=None):
+        """立即在后台备份一次，返回 Future；完成后回调备份文件路径"""
+        future = Future()
+
+        def run():
+            try:
+                path = self.run_backup()
+            except Exception as e:
+                future.set_exception(e)
+                if on_error is not None:
+                    self.db.writes.notify(on_error, e)
+                return
+            future.set_result(path)
+            if on_done is not None:
+                self.db.writes.notify(on_done, path)
+
+        threading.Thread(target=run, name="db-backup-now", daemon=True).start()
+        return future
+
+    def run_backup(self):
+        """在当前线程中备份一次并轮换旧备份，返回备份文件路径"""
+        with self._lock:
+            target = self.directory / f"{_PREFIX}{datetime.now().strftime(_TIME_FORMAT)}{_SUFFIX}"
+            started = time.perf_counter()
+            try:
+                size = backup_database(self.db, target, self.pages, self.sleep)
+            except Exception as e:
+                self.logger.error(f"Database backup failed: {e}")
+                raise
+            elapsed = (time.perf_counter() - started) * 1000
+            self.logger.info(f"Backed up database to {target} ({size} bytes) in {elapsed:.1f} ms")
+            for path in rotate_backups(self.directory, self.keep):
+                self.logger.info(f"Removed old backup {path}")
+            return target
+
+    def _seconds_until_due(self):
+        """距离下一次备份的秒数，以最新备份文件的修改时间为准"""
+        backups = list_backups(self.directory)
+        if not backups:
+            return 0
+        age = time.time() - backups[-1].stat().st_mtime
+        return max(self.interval - age, 0)
+
+    def _run(self, delay):
+        if self._stop.wait(delay):
+            return
+        while not self._stop.is_set():
+            wait = self._seconds_until_due()
+            if wait > 0:
+                if self._stop.wait(wait):
+                    return
+                continue
+            try:
+                self.run_backup()
+            except Exception:
+                # 已记录日志，等待下一个间隔再试
+                if self._stop.wait(self.interval):
+                    return
@@ -0,0 +1,232 @@
+import csv
+import io
+import json
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+from html.parser import HTMLParser
+from itertools import islice
+from pathlib import PureWindowsPath
+
+# 每个事务提交的书签数
+IMPORT_CHUNK_SIZE = 1000
+
+# CSV 文件的列顺序
+CSV_COLUMNS = ('category', 'name', 'url', 'username', 'browser')
+
+# 表头行（任意一列名匹配即视为表头）
+_CSV_HEADERS = {'category', '分类'}
+
+# HTML 解析每次读取的字符数
+_HTML_BLOCK_SIZE = 64 * 1024
+
+# 不在任何文件夹中的书签归入的分类
+DEFAULT_CATEGORY = "导入的书签"
+
+ImportProgress = namedtuple('ImportProgress', [
+    'fraction',   # 已读取的文件比例 0.0 ~ 1.0
+    'rows',       # 已读取的数据行数
+    'imported',   # 已导入的书签数
+    'skipped',    # 因重复跳过的书签数
+    'invalid',    # 格式错误的行数
+    'cancelled',  # 是否被取消（仅最终结果有意义）
+])
+
+
+def read_csv_bookmarks(stream):
+    """逐行解析书签 CSV，产生书签字典；格式错误的行产生 None
+
+    列顺序为 分类,名称,URL,用户名,浏览器，字段中的逗号需用双引号括起。
+    """
+    for i, row in enumerate(csv.reader(stream)):
+        if not row or not any(field.strip() for field in row):
+            continue
+        if i == 0 and row[0].strip().lower() in _CSV_HEADERS:
+            continue
+        if len(row) != len(CSV_COLUMNS):
+            yield None
+            continue
+        bookmark = dict(zip(CSV_COLUMNS, (field.strip() for field in row)))
+        if not (bookmark['category'] and bookmark['name'] and bookmark['url']):
+            yield None
+            continue
+        bookmark['browser'] = bookmark['browser'] or 'chrome'
+        yield bookmark
+
+
+class _NetscapeBookmarkParser(HTMLParser):
+    """Netscape 书签 HTML 的事件式解析器
+
+    <H3> 为文件夹名，其后的 <DL> 为该文件夹的内容；<A HREF> 为书签。
+    解析出的书签放入 self.bookmarks，由调用方在每次 feed() 后取走。
+    """
+
+    def __init__(self, browser):
+        super().__init__()
+        self.browser = browser
+        self.bookmarks = []
+        self._folders = []
+        self._pending_folder = None
+        self._text = None
+        self._href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'h3':
+            self._text = []
+        elif tag == 'a':
+            self._href = dict(attrs).get('href')
+            self._text = []
+        elif tag == 'dl':
+            self._folders.append(self._pending_folder)
+            self._pending_folder = None
+
+    def handle_endtag(self, tag):
+        if tag == 'h3' and self._text is not None:
+            self._pending_folder = ''.join(self._text).strip() or None
+            self._text = None
+        elif tag == 'a' and self._text is not None:
+            url = (self._href or '').strip()
+            if url:
+                self.bookmarks.append({
+                    'category': self._current_folder(),
+                    'name': ''.join(self._text).strip() or url,
+                    'url': url,
+                    'username': '',
+                    'browser': self.browser,
+                })
+            self._text = self._href = None
+        elif tag == 'dl' and self._folders:
+            self._folders.pop()
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+    def _current_folder(self):
+        for folder in reversed(self._folders):
+            if folder:
+                return folder
+        return DEFAULT_CATEGORY
+
+
+def read_html_bookmarks(stream, browser='chrome'):
+    """分块解析浏览器导出的 Netscape 书签 HTML，逐个产生书签字典
+
+    书签的分类为其所在的最内层文件夹。
+    """
+    parser = _NetscapeBookmarkParser(browser)
+    while True:
+        block = stream.read(_HTML_BLOCK_SIZE)
+        if not block:
+            break
+        parser.feed(block)
+        yield from parser.bookmarks
+        parser.bookmarks.clear()
+    parser.close()
+    yield from parser.bookmarks
+
+
+def read_chromium_bookmarks(stream, browser='chrome'):
+    """遍历 Chromium（Chrome / Edge）的 Bookmarks JSON 文件，逐个产生书签字典
+
+    标准库没有增量 JSON 解析器，文件整体解析为字典后用显式栈按文件夹
+    顺序遍历，不再构造其他中间结构。书签的分类为其所在的文件夹。
+    """
+    roots = json.load(stream).get('roots', {})
+    stack = [(node, DEFAULT_CATEGORY) for node in reversed(list(roots.values()))
+             if isinstance(node, dict)]
+    while stack:
+        node, folder = stack.pop()
+        if node.get('type') == 'url':
+            url = (node.get('url') or '').strip()
+            if url:
+                yield {
+                    'category': folder,
+                    'name': (node.get('name') or '').strip() or url,
+                    'url': url,
+                    'username': '',
+                    'browser': browser,
+                }
+        elif 'children' in node:
+            name = (node.get('name') or '').strip() or folder
+            stack.extend((child, name) for child in reversed(node['children']))
+
+
+def detect_format(path):
+    """根据文件名判断导入格式：'html'、'chromium' 或 'csv'"""
+    name = os.path.basename(path).lower()
+    ext = os.path.splitext(name)[1]
+    if ext in ('.html', '.htm'):
+        return 'html'
+    if ext == '.json' or name == 'bookmarks':
+        return 'chromium'
+    return 'csv'
+
+
+def detect_browser(path):
+    """根据路径判断书签来自哪个浏览器：路径中有名为 Edge 的目录时为 'edge'
+
+    Edge 的书签文件位于 ...\\Microsoft\\Edge\\User Data\\... 下；只比较完整的
+    路径组成部分，knowledge、hedge 等目录名不会被误判。
+    """
+    if any(part.lower() == 'edge' for part in PureWindowsPath(path).parts):
+        return 'edge'
+    return 'chrome'
+
+
+def read_bookmarks(stream, fmt, browser='chrome'):
+    """按格式选择解析器，逐个产生书签字典（CSV 的错误行为 None）"""
+    if fmt == 'html':
+        return read_html_bookmarks(stream, browser)
+    if fmt == 'chromium':
+        return read_chromium_bookmarks(stream, browser)
+    return read_csv_bookmarks(stream)
+
+
+class SourceFile:
+    """以二进制方式打开导入文件，按底层读取位置报告进度"""
+
+    def __init__(self, path, encoding='utf-8-sig'):
+        self.path = path
+        self.size = os.path.getsize(path) or 1
+        self.raw = open(path, 'rb')
+        self.text = io.TextIOWrapper(self.raw, encoding=encoding, newline='')
+
+    @property
+    def fraction(self):
+        return min(self.raw.tell() / self.size, 1.0)
+
+    def close(self):
+        self.text.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_chunks(iterable, size):
+    """把可迭代对象切成最多 size 个元素的列表，不一次性读入内存"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ImportJob:
+    """后台导入任务：cancel() 请求取消，future 得到最终的 ImportProgress"""
+
+    def __init__(self):
+        self.future = Future()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
@@ -1,5 +1,19 @@
 import sqlite3
 import logging
+from .records import Bookmark, Category
+from .pagination import make_page
+
+# 书签列表每页的条数
+BOOKMARKS_PAGE_SIZE = 200
+
+
+class DuplicateBookmarkError(ValueError):
+    """同一分类下已存在相同网址的书签"""
+
+    def __init__(self, url):
+        super().__init__("该分类下已存在相同的网址")
+        self.url = url
+
 
 class BookmarksModel:
     def __init__(self, db):
@@ -9,13 +23,15 @@ class BookmarksModel:
     def get_categories(self):
         """获取所有分类"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                SELECT id, name, order_index 
-                FROM categories 
-                ORDER BY order_index
-            ''')
-            return cursor.fetchall()
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = Category.row_factory
+                cursor.execute('''
+                    SELECT id, name, order_index 
+                    FROM categories 
+                    ORDER BY order_index
+                ''')
+                return cursor.fetchall()
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -23,31 +39,43 @@ class BookmarksModel:
     def add_category(self, name):
         """添加新分类"""
         try:
-            cursor = self.db.conn.cursor()
-            # 获取最大的order_index
-            cursor.execute('SELECT MAX(order_index) FROM categories')
-            max_order = cursor.fetchone()[0] or 0
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                # 获取最大的order_index
+                cursor.execute('SELECT MAX(order_index) FROM categories')
+                max_order = cursor.fetchone()[0] or 0
             
-            cursor.execute('''
-                INSERT INTO categories (name, order_index)
-                VALUES (?, ?)
-            ''', (name, max_order + 1))
-            self.db.conn.commit()
+                cursor.execute('''
+                    INSERT INTO categories (name, order_index)
+                    VALUES (?, ?)
+                ''', (name, max_order + 1))
             return cursor.lastrowid
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
 
+    def find_category(self, name):
+        """按名称查找分类，返回分类 ID，不存在时返回 None"""
+        try:
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT id FROM categories WHERE name = ?', (name,))
+                row = cursor.fetchone()
+                return row[0] if row else None
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
+
     def update_category(self, category_id, name):
         """更新分类"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                UPDATE categories 
-                SET name = ? 
-                WHERE id = ?
-            ''', (name, category_id))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    UPDATE categories 
+                    SET name = ? 
+                    WHERE id = ?
+                ''', (name, category_id))
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -55,18 +83,18 @@ class BookmarksModel:
     def delete_category(self, category_id):
         """删除分类及其所有书签"""
         try:
-            cursor = self.db.conn.cursor()
-            # 首先删除该分类下的所有书签
-            cursor.execute('''
-                DELETE FROM bookmarks 
-                WHERE category_id = ?
-            ''', (category_id,))
-            # 然后删除分类
-            cursor.execute('''
-                DELETE FROM categories 
-                WHERE id = ?
-            ''', (category_id,))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                # 首先删除该分类下的所有书签
+                cursor.execute('''
+                    DELETE FROM bookmarks 
+                    WHERE category_id = ?
+                ''', (category_id,))
+                # 然后删除分类
+                cursor.execute('''
+                    DELETE FROM categories 
+                    WHERE id = ?
+                ''', (category_id,))
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -74,21 +102,53 @@ class BookmarksModel:
     def get_bookmarks(self, category_id=None):
         """获取书签"""
         try:
-            cursor = self.db.conn.cursor()
-            if category_id:
-                cursor.execute('''
-                    SELECT id, name, url, browser, order_index 
-                    FROM bookmarks 
-                    WHERE category_id = ? 
-                    ORDER BY order_index
-                ''', (category_id,))
-            else:
-                cursor.execute('''
-                    SELECT id, name, url, browser, order_index 
-                    FROM bookmarks 
-                    ORDER BY order_index
-                ''')
-            return cursor.fetchall()
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = Bookmark.row_factory
+                if category_id:
+                    cursor.execute('''
+                        SELECT id, name, url, browser, order_index 
+                        FROM bookmarks 
+                        WHERE category_id = ? 
+                        ORDER BY order_index
+                    ''', (category_id,))
+                else:
+                    cursor.execute('''
+                        SELECT id, name, url, browser, order_index 
+                        FROM bookmarks 
+                        ORDER BY order_index
+                    ''')
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
+
+    def get_bookmarks_page(self, category_id=None, token=None, page_size=BOOKMARKS_PAGE_SIZE):
+        """按 (order_index, id) 键集分页获取书签，返回 Page
+
+        token 为上一页的 next_token，为 None 时取第一页。
+        """
+        try:
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = Bookmark.row_factory
+                params = {'category_id': category_id, 'limit': page_size + 1}
+                conditions = []
+                if category_id:
+                    conditions.append('category_id = :category_id')
+                if token is not None:
+                    conditions.append('(order_index, id) > (:order_index, :id)')
+                    params['order_index'], params['id'] = token
+                where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+                cursor.execute(f'''
+                    SELECT id, name, url, browser, order_index
+                    FROM bookmarks
+                    {where}
+                    ORDER BY order_index, id
+                    LIMIT :limit
+                ''', params)
+                return make_page(cursor.fetchall(), page_size,
+                                 lambda bookmark: (bookmark.order_index, bookmark.id))
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -96,21 +156,23 @@ class BookmarksModel:
     def add_bookmark(self, category_id, name, url, browser):
         """添加书签"""
         try:
-            cursor = self.db.conn.cursor()
-            # 获取当前分类下最大的order_index
-            cursor.execute('''
-                SELECT MAX(order_index) 
-                FROM bookmarks 
-                WHERE category_id = ?
-            ''', (category_id,))
-            max_order = cursor.fetchone()[0] or 0
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                # 获取当前分类下最大的order_index
+                cursor.execute('''
+                    SELECT MAX(order_index) 
+                    FROM bookmarks 
+                    WHERE category_id = ?
+                ''', (category_id,))
+                max_order = cursor.fetchone()[0] or 0
             
-            cursor.execute('''
-                INSERT INTO bookmarks (category_id, name, url, browser, order_index)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (category_id, name, url, browser, max_order + 1))
-            self.db.conn.commit()
+                cursor.execute('''
+                    INSERT INTO bookmarks (category_id, name, url, browser, order_index)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (category_id, name, url, browser, max_order + 1))
             return cursor.lastrowid
+        except sqlite3.IntegrityError as e:
+            self._raise_duplicate(e, url)
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -118,13 +180,15 @@ class BookmarksModel:
     def update_bookmark(self, bookmark_id, name, url, browser):
         """更新书签"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                UPDATE bookmarks 
-                SET name = ?, url = ?, browser = ? 
-                WHERE id = ?
-            ''', (name, url, browser, bookmark_id))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    UPDATE bookmarks 
+                    SET name = ?, url = ?, browser = ? 
+                    WHERE id = ?
+                ''', (name, url, browser, bookmark_id))
+        except sqlite3.IntegrityError as e:
+            self._raise_duplicate(e, url)
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -132,12 +196,12 @@ class BookmarksModel:
     def delete_bookmark(self, bookmark_id):
         """删除书签"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                DELETE FROM bookmarks 
-                WHERE id = ?
-            ''', (bookmark_id,))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    DELETE FROM bookmarks 
+                    WHERE id = ?
+                ''', (bookmark_id,))
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -145,13 +209,13 @@ class BookmarksModel:
     def update_bookmark_order(self, bookmark_id, new_order):
         """更新书签顺序"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                UPDATE bookmarks 
-                SET order_index = ? 
-                WHERE id = ?
-            ''', (new_order, bookmark_id))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    UPDATE bookmarks 
+                    SET order_index = ? 
+                    WHERE id = ?
+                ''', (new_order, bookmark_id))
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -159,44 +223,59 @@ class BookmarksModel:
     def get_bookmark(self, bookmark_id):
         """获取单个书签的详细信息"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                SELECT id, name, url, browser, username 
-                FROM bookmarks 
-                WHERE id = ?
-            ''', (bookmark_id,))
-            return cursor.fetchone()
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = Bookmark.row_factory
+                cursor.execute('''
+                    SELECT id, name, url, browser, username 
+                    FROM bookmarks 
+                    WHERE id = ?
+                ''', (bookmark_id,))
+                return cursor.fetchone()
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
 
+    def _raise_duplicate(self, error, url):
+        """(category_id, url) 唯一索引冲突时抛出 DuplicateBookmarkError，其他完整性错误原样抛出"""
+        if 'UNIQUE' in str(error):
+            self.logger.warning(f"Duplicate bookmark URL in category: {url}")
+            raise DuplicateBookmarkError(url) from error
+        self.logger.error(f"Database error: {error}")
+        raise error
+
     def batch_add_bookmarks(self, bookmarks_data):
         """批量添加书签
+
+        整批在一个事务中用一条 executemany 语句插入。同一分类下已存在的
+        URL（包括本批中重复的）由 ON CONFLICT 跳过；顺序号取分类当前的
+        最大值加一，跳过的书签不占用顺序号，因此每个分类的顺序号保持连续。
         Args:
-            bookmarks_data: 书签数据列表
+            bookmarks_data: 书签数据列表，每个元素为包含 category_id, name,
+                            url, browser 以及可选 username 的字典
         Returns:
-            成功添加的数量
+            (插入数量, 跳过数量)
         """
-        cursor = self.db.cursor()
-        success_count = 0
-        
+        rows = [(bookmark['category_id'], bookmark['name'], bookmark['url'],
+                 bookmark['browser'], bookmark.get('username') or None,
+                 bookmark['category_id'])
+                for bookmark in bookmarks_data]
+        if not rows:
+            return 0, 0
         try:
-            for bookmark in bookmarks_data:
-                cursor.execute("""
-                    INSERT INTO bookmarks (category_id, name, url, browser)
-                    VALUES (?, ?, ?, ?)
-                """, (
-                    bookmark['category_id'],
-                    bookmark['name'],
-                    bookmark['url'],
-                    bookmark['browser']
-                ))
-                success_count += 1
-            
-            self.db.commit()
-            return success_count
-        except Exception as e:
-            self.db.rollback()
-            raise e
-        finally:
-            cursor.close()
\ No newline at end of file
+            with self.db.transaction("batch add bookmarks"):
+                cursor = self.db.conn.cursor()
+                cursor.executemany('''
+                    INSERT INTO bookmarks (category_id, name, url, browser, username, order_index)
+                    VALUES (?, ?, ?, ?, ?, (
+                        SELECT COALESCE(MAX(order_index), 0) + 1
+                        FROM bookmarks
+                        WHERE category_id = ?
+                    ))
+                    ON CONFLICT (category_id, url) DO NOTHING
+                ''', rows)
+                inserted = cursor.rowcount
+            return inserted, len(rows) - inserted
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
@@ -0,0 +1,118 @@
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from .write_queue import WriterConnection
+
+# 默认连接参数，可通过 config.DATABASE["pragmas"] 覆盖
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",            # 读写互不阻塞
+    "synchronous": "NORMAL",          # WAL 模式下提交时不再每次 fsync
+    "cache_size": -16000,             # 负数单位为 KiB，约 16 MB
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# 连接池中保留的只读连接数
+READ_POOL_SIZE = 4
+
+
+class ConnectionManager:
+    """SQLite 连接管理
+
+    写入使用一个专用的写连接；读取从只读连接池中借出，WAL 模式下
+    后台写入和界面读取不会在同一个连接上排队。连接池用尽时临时打开
+    额外的只读连接，用完即关闭。内存数据库无法在连接之间共享，
+    此时读取也使用写连接；写事务中的读取同样使用写连接。
+    """
+
+    def __init__(self, db_path, pragmas=None, read_pool_size=READ_POOL_SIZE):
+        self.db_path = str(db_path)
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self.read_pool_size = read_pool_size
+        self.in_memory = self.db_path in (':memory:', '')
+        self.logger = logging.getLogger(__name__)
+
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._lock = threading.Lock()
+
+        self.writer = self._connect(self.db_path, factory=WriterConnection)
+        self._apply_pragmas(self.writer, writer=True)
+
+    def _connect(self, database, uri=False, factory=sqlite3.Connection):
+        # 连接可能被不同线程依次借用（同一时间只有一个使用者）
+        conn = sqlite3.connect(database, uri=uri, check_same_thread=False, factory=factory)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _apply_pragmas(self, conn, writer):
+        """应用连接参数；journal_mode 是数据库级设置，只由写连接设置"""
+        for name, value in self.pragmas.items():
+            if name == 'journal_mode':
+                if not writer or self.in_memory:
+                    continue
+                mode = conn.execute(f"PRAGMA journal_mode = {value}").fetchone()[0]
+                if mode.lower() != str(value).lower():
+                    self.logger.warning(f"Requested journal_mode {value}, got {mode}")
+            else:
+                conn.execute(f"PRAGMA {name} = {value}")
+
+    def _open_reader(self):
+        uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+        conn = self._connect(uri, uri=True)
+        self._apply_pragmas(conn, writer=False)
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """借出一个只读连接，退出时归还连接池
+
+        当前线程持有写连接时（写线程中或 transaction() 内）直接使用写连接，
+        以便读到本事务中尚未提交的修改。
+        """
+        if self.in_memory or self.writer.held_by_current_thread():
+            yield self.writer
+            return
+
+        conn, pooled = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if pooled:
+                self._readers.put(conn)
+            else:
+                conn.close()
+
+    def _acquire_reader(self):
+        """返回 (连接, 是否属于连接池)"""
+        try:
+            return self._readers.get_nowait(), True
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            pooled = self._reader_count < self.read_pool_size
+            if pooled:
+                self._reader_count += 1
+        try:
+            return self._open_reader(), pooled
+        except sqlite3.Error:
+            if pooled:
+                with self._lock:
+                    self._reader_count -= 1
+            raise
+
+    def close(self):
+        """关闭写连接和连接池中的所有只读连接"""
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._reader_count = 0
+        self.writer.close()
@@ -1,17 +1,30 @@
 import sqlite3
 import logging
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from .migrations import MIGRATIONS, latest_version
+from .connection_manager import ConnectionManager, READ_POOL_SIZE
+from .write_queue import WriteQueue
+from .read_executor import ReadExecutor
 
 class Database:
-    def __init__(self, db_path="workspace.db"):
+    def __init__(self, db_path="workspace.db", pragmas=None, read_pool_size=READ_POOL_SIZE):
         """Initialize database connection"""
         self.db_path = db_path
+        self.pragmas = pragmas
+        self.read_pool_size = read_pool_size
+        self.connections = None
         self.conn = None
+        self.writes = None
+        self.reads = None
         self.setup_logging()
         self.connect()
-        self.create_tables()
         self.migrate_database()
+        # 迁移完成后再启动后台写线程，之后的写入都通过 self.writes 提交
+        self.writes = WriteQueue(self.conn)
+        self.reads = ReadExecutor(read_pool_size)
 
     def setup_logging(self):
         """Setup logging configuration"""
@@ -22,111 +35,75 @@ class Database:
         self.logger = logging.getLogger(__name__)
 
     def connect(self):
-        """Create database connection"""
+        """Create the writer connection and the read-only connection pool"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
+            self.connections = ConnectionManager(self.db_path, self.pragmas, self.read_pool_size)
+            # 写入和需要读到未提交数据的操作使用写连接
+            self.conn = self.connections.writer
             self.logger.info("Database connection established")
         except sqlite3.Error as e:
             self.logger.error(f"Database connection error: {e}")
             raise
 
-    def create_tables(self):
-        """Create all required tables if they don't exist"""
-        try:
-            cursor = self.conn.cursor()
-            
-            # Pending tasks table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS pending_tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    file_path TEXT,
-                    due_date TEXT NOT NULL,
-                    status TEXT DEFAULT 'pending',
-                    importance TEXT DEFAULT '普通',
-                    created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')),
-                    updated_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')),
-                    completed_at TEXT
-                )
-            ''')
-
-            # 添加节假日表
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS holidays (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    is_workday INTEGER DEFAULT 0,
-                    created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'))
-                )
-            ''')
-
-            # Categories table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS categories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    order_index INTEGER NOT NULL,
-                    created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'))
-                )
-            ''')
+    def reader(self):
+        """Borrow a pooled read-only connection: ``with db.reader() as conn:``"""
+        return self.connections.reader()
 
-            # Bookmarks table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS bookmarks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    category_id INTEGER,
-                    name TEXT NOT NULL,
-                    url TEXT NOT NULL,
-                    browser TEXT NOT NULL,
-                    order_index INTEGER NOT NULL,
-                    created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')),
-                    FOREIGN KEY (category_id) REFERENCES categories (id)
-                )
-            ''')
+    @contextmanager
+    def transaction(self, name="transaction"):
+        """Unit of work on the writer connection: ``with db.transaction():``
 
-            # File shortcuts table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS file_shortcuts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    file_path TEXT NOT NULL UNIQUE,
-                    created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'))
-                )
-            ''')
-
-            self.conn.commit()
-            self.logger.info("Tables created successfully")
-            return True
-        except sqlite3.Error as e:
-            self.logger.error(f"Error creating tables: {e}")
-            return False
+        Scopes nest. Only the outermost scope commits (or, on the writer
+        thread, leaves the commit to the current write batch); inner scopes
+        are savepoints, so a failing inner scope only undoes its own work.
+        Yields a TransactionStats with the statement count and elapsed time.
+        """
+        with self.conn.transaction() as stats:
+            yield stats
+        if not stats.nested:
+            self.logger.debug(
+                f"{name}: {stats.statements} statements in {stats.elapsed_ms:.1f} ms"
+            )
 
     def close(self):
         """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        if self.reads:
+            self.reads.close()
+        if self.writes:
+            self.writes.close()
+        if self.connections:
+            self.connections.close()
             self.logger.info("Database connection closed")
 
     def migrate_database(self):
-        """Migrate database to latest version"""
-        try:
-            cursor = self.conn.cursor()
-            
-            # 检查 bookmarks 表是否存在 username 列
-            cursor.execute("PRAGMA table_info(bookmarks)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'username' not in columns:
-                self.logger.info("Migrating database: Adding username column to bookmarks")
-                cursor.execute('''
-                    ALTER TABLE bookmarks 
-                    ADD COLUMN username TEXT
-                ''')
-            
-            self.conn.commit()
-            self.logger.info("Database migration completed successfully")
-        except sqlite3.Error as e:
-            self.logger.error(f"Database migration error: {e}")
-            raise 
\ No newline at end of file
+        """Apply pending schema migrations based on PRAGMA user_version
+
+        When the schema is current no DDL runs at all. Otherwise each
+        migration runs in its own transaction together with the version bump.
+        """
+        cursor = self.conn.cursor()
+        current = cursor.execute("PRAGMA user_version").fetchone()[0]
+        target = latest_version()
+        if current >= target:
+            self.logger.info(f"Database schema is up to date (version {current})")
+            return
+
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+            started = time.perf_counter()
+            try:
+                cursor.execute("BEGIN")
+                migration.apply(cursor)
+                cursor.execute(f"PRAGMA user_version = {migration.version}")
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                self.logger.error(f"Database migration {migration.version} failed: {e}")
+                raise
+            elapsed = (time.perf_counter() - started) * 1000
+            self.logger.info(
+                f"Applied migration {migration.version} ({migration.description}) "
+                f"in {elapsed:.1f} ms"
+            )
+        self.logger.info(f"Database migrated from version {current} to {target}")
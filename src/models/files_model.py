@@ -1,5 +1,6 @@
 import sqlite3
 import logging
+from .records import FileShortcut
 
 class FilesModel:
     def __init__(self, db):
@@ -9,13 +10,15 @@ class FilesModel:
     def get_files(self):
         """获取所有文件快捷方式"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                SELECT id, name, file_path 
-                FROM file_shortcuts 
-                ORDER BY name
-            ''')
-            return cursor.fetchall()
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = FileShortcut.row_factory
+                cursor.execute('''
+                    SELECT id, name, file_path 
+                    FROM file_shortcuts 
+                    ORDER BY name
+                ''')
+                return cursor.fetchall()
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -23,12 +26,12 @@ class FilesModel:
     def add_file(self, name, file_path):
         """添加文件快捷方式"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                INSERT INTO file_shortcuts (name, file_path)
-                VALUES (?, ?)
-            ''', (name, file_path))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    INSERT INTO file_shortcuts (name, file_path)
+                    VALUES (?, ?)
+                ''', (name, file_path))
             return cursor.lastrowid
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
@@ -37,13 +40,13 @@ class FilesModel:
     def update_file(self, file_id, name, file_path):
         """更新文件快捷方式"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                UPDATE file_shortcuts 
-                SET name = ?, file_path = ? 
-                WHERE id = ?
-            ''', (name, file_path, file_id))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    UPDATE file_shortcuts 
+                    SET name = ?, file_path = ? 
+                    WHERE id = ?
+                ''', (name, file_path, file_id))
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -51,12 +54,12 @@ class FilesModel:
     def delete_file(self, file_id):
         """删除文件快捷方式"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                DELETE FROM file_shortcuts 
-                WHERE id = ?
-            ''', (file_id,))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    DELETE FROM file_shortcuts 
+                    WHERE id = ?
+                ''', (file_id,))
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise 
\ No newline at end of file
@@ -0,0 +1,227 @@
+import sqlite3
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import date
+from types import MappingProxyType
+
+from .work_calendar import WorkCalendar
+from .records import Holiday
+
+# 内存中最多缓存的月份数
+MONTH_CACHE_SIZE = 24
+
+
+def _month_range(year, month):
+    """返回指定月份的半开区间 [月初, 下月初)"""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+
+class HolidaysModel:
+    """节假日数据存储
+
+    holidays.date 上有唯一索引，所有查询都使用日期半开区间，写入使用
+    INSERT ... ON CONFLICT 一条语句完成。按月份的查询结果保存在一个
+    小型 LRU 缓存中，写入所在的事务结束后只清除受影响的月份和年份。
+    """
+
+    _instances = weakref.WeakKeyDictionary()
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db):
+        self.db = db
+        self.calendar = WorkCalendar.for_db(db)
+        self.logger = logging.getLogger(__name__)
+        self._months = OrderedDict()
+        # 每次清除缓存加一；查询期间发生过清除时不缓存查询结果
+        self._generation = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_db(cls, db):
+        """获取数据库对应的共享节假日存储"""
+        with cls._instances_lock:
+            model = cls._instances.get(db)
+            if model is None:
+                model = cls(db)
+                cls._instances[db] = model
+            return model
+
+    def get_range(self, start, end):
+        """获取 [start, end) 之间的节假日记录"""
+        try:
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = Holiday.row_factory
+                cursor.execute('''
+                    SELECT date, name, is_workday
+                    FROM holidays
+                    WHERE date >= ? AND date < ?
+                    ORDER BY date
+                ''', (str(start), str(end)))
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
+
+    def iter_range(self, start, end):
+        """按日期顺序逐行返回 [start, end) 之间的节假日记录，不一次性读入内存"""
+        with self.db.reader() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.row_factory = Holiday.row_factory
+                cursor.execute('''
+                    SELECT date, name, is_workday
+                    FROM holidays
+                    WHERE date >= ? AND date < ?
+                    ORDER BY date
+                ''', (str(start), str(end)))
+            except sqlite3.Error as e:
+                self.logger.error(f"Database error: {e}")
+                raise
+            yield from cursor
+
+    def get_month(self, year, month):
+        """获取指定月份的节假日，返回只读的 {日期: 是否调休上班}"""
+        key = (year, month)
+        with self._lock:
+            holidays = self._months.get(key)
+            if holidays is not None:
+                self._months.move_to_end(key)
+                return holidays
+            generation = self._generation
+
+        holidays = MappingProxyType({
+            date.fromordinal(row.day): bool(row.is_workday)
+            for row in self.get_range(*_month_range(year, month))
+        })
+        with self._lock:
+            if self._generation == generation:
+                self._months[key] = holidays
+                self._months.move_to_end(key)
+                while len(self._months) > MONTH_CACHE_SIZE:
+                    self._months.popitem(last=False)
+        return holidays
+
+    def get_year(self, year):
+        """一次查询获取整年的节假日，返回 {日期: 是否调休上班}
+
+        查询结果同时填入尚未缓存的月份。
+        """
+        with self._lock:
+            generation = self._generation
+        months = {month: {} for month in range(1, 13)}
+        for row in self.get_range(f"{year}-01-01", f"{year + 1}-01-01"):
+            day = date.fromordinal(row.day)
+            months[day.month][day] = bool(row.is_workday)
+
+        with self._lock:
+            if self._generation == generation:
+                for month, holidays in months.items():
+                    self._months.setdefault((year, month), MappingProxyType(holidays))
+                while len(self._months) > MONTH_CACHE_SIZE:
+                    self._months.popitem(last=False)
+        return {day: is_workday
+                for holidays in months.values()
+                for day, is_workday in holidays.items()}
+
+    def get_day(self, day):
+        """获取指定日期的设置，返回是否调休上班，未设置时返回 None"""
+        return self.get_month(day.year, day.month).get(day)
+
+    def upsert(self, day, name, is_workday):
+        """设置指定日期为节假日或调休上班日"""
+        self.upsert_many([(day, name, is_workday)])
+
+    def upsert_many(self, holidays):
+        """批量设置节假日，holidays 为 (日期, 名称, 是否调休上班) 列表"""
+        rows = [(str(day), name, 1 if is_workday else 0)
+                for day, name, is_workday in holidays]
+        if not rows:
+            return
+        try:
+            with self.db.transaction():
+                self.db.conn.executemany('''
+                    INSERT INTO holidays (date, name, is_workday)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(date) DO UPDATE SET
+                        name = excluded.name,
+                        is_workday = excluded.is_workday
+                ''', rows)
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
+        self._changed([date.fromisoformat(row[0]) for row in rows])
+
+    def delete(self, day):
+        """删除指定日期的设置，恢复默认状态"""
+        try:
+            with self.db.transaction():
+                self.db.conn.execute('DELETE FROM holidays WHERE date = ?', (str(day),))
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
+        self._changed([day])
+
+    def replace_year(self, year, holidays):
+        """在一个事务中替换指定年份的全部节假日设置"""
+        try:
+            with self.db.transaction(f"replace holidays for {year}"):
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    DELETE FROM holidays
+                    WHERE date >= ? AND date < ?
+                ''', (f"{year}-01-01", f"{year + 1}-01-01"))
+                cursor.executemany('''
+                    INSERT INTO holidays (date, name, is_workday)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(date) DO UPDATE SET
+                        name = excluded.name,
+                        is_workday = excluded.is_workday
+                ''', holidays)
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
+        self.calendar.invalidate(year)
+        self.db.conn.after_transaction(lambda: self._evict(year=year))
+
+    def invalidate(self, year=None, month=None):
+        """清除缓存：不传参数清除全部，只传年份清除该年全部月份"""
+        self._evict(year, month)
+        if month is None:
+            self.calendar.invalidate(year)
+
+    def _evict(self, year=None, month=None):
+        """只清除内存缓存（节假日月份和工作日历年份）"""
+        with self._lock:
+            self._generation += 1
+            if year is None:
+                self._months.clear()
+            elif month is None:
+                for key in [k for k in self._months if k[0] == year]:
+                    del self._months[key]
+            else:
+                self._months.pop((year, month), None)
+        if month is None:
+            self.calendar.forget(year)
+
+    def _changed(self, days):
+        """写入指定日期后同步 work_calendar 表，事务结束后清除受影响的缓存
+
+        清除放在提交（或回滚）之后，其他线程不会在提交前重新缓存旧数据，
+        回滚时也不会留下未提交的修改。
+        """
+        months = {(day.year, day.month) for day in days}
+        years = sorted({year for year, _ in months})
+        for year in years:
+            self.calendar.invalidate(year)
+
+        def evict():
+            for year, month in months:
+                self._evict(year, month)
+            for year in years:
+                self.calendar.forget(year)
+        self.db.conn.after_transaction(evict)
@@ -0,0 +1,74 @@
+import calendar
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from lunar_python import Lunar, LunarMonth
+from lunar_python.util import LunarUtil
+
+# text 为完整的农历日期，label 为日历格子中显示的简短文字
+LunarDay = namedtuple('LunarDay', ['year', 'month', 'day', 'text', 'label'])
+
+
+def _year_in_chinese(year):
+    return ''.join(LunarUtil.NUMBER[int(digit)] for digit in str(year))
+
+
+def _month_in_chinese(month):
+    return ("闰" if month < 0 else "") + LunarUtil.MONTH[abs(month)]
+
+
+def _lunar_day(year, month, day, days_in_month):
+    """根据农历年月日生成显示文字"""
+    text = f"农历 {_year_in_chinese(year)}年 {_month_in_chinese(month)}月 {LunarUtil.DAY[day]}"
+
+    # 格子中优先显示节日，其次在初一显示月份
+    festival = None
+    if month > 0:
+        festival = LunarUtil.FESTIVAL.get(f"{month}-{day}")
+        if month == 12 and day == days_in_month:
+            festival = "除夕"
+    if festival:
+        label = festival
+    elif day == 1:
+        label = f"{_month_in_chinese(month)}月"
+    else:
+        label = LunarUtil.DAY[day]
+    return LunarDay(year, month, day, text, label)
+
+
+@lru_cache(maxsize=24)
+def get_lunar_month(year, month):
+    """批量计算公历某月每一天的农历
+
+    只为当月第一天构造一次 Lunar（需要计算节气等，开销较大），
+    之后按农历月的天数逐日推算。
+    Returns:
+        {日期: LunarDay}
+    """
+    first = Lunar.fromDate(datetime(year, month, 1))
+    lunar_day = first.getDay()
+    current = LunarMonth.fromYm(first.getYear(), first.getMonth())
+    days_in_month = current.getDayCount()
+
+    days = {}
+    start = datetime(year, month, 1).date()
+    for i in range(calendar.monthrange(year, month)[1]):
+        if lunar_day > days_in_month:
+            lunar_day = 1
+            current = current.next(1)
+            days_in_month = current.getDayCount()
+        days[start + timedelta(days=i)] = _lunar_day(
+            current.getYear(), current.getMonth(), lunar_day, days_in_month)
+        lunar_day += 1
+    return days
+
+
+def get_lunar_day(day):
+    """获取指定日期的农历（按月缓存）"""
+    return get_lunar_month(day.year, day.month)[day]
+
+
+def lunar_date_text(day):
+    """获取指定日期的完整农历文字，如“农历 二〇二四年 九月 初一”"""
+    return get_lunar_day(day).text
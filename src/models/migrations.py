@@ -0,0 +1,206 @@
+import logging
+from collections import namedtuple
+
+# 每个迁移在一个事务中执行，完成后把 PRAGMA user_version 设为 version
+Migration = namedtuple('Migration', ['version', 'description', 'apply'])
+
+MIGRATIONS = []
+
+logger = logging.getLogger(__name__)
+
+
+def migration(version, description):
+    """Register a schema migration; versions must be strictly increasing"""
+    def register(func):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration version {version} is out of order")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return register
+
+
+def latest_version():
+    """Schema version after all registered migrations are applied"""
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+# 旧版本数据库没有设置 user_version（为 0），因此早期迁移都需要能在
+# 已有表结构上重复执行
+
+@migration(1, "Create base tables")
+def _create_base_tables(cursor):
+    # Pending tasks table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pending_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            file_path TEXT,
+            due_date TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            importance TEXT DEFAULT '普通',
+            created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')),
+            updated_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')),
+            completed_at TEXT
+        )
+    ''')
+
+    # 节假日表
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS holidays (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            name TEXT NOT NULL,
+            is_workday INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'))
+        )
+    ''')
+
+    # Categories table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            order_index INTEGER NOT NULL,
+            created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'))
+        )
+    ''')
+
+    # Bookmarks table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bookmarks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category_id INTEGER,
+            name TEXT NOT NULL,
+            url TEXT NOT NULL,
+            browser TEXT NOT NULL,
+            order_index INTEGER NOT NULL,
+            created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')),
+            FOREIGN KEY (category_id) REFERENCES categories (id)
+        )
+    ''')
+
+    # File shortcuts table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS file_shortcuts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            file_path TEXT NOT NULL UNIQUE,
+            created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'))
+        )
+    ''')
+
+
+@migration(2, "Add username column to bookmarks")
+def _add_bookmark_username(cursor):
+    cursor.execute("PRAGMA table_info(bookmarks)")
+    columns = [column[1] for column in cursor.fetchall()]
+    if 'username' not in columns:
+        cursor.execute('''
+            ALTER TABLE bookmarks 
+            ADD COLUMN username TEXT
+        ''')
+
+
+@migration(3, "Create work_calendar table")
+def _create_work_calendar(cursor):
+    # 工作日历表（由 WorkCalendar 根据节假日表维护）
+    # day 为 date.toordinal()，workday_seq 为该日之前的工作日数
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS work_calendar (
+            day INTEGER PRIMARY KEY,
+            is_workday INTEGER NOT NULL,
+            workday_seq INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_work_calendar_seq
+        ON work_calendar (workday_seq) WHERE is_workday = 1
+    ''')
+
+
+@migration(4, "Add unique date index to holidays")
+def _add_holidays_date_index(cursor):
+    # 节假日表按日期唯一，旧数据中重复的日期只保留最后一条
+    cursor.execute('''
+        DELETE FROM holidays
+        WHERE id NOT IN (SELECT MAX(id) FROM holidays GROUP BY date)
+    ''')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_holidays_date ON holidays (date)
+    ''')
+
+
+@migration(5, "Add secondary indexes for task and bookmark queries")
+def _add_secondary_indexes(cursor):
+    # 待办任务按截止日期排序；已完成任务按完成时间排序和清理
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_pending_tasks_due
+        ON pending_tasks (due_date) WHERE status != 'completed'
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_completed_tasks
+        ON pending_tasks (completed_at) WHERE status = 'completed'
+    ''')
+    # 今日新增任务数按 DATE(created_at) 查询
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_pending_tasks_created_day
+        ON pending_tasks (DATE(created_at)) WHERE status != 'completed'
+    ''')
+    # 分类下的书签按顺序读取
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_bookmarks_category_order
+        ON bookmarks (category_id, order_index)
+    ''')
+
+
+@migration(6, "Add unique (category_id, url) index to bookmarks")
+def _add_bookmarks_url_index(cursor):
+    # 同一分类下的 URL 唯一，旧数据中重复的书签只保留最早添加的一条
+    duplicates = cursor.execute('''
+        SELECT id, category_id, url
+        FROM bookmarks
+        WHERE id NOT IN (SELECT MIN(id) FROM bookmarks GROUP BY category_id, url)
+        ORDER BY id
+    ''').fetchall()
+    if duplicates:
+        logger.warning(
+            f"Removing {len(duplicates)} duplicate bookmarks (same URL in the same category): "
+            f"ids {[row[0] for row in duplicates]}"
+        )
+        for bookmark_id, category_id, url in duplicates:
+            logger.info(f"Removed duplicate bookmark {bookmark_id} in category {category_id}: {url}")
+        cursor.executemany('DELETE FROM bookmarks WHERE id = ?',
+                           [(row[0],) for row in duplicates])
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_bookmarks_category_url
+        ON bookmarks (category_id, url)
+    ''')
+
+
+@migration(7, "Create tasks_archive table for completed tasks")
+def _create_tasks_archive(cursor):
+    # 已完成的任务从 pending_tasks 分批移入归档表，id 保持不变；
+    # archive_month（YYYY-MM，取自 completed_at）为按月分区的键
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            file_path TEXT,
+            due_date TEXT NOT NULL,
+            status TEXT DEFAULT 'completed',
+            importance TEXT DEFAULT '普通',
+            created_at TEXT,
+            updated_at TEXT,
+            completed_at TEXT NOT NULL,
+            archive_month TEXT NOT NULL
+        )
+    ''')
+    # 按月查询历史；已办列表按完成时间倒序读取
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_archive_month
+        ON tasks_archive (archive_month, completed_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_archive_completed
+        ON tasks_archive (completed_at)
+    ''')
@@ -0,0 +1,16 @@
+from collections import namedtuple
+
+# 一页查询结果；next_token 为取下一页时传回的续页标记，没有更多数据时为 None
+Page = namedtuple('Page', ['rows', 'next_token'])
+
+
+def make_page(rows, page_size, key):
+    """由多取一行的查询结果构造 Page
+
+    查询按 page_size + 1 条取数，多出的一行只用来判断是否还有下一页；
+    续页标记为本页最后一行的排序键 key(row)，下一页从该键之后开始。
+    """
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return Page(rows, key(rows[-1]))
+    return Page(rows, None)
@@ -0,0 +1,93 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .connection_manager import READ_POOL_SIZE
+
+
+class ReadExecutor:
+    """后台读线程池
+
+    读操作（通常是模型的查询方法）通过 submit() 在线程池中执行，查询方法
+    自己从连接池借用只读连接。传入相同 key 的请求互相替代：新请求提交后，
+    尚未开始的旧请求被取消，已在执行的旧请求完成后不再回调，快速切换
+    分类或列表时界面只显示最后一次请求的结果。
+    """
+
+    def __init__(self, max_workers=READ_POOL_SIZE):
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="db-reader")
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._dispatch = None
+
+    def set_dispatcher(self, dispatch):
+        """设置回调的执行方式，dispatch(callback, arg)；未设置时在读线程中直接回调"""
+        self._dispatch = dispatch
+
+    def submit(self, func, *args, on_done=None, on_error=None, key=None,
+               description=None, **kwargs):
+        """提交一个读操作，返回 Future
+
+        on_done(结果) / on_error(异常) 只在该请求仍是同一 key 的最新请求时回调。
+        """
+        future = self._executor.submit(func, *args, **kwargs)
+        if key is not None:
+            with self._lock:
+                previous = self._latest.get(key)
+                self._latest[key] = future
+            if previous is not None:
+                previous.cancel()
+        description = description or func.__name__
+        future.add_done_callback(
+            lambda f: self._finish(f, key, on_done, on_error, description))
+        return future
+
+    def is_current(self, key, future):
+        """future 是否仍是 key 对应的最新请求"""
+        if key is None:
+            return True
+        with self._lock:
+            return self._latest.get(key) is future
+
+    def close(self):
+        """取消排队中的读操作并停止线程池"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, future, key, on_done, on_error, description):
+        """读操作结束后安排回调，过期或已取消的请求直接丢弃"""
+        if future.cancelled() or not self.is_current(key, future):
+            self.logger.debug(f"Dropped stale read: {description}")
+            return
+        error = future.exception()
+        if error is not None:
+            self.logger.error(f"Error {description}: {error}")
+            callback, value = on_error, error
+        else:
+            callback, value = on_done, future.result()
+        if callback is None:
+            self._forget(key, future)
+            return
+        if self._dispatch is not None:
+            self._dispatch(self._deliver, (future, key, callback, value))
+        else:
+            self._deliver((future, key, callback, value))
+
+    def _deliver(self, item):
+        """在界面线程中执行回调；排队期间出现了更新的请求时丢弃"""
+        future, key, callback, value = item
+        if not self.is_current(key, future):
+            return
+        self._forget(key, future)
+        try:
+            callback(value)
+        except Exception as e:
+            self.logger.error(f"Error in read callback: {e}")
+
+    def _forget(self, key, future):
+        if key is None:
+            return
+        with self._lock:
+            if self._latest.get(key) is future:
+                del self._latest[key]
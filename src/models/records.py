@@ -0,0 +1,130 @@
+from datetime import date
+
+
+def _day_ordinal(value):
+    """'YYYY-MM-DD' 转为 date.toordinal()，空值或格式错误返回 None"""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class Record:
+    """使用 __slots__ 的查询结果记录
+
+    由 row_factory 按查询结果的列直接构造，查询中没有的字段为 None，
+    查询了记录类型中没有的字段时抛出 ValueError。同时支持属性访问、
+    record['name'] 和与 sqlite3.Row 相同的按查询列顺序的 record[0] 下标访问，
+    `'name' in record` 表示该字段有值。
+    """
+
+    # _columns: 查询结果的列名（同一查询的记录共用一个元组），直接构造时为全部字段
+    __slots__ = ('_columns',)
+    # 需要预先解析为序数的日期字段：{日期字段: 序数字段}
+    _ordinals = {}
+    _factories = {}
+
+    def __init__(self, **values):
+        self._columns = self.__slots__
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+        for source, target in self._ordinals.items():
+            if target not in values:
+                setattr(self, target, _day_ordinal(getattr(self, source)))
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        """sqlite3 行工厂：cursor.row_factory = Task.row_factory"""
+        description = cursor.description
+        build = cls._factories.get(description)
+        if build is None:
+            build = cls._build_factory(tuple(column[0] for column in description))
+            cls._factories[description] = build
+        return build(row)
+
+    @classmethod
+    def _build_factory(cls, columns):
+        """为一组查询列生成构造函数，同一查询只生成一次"""
+        for column in columns:
+            if column not in cls.__slots__:
+                raise ValueError(f"{cls.__name__} has no field {column!r}")
+        missing = tuple(field for field in cls.__slots__ if field not in columns)
+        ordinals = tuple(cls._ordinals.items())
+        new = object.__new__
+        setter = object.__setattr__
+
+        def build(row):
+            record = new(cls)
+            setter(record, '_columns', columns)
+            for column, value in zip(columns, row):
+                setter(record, column, value)
+            for field in missing:
+                setter(record, field, None)
+            for source, target in ordinals:
+                setter(record, target, _day_ordinal(getattr(record, source)))
+            return record
+        return build
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            key = self._columns[key]
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return getattr(self, key, None) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def keys(self):
+        return list(self._columns)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f"{f}={getattr(self, f)!r}" for f in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Task(Record):
+    """待办任务，due_day / completed_day 为预先解析的日期序数"""
+    __slots__ = ('id', 'name', 'file_path', 'due_date', 'status', 'completed_at',
+                 'importance', 'created_at', 'bucket', 'due_day', 'completed_day')
+    _ordinals = {'due_date': 'due_day', 'completed_at': 'completed_day'}
+    _factories = {}
+
+
+class Category(Record):
+    """书签分类"""
+    __slots__ = ('id', 'name', 'order_index')
+    _factories = {}
+
+
+class Bookmark(Record):
+    """书签"""
+    __slots__ = ('id', 'category_id', 'name', 'url', 'browser', 'username', 'order_index')
+    _factories = {}
+
+
+class FileShortcut(Record):
+    """文件快捷方式"""
+    __slots__ = ('id', 'name', 'file_path')
+    _factories = {}
+
+
+class Holiday(Record):
+    """节假日设置，day 为预先解析的日期序数"""
+    __slots__ = ('date', 'name', 'is_workday', 'day')
+    _ordinals = {'date': 'day'}
+    _factories = {}
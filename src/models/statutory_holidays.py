@@ -0,0 +1,29 @@
+import logging
+from functools import lru_cache
+
+from lunar_python.util import HolidayUtil
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=32)
+def get_statutory_holidays(year):
+    """获取指定年份的法定节假日和调休上班日
+
+    数据来自 lunar_python 自带的国务院放假安排。尚未公布（或 lunar_python
+    版本过旧没有收录）的年份返回空元组，由调用方决定如何处理，不做推算。
+    Returns:
+        (日期, 名称, 是否调休上班) 元组组成的元组，按日期排序
+    """
+    holidays = tuple(sorted(
+        (holiday.getDay(), holiday.getName(), 1 if holiday.isWork() else 0)
+        for holiday in HolidayUtil.getHolidays(year)
+    ))
+    if not holidays:
+        logger.warning(f"No official holiday data for {year}")
+    return holidays
+
+
+def has_statutory_holidays(year):
+    """是否有指定年份的官方放假安排"""
+    return bool(get_statutory_holidays(year))
@@ -1,45 +1,227 @@
 import sqlite3
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
+from .work_calendar import WorkCalendar
+from .records import Task
+from .pagination import make_page
+
+# 到期提醒分类，按显示顺序排列
+DUE_BUCKETS = ("需要今天完成", "今天到期", "明天到期", "后天到期")
+
+# 已办任务列表最多显示的条数
+COMPLETED_TASKS_LIMIT = 500
+
+# 任务列表每页的条数
+TASKS_PAGE_SIZE = 200
+
+# 每个事务移入归档表的任务数
+ARCHIVE_BATCH_SIZE = 500
+
+# 已完成的任务在待办表中保留的工作日数，之后移入归档表
+ARCHIVE_AFTER_WORKDAYS = 5
+
+# julianday() 与 date.toordinal() 之间的差值
+JULIAN_ORDINAL_OFFSET = 1721424.5
 
 class TasksModel:
     def __init__(self, db):
         self.db = db
+        self.calendar = WorkCalendar.for_db(db)
         self.logger = logging.getLogger(__name__)
 
-    def get_tasks(self, include_completed=False):
-        """获取任务列表"""
+    def get_tasks(self, include_completed=False, limit=COMPLETED_TASKS_LIMIT):
+        """获取任务列表
+
+        include_completed 为 True 时返回已完成任务（包括已归档的），按完成
+        时间倒序，最多 limit 条。
+        """
         try:
-            cursor = self.db.conn.cursor()
-            if include_completed:
-                cursor.execute('''
-                    SELECT id, name, file_path, due_date, status, completed_at, importance 
-                    FROM pending_tasks 
-                    WHERE status = 'completed'
-                    ORDER BY completed_at DESC
-                ''')
-            else:
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = Task.row_factory
+                if include_completed:
+                    # 两个子查询都按 completed_at 索引有序读取，合并后只取前 limit 条
+                    cursor.execute('''
+                        SELECT id, name, file_path, due_date, status, completed_at, importance
+                        FROM (
+                            SELECT id, name, file_path, due_date, status, completed_at, importance
+                            FROM pending_tasks
+                            WHERE status = 'completed'
+                            UNION ALL
+                            SELECT id, name, file_path, due_date, status, completed_at, importance
+                            FROM tasks_archive
+                        )
+                        ORDER BY completed_at DESC
+                        LIMIT ?
+                    ''', (limit,))
+                else:
+                    cursor.execute('''
+                        SELECT id, name, file_path, due_date, status, importance 
+                        FROM pending_tasks 
+                        WHERE status != 'completed'
+                        ORDER BY due_date ASC
+                    ''')
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
+
+    def get_tasks_page(self, include_completed=False, token=None, page_size=TASKS_PAGE_SIZE):
+        """按键集分页获取任务列表，返回 Page
+
+        未完成任务按 (due_date, id) 升序，已完成任务（包括已归档的）按
+        (completed_at, id) 降序；token 为上一页的 next_token，为 None 时取第一页。
+        每页都沿索引从上一页最后一行之后继续读取，与已翻过的页数无关。
+        """
+        try:
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = Task.row_factory
+                params = {'limit': page_size + 1}
+                if include_completed:
+                    # completed_at 为 NULL 的已完成任务（待修复的数据）排在最后，
+                    # 按 id 降序单独翻页：续页标记为 (None, id)
+                    columns = 'id, name, file_path, due_date, status, completed_at, importance'
+                    missing = f'''
+                        SELECT {columns}
+                        FROM pending_tasks
+                        WHERE status = 'completed' AND completed_at IS NULL
+                    '''
+                    if token is None:
+                        arms = [f"SELECT {columns} FROM pending_tasks WHERE status = 'completed'",
+                                f"SELECT {columns} FROM tasks_archive"]
+                    elif token[0] is None:
+                        arms = [missing + ' AND id < :id']
+                        params['id'] = token[1]
+                    else:
+                        after = '(completed_at, id) < (:completed_at, :id)'
+                        arms = [f"SELECT {columns} FROM pending_tasks "
+                                f"WHERE status = 'completed' AND {after}",
+                                f"SELECT {columns} FROM tasks_archive WHERE {after}",
+                                missing]
+                        params['completed_at'], params['id'] = token
+                    # 顶层的 UNION ALL 让各部分按索引有序合并，不需要临时排序
+                    cursor.execute(f'''
+                        {' UNION ALL '.join(arms)}
+                        ORDER BY completed_at DESC, id DESC
+                        LIMIT :limit
+                    ''', params)
+                    return make_page(cursor.fetchall(), page_size,
+                                     lambda task: (task.completed_at, task.id))
+
+                after = ''
+                if token is not None:
+                    after = 'AND (due_date, id) > (:due_date, :id)'
+                    params['due_date'], params['id'] = token
+                cursor.execute(f'''
+                    SELECT id, name, file_path, due_date, status, importance
+                    FROM pending_tasks
+                    WHERE status != 'completed' {after}
+                    ORDER BY due_date, id
+                    LIMIT :limit
+                ''', params)
+                return make_page(cursor.fetchall(), page_size,
+                                 lambda task: (task.due_date, task.id))
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
+            raise
+
+    def get_due_buckets(self, today=None):
+        """通过 work_calendar 表一次查询得到所有到期提醒分类
+
+        紧急任务的截止日期为节假日或节假日后第一个工作日时，需在节假日前
+        最后两个工作日内完成；workday_seq 为某天之前的工作日数，因此
+        “今天不晚于倒数第二个工作日或今天就是最后一个工作日”等价于
+        today.workday_seq - today.is_workday <= due.workday_seq - 2。
+        """
+        try:
+            today = today or datetime.now().date()
+
+            # 保证日历表覆盖所有待办任务的截止日期（多留一年用于向前查找工作日）
+            with self.db.reader() as conn:
+                min_due, max_due = conn.execute('''
+                    SELECT
+                        (SELECT MIN(due_date) FROM pending_tasks WHERE status != 'completed'),
+                        (SELECT MAX(due_date) FROM pending_tasks WHERE status != 'completed')
+                ''').fetchall()[0]
+            start_year = end_year = today.year
+            if min_due and max_due:
+                start_year = min(start_year, int(min_due[:4]))
+                end_year = max(end_year, int(max_due[:4]))
+            self.calendar.ensure_materialized(start_year - 1, end_year)
+
+            # 物化可能刚刚写入日历表，借用新的读连接以读到最新数据
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = Task.row_factory
                 cursor.execute('''
-                    SELECT id, name, file_path, due_date, status, importance 
-                    FROM pending_tasks 
-                    WHERE status != 'completed'
-                    ORDER BY date(due_date) ASC
-                ''')
-            return cursor.fetchall()
+                    SELECT id, name, file_path, due_date, status, importance, bucket
+                    FROM (
+                        SELECT t.id, t.name, t.file_path, t.due_date, t.status, t.importance,
+                            CASE
+                                WHEN t.importance = '紧急' THEN
+                                    CASE
+                                        WHEN (due.is_workday = 0 OR eve.is_workday = 0)
+                                            AND :today_seq <= due.workday_seq - 2
+                                            THEN '需要今天完成'
+                                        WHEN t.due_day - :today IN (0, 1) THEN '需要今天完成'
+                                        WHEN t.due_day - :today <= 2 THEN '后天到期'
+                                    END
+                                WHEN t.due_day - :today = 0 THEN '今天到期'
+                                WHEN t.due_day - :today = 1 THEN '明天到期'
+                                WHEN t.due_day - :today = 2 AND due.is_workday = 1 THEN '后天到期'
+                            END AS bucket
+                        FROM (
+                            SELECT id, name, file_path, due_date, status, importance,
+                                CAST(julianday(due_date) - :offset AS INTEGER) AS due_day
+                            FROM pending_tasks
+                            WHERE status != 'completed'
+                        ) t
+                        JOIN work_calendar due ON due.day = t.due_day
+                        JOIN work_calendar eve ON eve.day = t.due_day - 1
+                    )
+                    WHERE bucket IS NOT NULL
+                    ORDER BY due_date, id
+                ''', {
+                    'today': today.toordinal(),
+                    'today_seq': self._today_seq(conn, today),
+                    'offset': JULIAN_ORDINAL_OFFSET,
+                })
+                rows = cursor.fetchall()
+
+            buckets = {name: [] for name in DUE_BUCKETS}
+            for row in rows:
+                buckets[row['bucket']].append(row)
+            return buckets
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
 
+    def _today_seq(self, conn, today):
+        """今天在工作日序列中的位置（今天为工作日时减一）"""
+        cursor = conn.execute('''
+            SELECT workday_seq - is_workday
+            FROM work_calendar
+            WHERE day = ?
+        ''', (today.toordinal(),))
+        return cursor.fetchone()[0]
+
     def get_task(self, task_id):
-        """获取单个任务详情"""
+        """获取单个任务详情（包括已归档的任务）"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                SELECT id, name, file_path, due_date, status, completed_at, importance 
-                FROM pending_tasks 
-                WHERE id = ?
-            ''', (task_id,))
-            return cursor.fetchone()
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = Task.row_factory
+                cursor.execute('''
+                    SELECT id, name, file_path, due_date, status, completed_at, importance 
+                    FROM pending_tasks 
+                    WHERE id = :id
+                    UNION ALL
+                    SELECT id, name, file_path, due_date, status, completed_at, importance
+                    FROM tasks_archive
+                    WHERE id = :id
+                ''', {'id': task_id})
+                return cursor.fetchone()
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -47,12 +229,12 @@ class TasksModel:
     def add_task(self, name, due_date, file_path=None, importance='普通'):
         """添加任务"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                INSERT INTO pending_tasks (name, file_path, due_date, status, importance)
-                VALUES (?, ?, ?, 'pending', ?)
-            ''', (name, file_path, due_date, importance))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    INSERT INTO pending_tasks (name, file_path, due_date, status, importance)
+                    VALUES (?, ?, ?, 'pending', ?)
+                ''', (name, file_path, due_date, importance))
             return cursor.lastrowid
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
@@ -61,57 +243,80 @@ class TasksModel:
     def update_task(self, task_id, name, due_date, importance):
         """更新任务信息"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                UPDATE pending_tasks 
-                SET name = ?, 
-                    due_date = ?,
-                    importance = ?
-                WHERE id = ?
-            ''', (name, due_date, importance, task_id))
-            
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    UPDATE pending_tasks 
+                    SET name = ?, 
+                        due_date = ?,
+                        importance = ?
+                    WHERE id = ?
+                ''', (name, due_date, importance, task_id))
             return True
-        except Exception as e:
-            self.db.conn.rollback()
+        except sqlite3.Error as e:
+            self.logger.error(f"Database error: {e}")
             raise
 
     def complete_task(self, task_id):
         """完成任务"""
         try:
-            cursor = self.db.conn.cursor()
-            completed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            cursor.execute('''
-                UPDATE pending_tasks 
-                SET status = 'completed', completed_at = ? 
-                WHERE id = ?
-            ''', (completed_at, task_id))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                completed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                cursor.execute('''
+                    UPDATE pending_tasks 
+                    SET status = 'completed', completed_at = ? 
+                    WHERE id = ?
+                ''', (completed_at, task_id))
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
 
-    def cleanup_completed_tasks(self):
-        """清理已完成超过5个工作日的任务"""
+    def archive_cutoff(self, now=None):
+        """归档的截止时间：5个工作日前的此刻（考虑节假日和调休）"""
+        now = now or datetime.now()
+        cutoff = datetime.combine(
+            self.calendar.nth_workday_before(now.date(), ARCHIVE_AFTER_WORKDAYS),
+            now.time()
+        )
+        return cutoff.strftime('%Y-%m-%d %H:%M:%S')
+
+    def archive_completed_tasks(self, cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+        """把完成时间早于 cutoff 的任务移入归档表，每次最多 batch_size 条
+
+        Returns:
+            本批移动的任务数，小于 batch_size 时表示已全部移完
+        """
         try:
-            cursor = self.db.conn.cursor()
-            # 计算5个工作日前的日期
-            current_date = datetime.now()
-            workdays = 0
-            cleanup_date = current_date
-            while workdays < 5:
-                cleanup_date -= timedelta(days=1)
-                if cleanup_date.weekday() < 5:  # 0-4 表示周一到周五
-                    workdays += 1
-            
-            cleanup_date_str = cleanup_date.strftime('%Y-%m-%d %H:%M:%S')
-            
-            cursor.execute('''
-                DELETE FROM pending_tasks 
-                WHERE status = 'completed' 
-                AND completed_at < ?
-            ''', (cleanup_date_str,))
-            self.db.conn.commit()
+            with self.db.transaction("archive tasks"):
+                cursor = self.db.conn.cursor()
+                ids = [row[0] for row in cursor.execute('''
+                    SELECT id
+                    FROM pending_tasks
+                    WHERE status = 'completed'
+                    AND completed_at < ?
+                    ORDER BY completed_at
+                    LIMIT ?
+                ''', (cutoff, batch_size))]
+                if not ids:
+                    return 0
+
+                placeholders = ', '.join('?' for _ in ids)
+                cursor.execute(f'''
+                    INSERT OR REPLACE INTO tasks_archive (
+                        id, name, file_path, due_date, status, importance,
+                        created_at, updated_at, completed_at, archive_month
+                    )
+                    SELECT id, name, file_path, due_date, status, importance,
+                        created_at, updated_at, completed_at, substr(completed_at, 1, 7)
+                    FROM pending_tasks
+                    WHERE id IN ({placeholders})
+                ''', ids)
+                cursor.execute(f'''
+                    DELETE FROM pending_tasks
+                    WHERE id IN ({placeholders})
+                ''', ids)
+            return len(ids)
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -119,12 +324,16 @@ class TasksModel:
     def delete_task(self, task_id):
         """删除任务"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                DELETE FROM pending_tasks 
-                WHERE id = ?
-            ''', (task_id,))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    DELETE FROM pending_tasks 
+                    WHERE id = ?
+                ''', (task_id,))
+                cursor.execute('''
+                    DELETE FROM tasks_archive
+                    WHERE id = ?
+                ''', (task_id,))
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -132,15 +341,16 @@ class TasksModel:
     def get_today_new_tasks_count(self):
         """获取今日新增的未完成任务数"""
         try:
-            cursor = self.db.conn.cursor()
             today = datetime.now().strftime('%Y-%m-%d')
-            cursor.execute('''
-                SELECT COUNT(*) 
-                FROM pending_tasks 
-                WHERE DATE(created_at) = ? 
-                AND status != 'completed'
-            ''', (today,))
-            return cursor.fetchone()[0]
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT COUNT(*) 
+                    FROM pending_tasks 
+                    WHERE DATE(created_at) = ? 
+                    AND status != 'completed'
+                ''', (today,))
+                return cursor.fetchone()[0]
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
@@ -148,27 +358,43 @@ class TasksModel:
     def get_pending_tasks_count(self):
         """获取未完成任务总数"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                SELECT COUNT(*) 
-                FROM pending_tasks 
-                WHERE status != 'completed'
-            ''')
-            return cursor.fetchone()[0]
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT COUNT(*) 
+                    FROM pending_tasks 
+                    WHERE status != 'completed'
+                ''')
+                return cursor.fetchone()[0]
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
 
     def restore_task(self, task_id):
-        """恢复任务到未完成状态"""
+        """恢复任务到未完成状态（已归档的任务移回待办表）"""
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                UPDATE pending_tasks 
-                SET status = 'pending', completed_at = NULL 
-                WHERE id = ?
-            ''', (task_id,))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor = self.db.conn.cursor()
+                cursor.execute('''
+                    UPDATE pending_tasks 
+                    SET status = 'pending', completed_at = NULL 
+                    WHERE id = ?
+                ''', (task_id,))
+                if cursor.rowcount == 0:
+                    cursor.execute('''
+                        INSERT INTO pending_tasks (
+                            id, name, file_path, due_date, status, importance,
+                            created_at, updated_at
+                        )
+                        SELECT id, name, file_path, due_date, 'pending', importance,
+                            created_at, updated_at
+                        FROM tasks_archive
+                        WHERE id = ?
+                    ''', (task_id,))
+                    cursor.execute('''
+                        DELETE FROM tasks_archive
+                        WHERE id = ?
+                    ''', (task_id,))
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             raise
\ No newline at end of file
@@ -0,0 +1,335 @@
+import sqlite3
+import logging
+import threading
+import weakref
+from array import array
+from datetime import date, timedelta
+
+from .records import Holiday
+
+# 向前/向后跨年查找工作日时最多检查的年数
+MAX_YEAR_SPAN = 3
+
+
+class _YearTable:
+    """单个年份的工作日数据"""
+
+    __slots__ = ('bits', 'prefix', 'positions')
+
+    def __init__(self, bits, days):
+        # bits: 第 i 位为 1 表示该年第 i 天是工作日
+        # prefix[i]: 该年前 i 天中的工作日数
+        # positions[k]: 该年第 k 个工作日（从 0 开始）的年内序号
+        self.bits = bits
+        self.prefix = array('H', bytes(2 * (days + 1)))
+        self.positions = array('H')
+        count = 0
+        for i in range(days):
+            if bits >> i & 1:
+                self.positions.append(i)
+                count += 1
+            self.prefix[i + 1] = count
+
+    @property
+    def total(self):
+        return len(self.positions)
+
+
+class WorkCalendar:
+    """工作日历
+
+    按年份从 holidays 表加载一次数据，生成一个整数位图（第 i 位为 1
+    表示该年第 i 天是工作日）和逐日累计的工作日数数组。之后的工作日
+    判断、工作日加减和间隔计算都只做位运算和数组下标访问，不再访问
+    数据库；跨年计算通过缓存的各年起始累计值完成。
+    """
+
+    _instances = weakref.WeakKeyDictionary()
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db):
+        self.db = db
+        self.logger = logging.getLogger(__name__)
+        self._years = {}
+        # 各年份 1 月 1 日之前的累计工作日数（相对于 _anchor 年）
+        self._anchor = None
+        self._offsets = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_db(cls, db):
+        """获取数据库对应的共享日历实例"""
+        with cls._instances_lock:
+            calendar = cls._instances.get(db)
+            if calendar is None:
+                calendar = cls(db)
+                cls._instances[db] = calendar
+            return calendar
+
+    def _load_year(self, year):
+        """加载指定年份的工作日位图"""
+        start = date(year, 1, 1)
+        days = (date(year + 1, 1, 1) - start).days
+        first_weekday = start.weekday()
+
+        # 默认周一到周五为工作日
+        bits = 0
+        for i in range(days):
+            if (first_weekday + i) % 7 < 5:
+                bits |= 1 << i
+
+        try:
+            # 在写线程中（节假日变更后刷新日历表时）读取的是写连接上尚未提交的数据
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = Holiday.row_factory
+                cursor.execute('''
+                    SELECT date, is_workday
+                    FROM holidays
+                    WHERE date >= ? AND date < ?
+                ''', (start.isoformat(), f"{year + 1}-01-01"))
+                rows = cursor.fetchall()
+            base = start.toordinal()
+            for row in rows:
+                i = row.day - base
+                if row.is_workday:
+                    bits |= 1 << i
+                else:
+                    bits &= ~(1 << i)
+        except (sqlite3.Error, TypeError) as e:
+            self.logger.error(f"Error loading work calendar for {year}: {e}")
+
+        return _YearTable(bits, days)
+
+    def _year(self, year):
+        """获取指定年份的数据，未加载时从数据库加载"""
+        table = self._years.get(year)
+        if table is None:
+            with self._lock:
+                table = self._years.get(year)
+                if table is None:
+                    table = self._load_year(year)
+                    self._years[year] = table
+        return table
+
+    def _year_bits(self, year):
+        """获取指定年份的工作日位图"""
+        return self._year(year).bits
+
+    def _offset(self, year):
+        """指定年份之前的累计工作日数（相对于锚定年份）"""
+        offset = self._offsets.get(year)
+        if offset is not None:
+            return offset
+        with self._lock:
+            if self._anchor is None:
+                self._anchor = year
+                self._offsets[year] = 0
+            # 从最近的已知年份逐年推算并缓存
+            if year > self._anchor:
+                known = max(y for y in self._offsets if y <= year)
+                offset = self._offsets[known]
+                for y in range(known, year):
+                    offset += self._year(y).total
+                    self._offsets[y + 1] = offset
+            else:
+                known = min(y for y in self._offsets if y >= year)
+                offset = self._offsets[known]
+                for y in range(known - 1, year - 1, -1):
+                    offset -= self._year(y).total
+                    self._offsets[y] = offset
+            return self._offsets[year]
+
+    def _rank(self, day):
+        """指定日期之前的累计工作日数"""
+        return self._offset(day.year) + self._year(day.year).prefix[day.timetuple().tm_yday - 1]
+
+    def _workday_at(self, rank, hint_year):
+        """根据累计序号找到对应的工作日"""
+        year = hint_year
+        # 每年至少有 200 多个工作日，据此估算最多需要查找的年数
+        limit = MAX_YEAR_SPAN + abs(rank - self._offset(hint_year)) // 200
+        for _ in range(limit + 1):
+            index = rank - self._offset(year)
+            table = self._year(year)
+            if index < 0:
+                year -= 1
+            elif index >= table.total:
+                year += 1
+            else:
+                return date(year, 1, 1) + timedelta(days=table.positions[index])
+        raise ValueError(f"No workday found near {hint_year}")
+
+    def invalidate(self, year=None):
+        """使指定年份（默认全部）的缓存失效，并同步 work_calendar 表"""
+        self.forget(year)
+        # 表的更新由写线程执行（已在写线程中时直接执行）
+        self.db.writes.call(self._refresh_materialized, year)
+
+    def forget(self, year=None):
+        """只清除指定年份（默认全部）的内存缓存"""
+        with self._lock:
+            if year is None:
+                self._years.clear()
+                self._offsets.clear()
+                self._anchor = None
+            else:
+                self._years.pop(year, None)
+                # 只有锚定年份另一侧的累计值会受影响
+                if self._anchor is not None:
+                    if year >= self._anchor:
+                        stale = [y for y in self._offsets if y > year]
+                    else:
+                        stale = [y for y in self._offsets if y <= year]
+                    for y in stale:
+                        del self._offsets[y]
+
+    def _year_rows(self, year, seq_start):
+        """生成指定年份的 work_calendar 行，返回 (行列表, 工作日数)"""
+        bits = self._year_bits(year)
+        base = date(year, 1, 1).toordinal()
+        days = date(year + 1, 1, 1).toordinal() - base
+        rows = []
+        seq = seq_start
+        for i in range(days):
+            is_workday = bits >> i & 1
+            rows.append((base + i, is_workday, seq))
+            seq += is_workday
+        return rows, seq - seq_start
+
+    def _materialized_range(self, cursor):
+        """获取 work_calendar 表已覆盖的年份范围，表为空时返回 None"""
+        # MIN 和 MAX 分开查询才能各自直接读取主键两端
+        cursor.execute('''
+            SELECT (SELECT MIN(day) FROM work_calendar),
+                   (SELECT MAX(day) FROM work_calendar)
+        ''')
+        lo, hi = cursor.fetchone()
+        if lo is None:
+            return None
+        return date.fromordinal(lo).year, date.fromordinal(hi).year
+
+    def ensure_materialized(self, start_year, end_year):
+        """确保 work_calendar 表覆盖 [start_year, end_year] 的连续年份
+
+        需要扩展时交给后台写线程执行，并等待提交完成，因此不要在界面线程
+        中调用（界面通过后台读线程调用，见 TasksController.fetch_due_buckets）。
+        """
+        with self.db.reader() as conn:
+            current = self._materialized_range(conn.cursor())
+        if current and current[0] <= start_year and end_year <= current[1]:
+            return
+        self.db.writes.call(self._materialize, start_year, end_year)
+
+    def _materialize(self, start_year, end_year):
+        """扩展 work_calendar 表（在写线程中执行）"""
+        with self._lock:
+            cursor = self.db.conn.cursor()
+            current = self._materialized_range(cursor)
+            if current and current[0] <= start_year and end_year <= current[1]:
+                return
+
+            rows = []
+            if current is None:
+                seq = 0
+                for year in range(start_year, end_year + 1):
+                    year_rows, count = self._year_rows(year, seq)
+                    rows.extend(year_rows)
+                    seq += count
+            else:
+                lo, hi = current
+                # 向后扩展：序号接在最后一天之后
+                cursor.execute('''
+                    SELECT workday_seq + is_workday
+                    FROM work_calendar
+                    WHERE day = (SELECT MAX(day) FROM work_calendar)
+                ''')
+                seq = cursor.fetchone()[0]
+                for year in range(hi + 1, end_year + 1):
+                    year_rows, count = self._year_rows(year, seq)
+                    rows.extend(year_rows)
+                    seq += count
+                # 向前扩展：序号从第一天往回倒推
+                cursor.execute('''
+                    SELECT workday_seq
+                    FROM work_calendar
+                    WHERE day = (SELECT MIN(day) FROM work_calendar)
+                ''')
+                seq = cursor.fetchone()[0]
+                for year in range(lo - 1, start_year - 1, -1):
+                    count = bin(self._year_bits(year)).count('1')
+                    seq -= count
+                    year_rows, _ = self._year_rows(year, seq)
+                    rows.extend(year_rows)
+
+            with self.db.transaction("materialize work calendar"):
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO work_calendar (day, is_workday, workday_seq)
+                    VALUES (?, ?, ?)
+                ''', rows)
+
+    def _refresh_materialized(self, year=None):
+        """节假日变更后重建 work_calendar 表中受影响的年份"""
+        try:
+            with self._lock:
+                with self.db.transaction("refresh work calendar"):
+                    cursor = self.db.conn.cursor()
+                    current = self._materialized_range(cursor)
+                    if current is None:
+                        return
+                    if year is None:
+                        cursor.execute('DELETE FROM work_calendar')
+                        self._materialize(*current)
+                        return
+                    if not current[0] <= year <= current[1]:
+                        return
+
+                    start = date(year, 1, 1).toordinal()
+                    end = date(year + 1, 1, 1).toordinal()
+                    cursor.execute('''
+                        SELECT MIN(workday_seq), SUM(is_workday)
+                        FROM work_calendar
+                        WHERE day >= ? AND day < ?
+                    ''', (start, end))
+                    seq_start, old_count = cursor.fetchone()
+                    rows, new_count = self._year_rows(year, seq_start)
+                    cursor.executemany('''
+                        INSERT OR REPLACE INTO work_calendar (day, is_workday, workday_seq)
+                        VALUES (?, ?, ?)
+                    ''', rows)
+                    # 之后所有日期的序号整体平移
+                    if new_count != old_count:
+                        cursor.execute('''
+                            UPDATE work_calendar
+                            SET workday_seq = workday_seq + ?
+                            WHERE day >= ?
+                        ''', (new_count - old_count, end))
+        except sqlite3.Error as e:
+            self.logger.error(f"Error refreshing work calendar table: {e}")
+
+    def is_workday(self, day):
+        """检查日期是否为工作日"""
+        bits = self._year_bits(day.year)
+        return bool(bits >> (day.timetuple().tm_yday - 1) & 1)
+
+    def is_holiday(self, day):
+        """检查日期是否为节假日（包括周末）"""
+        return not self.is_workday(day)
+
+    def workdays_between(self, start, end):
+        """计算 [start, end) 之间的工作日数，end 早于 start 时返回负数"""
+        return self._rank(end) - self._rank(start)
+
+    def nth_workday_before(self, day, n):
+        """获取指定日期之前的第 n 个工作日（n=1 即前一个工作日）"""
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        return self._workday_at(self._rank(day) - n, day.year)
+
+    def add_workdays(self, day, n):
+        """获取指定日期之后（n 为负数时为之前）的第 |n| 个工作日，n=0 返回原日期"""
+        if n == 0:
+            return day
+        if n < 0:
+            return self.nth_workday_before(day, -n)
+        return self._workday_at(self._rank(day) + self.is_workday(day) + n - 1, day.year)
@@ -0,0 +1,248 @@
+import csv
+import gzip
+import json
+import logging
+import re
+import sqlite3
+import time
+from collections import namedtuple
+from pathlib import Path
+
+# 导出的表，按恢复顺序排列（分类在书签之前）
+EXPORT_TABLES = ('categories', 'bookmarks', 'pending_tasks', 'tasks_archive',
+                 'file_shortcuts', 'holidays')
+
+# 每次从游标取出的行数
+FETCH_SIZE = 1000
+
+# 恢复时每个事务写入的行数
+RESTORE_CHUNK_SIZE = 1000
+
+# 文件写入缓冲区大小
+_BUFFER_SIZE = 1024 * 1024
+
+FORMATS = ('csv', 'jsonl')
+
+# CSV 中表示 NULL 的字段值，空字段仍是空字符串；恰好由反斜杠加 N 组成的
+# 文本（如 \N 本身）导出时多加一个反斜杠，读取时去掉
+CSV_NULL = '\\N'
+_CSV_NULL_LIKE = re.compile(r'\\+N')
+
+# 一张表的恢复结果：写入的行数，以及与现有数据的唯一键冲突而跳过的行数
+TableRestore = namedtuple('TableRestore', ['restored', 'skipped'])
+
+logger = logging.getLogger(__name__)
+
+
+def _open_text(path, mode):
+    """打开导出文件，.gz 结尾时使用 gzip 压缩"""
+    if path.suffix == '.gz':
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='', buffering=_BUFFER_SIZE)
+
+
+def export_path(directory, table, fmt='jsonl', compress=False):
+    """表对应的导出文件路径，如 bookmarks.jsonl.gz"""
+    return Path(directory) / f"{table}.{fmt}{'.gz' if compress else ''}"
+
+
+def _find_export(directory, table):
+    """查找表的导出文件，返回 (路径, 格式)，不存在时返回 (None, None)"""
+    for fmt in FORMATS:
+        for compress in (False, True):
+            path = export_path(directory, table, fmt, compress)
+            if path.exists():
+                return path, fmt
+    return None, None
+
+
+def _iter_rows(cursor):
+    """用 fetchmany 分批读取游标，内存占用与表大小无关"""
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            return
+        yield from rows
+
+
+def _to_csv(value):
+    """导出到 CSV 的字段值：NULL 写为 CSV_NULL"""
+    if value is None:
+        return CSV_NULL
+    if isinstance(value, str) and _CSV_NULL_LIKE.fullmatch(value):
+        return '\\' + value
+    return value
+
+
+def _from_csv(value):
+    """CSV 字段还原为数据库值，_to_csv 的逆操作"""
+    if value == CSV_NULL:
+        return None
+    if _CSV_NULL_LIKE.fullmatch(value):
+        return value[1:]
+    return value
+
+
+def _write_table(conn, table, path, fmt):
+    """把一张表写入导出文件，返回行数"""
+    cursor = conn.execute(f'SELECT * FROM "{table}" ORDER BY rowid')
+    columns = [column[0] for column in cursor.description]
+    count = 0
+    with _open_text(path, 'w') as out:
+        if fmt == 'csv':
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            for row in _iter_rows(cursor):
+                writer.writerow([_to_csv(value) for value in row])
+                count += 1
+        else:
+            for row in _iter_rows(cursor):
+                out.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+                out.write('\n')
+                count += 1
+    return count
+
+
+def export_workspace(db, directory, fmt='jsonl', compress=False, tables=EXPORT_TABLES):
+    """把工作区数据导出到目录，每张表一个 CSV 或 JSON Lines 文件
+
+    所有表在同一个只读事务中读取，导出内容是同一时刻的快照。
+    Returns:
+        {表名: 导出行数}
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    counts = {}
+    started = time.perf_counter()
+    with db.reader() as conn:
+        # 内存数据库的读取使用写连接，此时不另开事务
+        snapshot = conn is not db.conn and not conn.in_transaction
+        if snapshot:
+            conn.execute("BEGIN")
+        try:
+            for table in tables:
+                counts[table] = _write_table(conn, table, export_path(directory, table, fmt, compress), fmt)
+        finally:
+            if snapshot:
+                conn.rollback()
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.info(f"Exported {sum(counts.values())} rows to {directory} in {elapsed:.1f} ms")
+    return counts
+
+
+def _read_rows(path, fmt):
+    """逐行读取导出文件，产生 {列名: 值}；CSV 中的 CSV_NULL 还原为 NULL"""
+    with _open_text(path, 'r') as source:
+        if fmt == 'csv':
+            reader = csv.reader(source)
+            columns = next(reader, None)
+            if columns is None:
+                return
+            for row in reader:
+                yield {column: _from_csv(value) for column, value in zip(columns, row)}
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _upsert_sql(table, columns):
+    """按主键合并的插入语句：id 相同时更新该行，不影响其他行"""
+    placeholders = ', '.join('?' for _ in columns)
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    sql = f'INSERT INTO "{table}" ({column_list}) VALUES ({placeholders})'
+    if 'id' not in columns:
+        return sql
+    updates = ', '.join(f'"{column}" = excluded."{column}"' for column in columns if column != 'id')
+    return sql + (f' ON CONFLICT(id) DO UPDATE SET {updates}' if updates
+                  else ' ON CONFLICT(id) DO NOTHING')
+
+
+def _restore_chunk(db, table, columns, rows):
+    """在写线程中把一批行按主键合并到表中
+
+    与其他唯一键（如分类名称、同一分类下的 URL）冲突的行被跳过，
+    已有的行不会被删除。
+    Returns:
+        (写入的行数, 因唯一键冲突跳过的行数)
+    """
+    sql = _upsert_sql(table, columns)
+    with db.transaction(f"restore {table}"):
+        try:
+            with db.transaction():
+                db.conn.executemany(sql, rows)
+            return len(rows), 0
+        except sqlite3.IntegrityError:
+            pass
+        # 整批中有冲突的行：逐行写入，冲突的语句只撤销其自身
+        restored = 0
+        for row in rows:
+            try:
+                db.conn.execute(sql, row)
+                restored += 1
+            except sqlite3.IntegrityError:
+                pass
+    return restored, len(rows) - restored
+
+
+def _category_ids_by_name(db):
+    with db.reader() as conn:
+        return {name: id for id, name in conn.execute('SELECT id, name FROM categories')}
+
+
+def restore_workspace(db, directory, tables=EXPORT_TABLES, chunk_size=RESTORE_CHUNK_SIZE):
+    """从 export_workspace 的导出目录恢复数据
+
+    文件逐行读取，每 chunk_size 行交给写线程作为一个事务提交。相同主键的
+    行被更新，其他已有数据保留。导出中的分类与现有分类同名但 id 不同时，
+    合并到现有分类，其书签改为指向现有分类；其余与唯一键冲突的行跳过
+    并计入 skipped。只写入当前表结构中存在的列。
+    Returns:
+        {表名: TableRestore(restored, skipped)}
+    """
+    results = {}
+    # 导出中的分类 id -> 现有同名分类的 id
+    category_map = {}
+    started = time.perf_counter()
+    for table in tables:
+        path, fmt = _find_export(directory, table)
+        if path is None:
+            continue
+        with db.reader() as conn:
+            known = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+        existing_categories = _category_ids_by_name(db) if table == 'categories' else None
+
+        columns = None
+        chunk = []
+        restored = skipped = 0
+        for record in _read_rows(path, fmt):
+            if columns is None:
+                columns = [column for column in record if column in known]
+            if existing_categories is not None:
+                local_id = existing_categories.get(record.get('name'))
+                if local_id is not None and str(local_id) != str(record.get('id')):
+                    category_map[str(record.get('id'))] = local_id
+                    skipped += 1
+                    continue
+            elif table == 'bookmarks' and category_map:
+                category_id = str(record.get('category_id'))
+                if category_id in category_map:
+                    record['category_id'] = category_map[category_id]
+            chunk.append(tuple(record.get(column) for column in columns))
+            if len(chunk) >= chunk_size:
+                done, conflicts = db.writes.call(_restore_chunk, db, table, columns, chunk)
+                restored, skipped = restored + done, skipped + conflicts
+                chunk = []
+        if chunk:
+            done, conflicts = db.writes.call(_restore_chunk, db, table, columns, chunk)
+            restored, skipped = restored + done, skipped + conflicts
+        results[table] = TableRestore(restored, skipped)
+        if skipped:
+            logger.warning(f"Restore {table}: skipped {skipped} rows conflicting with existing data")
+    elapsed = (time.perf_counter() - started) * 1000
+    total = sum(result.restored for result in results.values())
+    logger.info(f"Restored {total} rows from {directory} in {elapsed:.1f} ms")
+    return results
@@ -0,0 +1,293 @@
+import queue
+import sqlite3
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# 一次组提交最多合并的写操作数
+MAX_BATCH_SIZE = 64
+
+# 每个写操作使用的保存点名称
+_SAVEPOINT = "write_command"
+
+_WriteCommand = namedtuple('_WriteCommand', [
+    'func', 'args', 'kwargs', 'future', 'on_done', 'on_error', 'description'
+])
+
+
+class TransactionStats:
+    """一个工作单元的执行统计"""
+
+    __slots__ = ('nested', 'statements', 'elapsed_ms')
+
+    def __init__(self, nested):
+        self.nested = nested
+        self.statements = 0
+        self.elapsed_ms = 0.0
+
+
+class _CountingCursor(sqlite3.Cursor):
+    """记录执行语句数的游标"""
+
+    def execute(self, *args, **kwargs):
+        self.connection.statements += 1
+        return super().execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self.connection.statements += 1
+        return super().executemany(*args, **kwargs)
+
+
+class WriterConnection(sqlite3.Connection):
+    """写连接
+
+    写连接由一个线程“持有”期间（后台写线程的一批写操作，或 transaction()
+    工作单元），模型方法中的 commit() 延后到最外层统一提交，rollback()
+    只回滚到最内层的保存点。其他线程在此期间提交时会等待持有者结束。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_lock = threading.RLock()
+        self.owner_thread = None
+        self.savepoints = []
+        self.statements = 0
+        self.unit_depth = 0
+        self._after_transaction = []
+
+    def held_by_current_thread(self):
+        """当前线程是否持有写连接（写线程的批量事务或 transaction() 工作单元中）"""
+        return self.owner_thread == threading.get_ident()
+
+    def _deferred(self):
+        return self.held_by_current_thread()
+
+    def after_transaction(self, callback):
+        """在当前最外层事务结束（提交或回滚）后调用 callback()
+
+        用于在写入可见之后再清除缓存；当前线程不持有写连接时（事务已提交）
+        直接调用。
+        """
+        if self.held_by_current_thread():
+            self._after_transaction.append(callback)
+        else:
+            callback()
+
+    def run_after_transaction(self):
+        """执行并清空 after_transaction() 登记的回调（由持有者在事务结束后调用）"""
+        callbacks, self._after_transaction = self._after_transaction, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Error in after-transaction callback: {e}")
+
+    def cursor(self, factory=_CountingCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args, **kwargs):
+        self.statements += 1
+        return super().execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self.statements += 1
+        return super().executemany(*args, **kwargs)
+
+    def commit(self):
+        if self._deferred():
+            return
+        with self.batch_lock:
+            super().commit()
+
+    def rollback(self):
+        if self._deferred():
+            if self.savepoints:
+                super().execute(f"ROLLBACK TO {self.savepoints[-1]}")
+            return
+        with self.batch_lock:
+            super().rollback()
+
+    @contextmanager
+    def savepoint(self, name):
+        """在当前事务中建立保存点；异常时回滚到保存点并继续抛出"""
+        super().execute(f"SAVEPOINT {name}")
+        self.savepoints.append(name)
+        try:
+            yield
+        except BaseException:
+            super().execute(f"ROLLBACK TO {name}")
+            raise
+        finally:
+            self.savepoints.pop()
+            super().execute(f"RELEASE {name}")
+
+    @contextmanager
+    def transaction(self):
+        """可嵌套的工作单元
+
+        最外层开启事务并在结束时提交一次，内层使用保存点，失败时只撤销
+        该层的修改。在后台写线程的批量事务中使用时，最外层同样只是一个
+        保存点，由写线程统一提交。返回 TransactionStats。
+        """
+        outermost = False
+        try:
+            with self.batch_lock:
+                outermost = not self._deferred()
+                stats = TransactionStats(nested=self.unit_depth > 0)
+                started = time.perf_counter()
+                statements = self.statements
+                self.unit_depth += 1
+                try:
+                    if outermost:
+                        self.owner_thread = threading.get_ident()
+                        try:
+                            if not self.in_transaction:
+                                super().execute("BEGIN")
+                            yield stats
+                        except BaseException:
+                            self.owner_thread = None
+                            super().rollback()
+                            raise
+                        self.owner_thread = None
+                        super().commit()
+                    else:
+                        with self.savepoint(f"unit_of_work_{len(self.savepoints)}"):
+                            yield stats
+                finally:
+                    self.unit_depth -= 1
+                    if outermost:
+                        self.owner_thread = None
+                    stats.statements = self.statements - statements
+                    stats.elapsed_ms = (time.perf_counter() - started) * 1000
+        finally:
+            if outermost:
+                self.run_after_transaction()
+
+
+class WriteQueue:
+    """后台单写线程
+
+    写操作（通常是模型的写方法）通过 submit() 放入队列，由拥有写连接的
+    后台线程执行。同一时间到达的多个写操作合并到一个事务中提交，每个写操作
+    各自使用一个保存点，失败时只回滚自己。完成或失败的回调通过
+    set_dispatcher() 设置的调度函数交回界面线程执行。
+    """
+
+    def __init__(self, conn, max_batch_size=MAX_BATCH_SIZE):
+        self.conn = conn
+        self.max_batch_size = max_batch_size
+        self.logger = logging.getLogger(__name__)
+        self._queue = queue.Queue()
+        self._dispatch = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def set_dispatcher(self, dispatch):
+        """设置回调的执行方式，dispatch(callback, arg)；未设置时在写线程中直接回调"""
+        self._dispatch = dispatch
+
+    def submit(self, func, *args, on_done=None, on_error=None, description=None, **kwargs):
+        """提交一个写操作，返回 Future
+
+        on_done(结果) / on_error(异常) 在写操作所在的事务提交（或失败）后回调。
+        """
+        if self._closed:
+            raise RuntimeError("Write queue is closed")
+        future = Future()
+        self._queue.put(_WriteCommand(func, args, kwargs, future, on_done, on_error,
+                                      description or func.__name__))
+        return future
+
+    def call(self, func, *args, **kwargs):
+        """同步执行写操作并等待提交完成（在写线程中调用时直接执行）"""
+        if threading.get_ident() == self._thread.ident:
+            return func(*args, **kwargs)
+        return self.submit(func, *args, **kwargs).result()
+
+    def notify(self, callback, value):
+        """通过调度函数回调 callback(value)（可在任意线程调用，如后台导入线程）"""
+        if self._dispatch is not None:
+            self._dispatch(callback, value)
+            return
+        try:
+            callback(value)
+        except Exception as e:
+            self.logger.error(f"Error in write callback: {e}")
+
+    def close(self, timeout=5):
+        """处理完队列中剩余的写操作后停止写线程"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            command = self._queue.get()
+            if command is None:
+                return
+            batch = [command]
+            stop = False
+            while len(batch) < self.max_batch_size:
+                try:
+                    command = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if command is None:
+                    stop = True
+                    break
+                batch.append(command)
+            self._execute_batch(batch)
+            if stop:
+                return
+
+    def _execute_batch(self, batch):
+        """在一个事务中执行一批写操作"""
+        started = time.perf_counter()
+        statements = self.conn.statements
+        results = []
+        with self.conn.batch_lock:
+            self.conn.owner_thread = threading.get_ident()
+            try:
+                self.conn.execute("BEGIN")
+                for command in batch:
+                    try:
+                        with self.conn.savepoint(_SAVEPOINT):
+                            value = command.func(*command.args, **command.kwargs)
+                        results.append((True, value))
+                    except Exception as e:
+                        results.append((False, e))
+                self.conn.owner_thread = None
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.owner_thread = None
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                self.logger.error(f"Write batch of {len(batch)} failed: {e}")
+                results = [(False, e)] * len(batch)
+        self.conn.run_after_transaction()
+
+        elapsed = (time.perf_counter() - started) * 1000
+        self.logger.debug(
+            f"Committed {len(batch)} writes ({self.conn.statements - statements} statements) "
+            f"in {elapsed:.1f} ms"
+        )
+        for command, (ok, value) in zip(batch, results):
+            self._finish(command, ok, value)
+
+    def _finish(self, command, ok, value):
+        """设置 Future 的结果并安排回调"""
+        if ok:
+            command.future.set_result(value)
+            callback = command.on_done
+        else:
+            self.logger.error(f"Error {command.description}: {value}")
+            command.future.set_exception(value)
+            callback = command.on_error
+        if callback is not None:
+            self.notify(callback, value)
@@ -3,6 +3,8 @@ from tkinter import ttk, messagebox, filedialog
 import logging
 import webbrowser
 from ..controllers.bookmarks_controller import BookmarksController
+from ..models.bookmarks_model import DuplicateBookmarkError
+from .paged_list import PagedList
 
 class BookmarksView(ttk.Frame):
     def __init__(self, parent, db):
@@ -57,31 +59,49 @@ class BookmarksView(ttk.Frame):
         selected = self.category_tree.selection()
         if selected:
             category_id = selected[0]
+            self.current_category_id = category_id
+
+            def failed(e):
+                self.pages.reload_failed()
+                messagebox.showerror("错误", "加载书签失败")
             try:
-                # 加载该分类下的书签
-                bookmarks = self.controller.get_bookmarks(category_id)
-                # 清空当前书签列表
-                self.bookmarks_list.delete(*self.bookmarks_list.get_children())
-                # 添加书签到列表
-                for bookmark in bookmarks:
-                    # 使用索引访问，如果没有 username 则显示'abc'
-                    username = bookmark['username'] if 'username' in bookmark.keys() else 'abc'
-                    self.bookmarks_list.insert('', 'end', iid=bookmark['id'],
-                        values=(bookmark['name'], username, bookmark['browser']))
-                # 调整高度
-                self.after(100, self.adjust_bookmarks_height)
+                # 在后台加载该分类下的第一页书签，快速切换分类时只显示最后一次的结果
+                self.pages.begin_reload()
+                self.controller.fetch_bookmarks(
+                    category_id, on_done=self.show_bookmarks, on_error=failed)
             except Exception as e:
+                self.pages.reload_failed()
                 self.logger.error(f"Error loading bookmarks for category: {e}")
                 messagebox.showerror("错误", "加载书签失败")
 
+    def fetch_more_bookmarks(self, token, on_done, on_error):
+        """在后台加载当前分类的下一页书签"""
+        self.controller.fetch_bookmarks(
+            self.current_category_id, token, on_done=on_done, on_error=on_error)
+
+    def show_bookmarks(self, page):
+        """显示第一页书签"""
+        self.pages.show(page)
+        # 调整高度
+        self.after(100, self.adjust_bookmarks_height)
+
+    def insert_bookmark(self, bookmark):
+        """在列表末尾插入一个书签"""
+        # 没有 username 时显示'abc'
+        self.bookmarks_list.insert('', 'end', iid=bookmark.id,
+            values=(bookmark.name, bookmark.username or 'abc', bookmark.browser))
+
     def add_category(self):
         """添加分类"""
         dialog = CategoryDialog(self, "添加分类")
         if dialog.result:
             try:
-                self.controller.add_category(dialog.result['name'])
-                self.load_bookmarks()
-                messagebox.showinfo("成功", "分类添加成功")
+                def done(_):
+                    self.load_bookmarks()
+                    messagebox.showinfo("成功", "分类添加成功")
+                self.controller.add_category(
+                    dialog.result['name'], on_done=done,
+                    on_error=lambda e: messagebox.showerror("错误", "添加分类失败"))
             except Exception as e:
                 self.logger.error(f"Error adding category: {e}")
                 messagebox.showerror("错误", "添加分类失败")
@@ -99,9 +119,12 @@ class BookmarksView(ttk.Frame):
         
         if dialog.result:
             try:
-                self.controller.update_category(category_id, dialog.result['name'])
-                self.load_bookmarks()
-                messagebox.showinfo("成功", "分类更新成功")
+                def done(_):
+                    self.load_bookmarks()
+                    messagebox.showinfo("成功", "分类更新成功")
+                self.controller.update_category(
+                    category_id, dialog.result['name'], on_done=done,
+                    on_error=lambda e: messagebox.showerror("错误", "更新分类失败"))
             except Exception as e:
                 self.logger.error(f"Error updating category: {e}")
                 messagebox.showerror("错", "更新分类失败")
@@ -116,9 +139,12 @@ class BookmarksView(ttk.Frame):
         if messagebox.askyesno("确认", "删除分类将同时删除该分类下的所有书签，确定要继续吗？"):
             try:
                 category_id = selected[0]
-                self.controller.delete_category(category_id)
-                self.load_bookmarks()
-                messagebox.showinfo("成功", "分类删除成功")
+                def done(_):
+                    self.load_bookmarks()
+                    messagebox.showinfo("成功", "分类删除成功")
+                self.controller.delete_category(
+                    category_id, on_done=done,
+                    on_error=lambda e: messagebox.showerror("错误", "删除分类失败"))
             except Exception as e:
                 self.logger.error(f"Error deleting category: {e}")
                 messagebox.showerror("错误", "删除分类失败")
@@ -272,7 +298,7 @@ class BookmarksView(ttk.Frame):
         try:
             # 清空现有数据
             self.category_tree.delete(*self.category_tree.get_children())
-            self.bookmarks_list.delete(*self.bookmarks_list.get_children())
+            self.pages.clear()
             
             # 加载分类
             categories = self.controller.get_categories()
@@ -297,15 +323,9 @@ class BookmarksView(ttk.Frame):
                 self.category_tree.focus(selected_id)
                 self.category_tree.see(selected_id)
                 
-                # 加载选中分类的书签
-                bookmarks = self.controller.get_bookmarks(selected_id)
-                for bookmark in bookmarks:
-                    # 使用索引访问，如果没有 username 则显示'abc'
-                    username = bookmark['username'] if 'username' in bookmark.keys() else 'abc'
-                    self.bookmarks_list.insert('', 'end', iid=bookmark['id'],
-                        values=(bookmark['name'], 
-                               username,  # 使用变量而不是 get 方法
-                               bookmark['browser']))
+                # 加载选中分类的第一页书签
+                self.current_category_id = selected_id
+                self.pages.show(self.controller.get_bookmarks_page(selected_id))
                 
                 # 加完成后调整高度
                 self.after(200, self.adjust_bookmarks_height)
@@ -325,16 +345,20 @@ class BookmarksView(ttk.Frame):
         dialog = BookmarkDialog(self, "添加书签")
         if dialog.result:
             try:
+                def done(_):
+                    self.on_category_select(None)  # 刷新书签列表
+                    # 调整高度
+                    self.after(100, self.adjust_bookmarks_height)
+                    messagebox.showinfo("成功", "书签添加成功")
                 self.controller.add_bookmark(
                     category_id=category_id,
                     name=dialog.result['name'],
                     url=dialog.result['url'],
-                    browser=dialog.result['browser']
+                    browser=dialog.result['browser'],
+                    on_done=done,
+                    on_error=lambda e: messagebox.showerror(
+                        "错误", str(e) if isinstance(e, DuplicateBookmarkError) else "添加书签失败")
                 )
-                self.on_category_select(None)  # 刷新书签列表
-                # 调整高度
-                self.after(100, self.adjust_bookmarks_height)
-                messagebox.showinfo("成功", "书签添加成功")
             except Exception as e:
                 self.logger.error(f"Error adding bookmark: {e}")
                 messagebox.showerror("错误", "添加书签失败")
@@ -354,16 +378,20 @@ class BookmarksView(ttk.Frame):
             
             if dialog.result:
                 try:
+                    def done(_):
+                        self.on_category_select(None)  # 刷新书签列表
+                        # 调整高度
+                        self.after(100, self.adjust_bookmarks_height)
+                        messagebox.showinfo("成功", "书签更新成功")
                     self.controller.update_bookmark(
                         bookmark_id=bookmark_id,
                         name=dialog.result['name'],
                         url=dialog.result['url'],
-                        browser=dialog.result['browser']
+                        browser=dialog.result['browser'],
+                        on_done=done,
+                        on_error=lambda e: messagebox.showerror(
+                            "错误", str(e) if isinstance(e, DuplicateBookmarkError) else "更新书签失败")
                     )
-                    self.on_category_select(None)  # 刷新书签列表
-                    # 调整高度
-                    self.after(100, self.adjust_bookmarks_height)
-                    messagebox.showinfo("成功", "书签更新成功")
                 except Exception as e:
                     self.logger.error(f"Error updating bookmark: {e}")
                     messagebox.showerror("错误", "更新书签失败")
@@ -378,11 +406,14 @@ class BookmarksView(ttk.Frame):
         if messagebox.askyesno("确认", "确定要删除选中的书签吗？"):
             try:
                 bookmark_id = selected[0]
-                self.controller.delete_bookmark(bookmark_id)
-                self.on_category_select(None)  # 刷新书签列表
-                # 调整高度
-                self.after(100, self.adjust_bookmarks_height)
-                messagebox.showinfo("成功", "书签删除成功")
+                def done(_):
+                    self.on_category_select(None)  # 刷新书签列表
+                    # 调整高度
+                    self.after(100, self.adjust_bookmarks_height)
+                    messagebox.showinfo("成功", "书签删除成功")
+                self.controller.delete_bookmark(
+                    bookmark_id, on_done=done,
+                    on_error=lambda e: messagebox.showerror("错误", "删除书签失败"))
             except Exception as e:
                 self.logger.error(f"Error deleting bookmark: {e}")
                 messagebox.showerror("错误", "删除书签失败")
@@ -410,33 +441,6 @@ class BookmarksView(ttk.Frame):
             # 如果当前选中的标签是书签管理，调整高度
             self.after(100, self.adjust_bookmarks_height)
 
-    def get_category_id(self, category_name):
-        """根据分类名称获取分类ID，如果不存在则创建新分类"""
-        try:
-            # 先查找是否存在该分类
-            for item in self.category_tree.get_children():
-                if self.category_tree.item(item)['text'] == category_name:
-                    return item
-                    
-            # 如果不存在，创建新分类
-            new_category_id = self.controller.add_category(category_name)
-            # 刷新分类树，但不刷新整个界面
-            self.refresh_categories()
-            return new_category_id
-            
-        except Exception as e:
-            self.logger.error(f"Error getting/creating category ID: {e}")
-            raise
-
-    def check_bookmark_exists(self, category_id, url):
-        """检查指定分类下是否存在相同URL的书签"""
-        try:
-            bookmarks = self.controller.get_bookmarks(category_id)
-            return any(bookmark['url'] == url for bookmark in bookmarks)
-        except Exception as e:
-            self.logger.error(f"Error checking bookmark existence: {e}")
-            return False
-
     def refresh_categories(self):
         """只刷新分类树"""
         try:
@@ -464,55 +468,40 @@ class BookmarksView(ttk.Frame):
         """处理批量导入"""
         file_path = filedialog.askopenfilename(
             title="选择导入文件",
-            filetypes=[("CSV 文件", "*.csv"), ("文本文件", "*.txt"), ("所有文件", "*.*")]
+            filetypes=[("CSV 文件", "*.csv"), ("浏览器导出的书签", "*.html *.htm"),
+                       ("Chrome/Edge 书签文件", "Bookmarks *.json"),
+                       ("文本文件", "*.txt"), ("所有文件", "*.*")]
         )
         
         if not file_path:
             return
             
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                lines = file.readlines()
-                
-            bookmarks_data = []
-            skipped_count = 0  # 记录跳过的重复书签数量
-            
-            for line in lines:
-                if line.strip():
-                    category, name, url, username, browser = line.strip().split(',')
-                    
-                    # 获取分类ID（如果不存在会自动创建）
-                    category_id = self.get_category_id(category.strip())
-                    
-                    # 检查URL是否已存在
-                    if self.check_bookmark_exists(category_id, url.strip()):
-                        skipped_count += 1
-                        continue
-                    
-                    bookmarks_data.append({
-                        'category_id': category_id,
-                        'name': name.strip(),
-                        'url': url.strip(),
-                        'username': username.strip(),
-                        'browser': browser.strip()
-                    })
-            
-            if bookmarks_data:
-                success_count = self.controller.import_bookmarks(bookmarks_data)
-                message = f"成功导入 {success_count} 个书签"
-                if skipped_count > 0:
-                    message += f"\n跳过 {skipped_count} 个重复的书签"
-                messagebox.showinfo("导入结果", message)
-            else:
-                if skipped_count > 0:
-                    messagebox.showinfo("导入结果", f"所有 {skipped_count} 个书签都已存在，未导入任何新书签")
-                else:
-                    messagebox.showwarning("导入结果", "没有可导入的书签数据")
-                
-                self.refresh_bookmarks()  # 刷新列表
-                
-        except Exception as e:
+        dialog = ImportProgressDialog(self, "导入书签")
+        
+        def done(result):
+            dialog.destroy()
+            message = f"成功导入 {result.imported} 个书签"
+            if result.skipped > 0:
+                message += f"\n跳过 {result.skipped} 个重复的书签"
+            if result.invalid > 0:
+                message += f"\n忽略 {result.invalid} 行格式错误的数据"
+            if result.cancelled:
+                message = "导入已取消，已导入的部分会保留\n" + message
+            elif not result.rows:
+                message = "没有可导入的书签数据"
+            messagebox.showinfo("导入结果", message)
+            self.refresh_categories()
+            self.refresh_bookmarks()  # 刷新列表
+        
+        def failed(e):
+            dialog.destroy()
             messagebox.showerror("导入失败", f"导入过程中出现错误：{str(e)}")
+            self.refresh_categories()
+            self.refresh_bookmarks()
+        
+        # 在后台线程中逐行解析并分块写入，界面只接收进度
+        dialog.job = self.controller.import_bookmarks_file(
+            file_path, on_progress=dialog.update_progress, on_done=done, on_error=failed)
 
     def create_bookmarks_list(self):
         """创建书签列表"""
@@ -551,6 +540,11 @@ class BookmarksView(ttk.Frame):
         # 保存当前高亮的项目ID
         self.current_hover_item = None
 
+        # 书签按页加载，滚动到接近底部时加载当前分类的下一页
+        self.current_category_id = None
+        self.pages = PagedList(self.bookmarks_list, self.fetch_more_bookmarks,
+                               self.insert_bookmark)
+
     def refresh_bookmarks(self):
         """刷新书签列表"""
         try:
@@ -657,4 +651,39 @@ class BookmarkDialog(tk.Toplevel):
 
     def cancel(self):
         """取消按钮回调"""
-        self.destroy()
\ No newline at end of file
+        self.destroy()
+
+class ImportProgressDialog(tk.Toplevel):
+    """导入进度对话框，显示已处理的比例并允许取消"""
+
+    def __init__(self, parent, title):
+        super().__init__(parent)
+        self.title(title)
+        self.job = None
+        self.resizable(False, False)
+        
+        self.status_label = ttk.Label(self, text="正在读取文件...")
+        self.status_label.grid(row=0, column=0, padx=10, pady=(10, 5), sticky='w')
+        
+        self.progress = ttk.Progressbar(self, length=300, maximum=100, mode='determinate')
+        self.progress.grid(row=1, column=0, padx=10, pady=5)
+        
+        self.cancel_btn = ttk.Button(self, text="取消", command=self.cancel)
+        self.cancel_btn.grid(row=2, column=0, pady=10)
+        
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.transient(parent)
+        self.grab_set()
+
+    def update_progress(self, progress):
+        """显示导入进度（ImportProgress）"""
+        self.progress['value'] = progress.fraction * 100
+        self.status_label.configure(
+            text=f"已处理 {progress.rows} 行，导入 {progress.imported} 个，跳过 {progress.skipped} 个")
+
+    def cancel(self):
+        """请求取消导入，当前批次提交后停止"""
+        if self.job is not None:
+            self.job.cancel()
+        self.cancel_btn.configure(state='disabled')
+        self.status_label.configure(text="正在取消...")
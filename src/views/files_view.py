@@ -77,28 +77,35 @@ class FilesView(ttk.Frame):
     def load_files(self):
         """加载文件列表"""
         try:
-            # 清空现有数据
-            self.files_list.delete(*self.files_list.get_children())
-            
-            # 加载文件数据
-            files = self.controller.get_files()
-            for file in files:
-                self.files_list.insert('', 'end', iid=file['id'],
-                                     values=(file['name'], file['file_path']))
+            # 在后台读线程中加载文件数据，完成后在主线程中显示
+            self.controller.fetch_files(
+                on_done=self.show_files,
+                on_error=lambda e: messagebox.showerror("错误", "加载文件列表失败"))
         except Exception as e:
             self.logger.error(f"Error loading files: {e}")
             messagebox.showerror("错误", "加载文件列表失败")
 
+    def show_files(self, files):
+        """显示文件列表"""
+        # 清空现有数据
+        self.files_list.delete(*self.files_list.get_children())
+        for file in files:
+            self.files_list.insert('', 'end', iid=file['id'],
+                                 values=(file['name'], file['file_path']))
+
     def add_file(self):
         """添加文件"""
         try:
             # 打开文件选择对话框
             file_path = filedialog.askopenfilename(title="选择文件")
             if file_path:
-                # 调用控制器添加文件
-                self.controller.add_file(file_path)
-                self.load_files()  # 重新加载列表
-                messagebox.showinfo("成功", "文件添加成功")
+                # 调用控制器添加文件，写入完成后重新加载列表
+                def done(_):
+                    self.load_files()
+                    messagebox.showinfo("成功", "文件添加成功")
+                self.controller.add_file(
+                    file_path, on_done=done,
+                    on_error=lambda e: messagebox.showerror("错误", "添加文件失败"))
         except Exception as e:
             self.logger.error(f"Error adding file: {e}")
             messagebox.showerror("错误", "添加文件失败")
@@ -121,9 +128,12 @@ class FilesView(ttk.Frame):
             )
             
             if new_path:
-                self.controller.update_file(file_id, new_path)
-                self.load_files()
-                messagebox.showinfo("成功", "文件路径更新成功")
+                def done(_):
+                    self.load_files()
+                    messagebox.showinfo("成功", "文件路径更新成功")
+                self.controller.update_file(
+                    file_id, new_path, on_done=done,
+                    on_error=lambda e: messagebox.showerror("错误", "编辑文件失败"))
         except Exception as e:
             self.logger.error(f"Error editing file: {e}")
             messagebox.showerror("错误", "编辑文件失败")
@@ -138,9 +148,12 @@ class FilesView(ttk.Frame):
         if messagebox.askyesno("确认", "确定要删除选中的文件快捷方式吗？"):
             try:
                 file_id = selected[0]
-                self.controller.delete_file(file_id)
-                self.load_files()
-                messagebox.showinfo("成功", "文件删除成功")
+                def done(_):
+                    self.load_files()
+                    messagebox.showinfo("成功", "文件删除成功")
+                self.controller.delete_file(
+                    file_id, on_done=done,
+                    on_error=lambda e: messagebox.showerror("错误", "删除文件失败"))
             except Exception as e:
                 self.logger.error(f"Error deleting file: {e}")
                 messagebox.showerror("错误", "删除文件失败")
@@ -1,8 +1,10 @@
 import tkinter as tk
 from tkinter import ttk
+import calendar
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime
 from ..controllers.tasks_controller import TasksController
+from .holiday_year_view import HolidayYearView
 import tkinter.messagebox as messagebox
 
 class HolidayView(ttk.Frame):
@@ -10,12 +12,21 @@ class HolidayView(ttk.Frame):
         super().__init__(parent)
         self.db = db
         self.controller = TasksController(db)
+        self._layouts = {}       # (年, 月) -> 42 个 (日期数字, 当月日期或 None)
+        self._cell_options = {}  # 按钮 -> 当前已配置的属性
+        self._date_cells = {}    # 当月日期 -> 按钮
+        self._cell_positions = {}  # 按钮 -> (行, 列)
+        self._anchor_day = None    # 上次点击的日期，Shift 点击时作为范围起点
+        self._selection = None     # 正在选择的 [起始日期, 当前日期]
+        self._suppress_click = False
+        self.year_view = None      # 年视图（首次切换时创建）
+        self.year_mode = False
         self.setup_logging()
         self.create_widgets()
         self.setup_layout()
         
         # 初始化日历显示
-        self.current_date = datetime.now()
+        self.current_date = datetime.now().replace(day=1)
         self.load_calendar()
 
     def setup_logging(self):
@@ -52,6 +63,9 @@ class HolidayView(ttk.Frame):
                                             value='workday')
         self.workday_radio.pack(padx=5, pady=2)
         
+        ttk.Label(control_frame, text="按住 Shift 点击或拖动\n可一次设置多天",
+                  foreground='gray').pack(padx=5, pady=2)
+        
         # 添加图例说明
         legend_frame = ttk.LabelFrame(control_frame, text="图例")
         legend_frame.pack(fill='x', padx=5, pady=5)
@@ -105,9 +119,14 @@ class HolidayView(ttk.Frame):
                                        command=self.next_month)
         self.next_month_btn.pack(side='left')
         
+        self.view_mode_btn = ttk.Button(nav_inner_frame, text="年视图", width=6,
+                                      command=self.toggle_year_view)
+        self.view_mode_btn.pack(side='left', padx=(10, 0))
+        
         # 创建日历网格
         calendar_grid = ttk.Frame(self.calendar_frame)
         calendar_grid.pack(padx=5, pady=5)  # 移除 fill 和 expand 参数
+        self.month_grid = calendar_grid
         
         # 创建星期标签
         weekdays = ['一', '二', '三', '四', '五', '六', '日']
@@ -117,11 +136,18 @@ class HolidayView(ttk.Frame):
         
         # 创建日期按钮网格
         self.day_buttons = []
+        self.cell_dates = [[None] * 7 for _ in range(6)]
         for row in range(6):
             button_row = []
             for col in range(7):
-                btn = tk.Button(calendar_grid, width=3, height=1)  # 减小按钮大小
+                btn = tk.Button(calendar_grid, width=4, height=2,  # 显示公历和农历两行
+                                command=lambda r=row, c=col: self.on_cell_click(r, c))
                 btn.grid(row=row+1, column=col, padx=1, pady=1)
+                # Shift 点击或拖动选择多天
+                btn.bind('<ButtonPress-1>', lambda e, r=row, c=col: self.on_cell_press(e, r, c))
+                btn.bind('<B1-Motion>', self.on_cell_drag)
+                btn.bind('<ButtonRelease-1>', self.on_cell_release)
+                self._cell_positions[btn] = (row, col)
                 button_row.append(btn)
             self.day_buttons.append(button_row)
 
@@ -129,11 +155,16 @@ class HolidayView(ttk.Frame):
         """初始化当前年份的节假日"""
         try:
             year = self.current_date.year
+            if not self.controller.has_statutory_holidays(year):
+                messagebox.showwarning(
+                    "提示", f"没有{year}年的官方放假安排（可能尚未公布，或需要升级 lunar-python），"
+                            f"已保留现有的节假日设置。")
+                return
             if messagebox.askyesno("确认", f"确定要初始化{year}年的法定节假日吗？\n这将清除已有的节假日设置。"):
-                if self.controller.init_holidays(year):
-                    self.load_calendar()  # 重新加载日历
-                else:
-                    messagebox.showerror("错误", "节假日初始化失败")
+                self.controller.init_holidays(
+                    year,
+                    on_done=lambda _: self.load_calendar(),  # 重新加载日历
+                    on_error=lambda e: messagebox.showerror("错误", "节假日初始化失败"))
         except Exception as e:
             self.logger.error(f"Error initializing holidays: {e}")
             messagebox.showerror("错误", "节假日初始化失败")
@@ -143,104 +174,208 @@ class HolidayView(ttk.Frame):
         self.pack(fill='both', expand=True)
 
     def load_calendar(self):
-        """加载日历数据"""
+        """加载日历数据，只重新配置发生变化的按钮"""
         year = self.current_date.year
         month = self.current_date.month
         
+        if self.year_mode:
+            self.month_label.config(text=f"{year}年")
+            self.year_view.show_year(year)
+            return
+        
         # 更新月份标签
         self.month_label.config(text=f"{year}年{month}月")
         
-        # 获取当月第一天是星期几
-        first_day = datetime(year, month, 1)
-        first_weekday = first_day.weekday()  # 0是星期一
-        
-        # 获取上个月的最后一天
-        if month == 1:
-            last_month = datetime(year-1, 12, 31)
-        else:
-            if month == 3:  # 处理2月份的特殊情况
-                last_month = datetime(year, month-1, 28)
-                if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
-                    last_month = datetime(year, month-1, 29)
-            else:
-                last_month = datetime(year, month-1, 1)
-                while True:
-                    try:
-                        last_month = datetime(year, month, 1) - timedelta(days=1)
-                        break
-                    except ValueError:
-                        month -= 1
-        
-        # 获取当月天数
-        if month == 12:
-            next_month = datetime(year + 1, 1, 1)
-        else:
-            next_month = datetime(year, month + 1, 1)
-        days_in_month = (next_month - first_day).days
-        
-        # 获取节假日数据
+        # 获取节假日和农历数据（已缓存的月份不再重新计算）
         holidays = self.controller.get_holidays(year, month)
+        lunar_days = self.controller.get_lunar_month(year, month)
         
-        # 更新按钮
-        # 填充上个月的日期
-        last_month_days = last_month.day
-        for i in range(first_weekday):
-            btn = self.day_buttons[0][i]
-            day_num = last_month_days - first_weekday + i + 1
-            btn.config(text=f"{day_num}", state='disabled', bg='#F0F0F0')  # 浅灰色
+        self._date_cells = {}
+        for index, (day_num, day) in enumerate(self.get_layout(year, month)):
+            row, col = divmod(index, 7)
+            btn = self.day_buttons[row][col]
+            self.cell_dates[row][col] = day
+            if day is None:
+                # 上个月或下个月的日期
+                self._set_cell(btn, text=f"{day_num}", state='disabled', bg='#F0F0F0')  # 浅灰色
+            else:
+                self._date_cells[day] = btn
+                lunar = lunar_days.get(day)
+                text = f"{day_num}\n{lunar.label}" if lunar else f"{day_num}"
+                self._set_cell(btn, text=text, state='normal',
+                               bg=self.get_day_color(day, holidays))
         
-        # 填充当月日期
-        current_row = 0
-        current_col = first_weekday
-        for day in range(1, days_in_month + 1):
-            btn = self.day_buttons[current_row][current_col]
-            date = datetime(year, month, day).date()
-            btn.config(text=f"{day}", state='normal')
+        # 空闲时预取前后两个月，切换月份时直接使用缓存
+        self.after_idle(self.prefetch_adjacent_months)
+
+    def get_layout(self, year, month):
+        """获取月份的网格布局，返回 42 个 (日期数字, 当月日期或 None)"""
+        layout = self._layouts.get((year, month))
+        if layout is None:
+            first_weekday, days_in_month = calendar.monthrange(year, month)  # 0是星期一
+            prev_year, prev_month = (year - 1, 12) if month == 1 else (year, month - 1)
+            last_month_days = calendar.monthrange(prev_year, prev_month)[1]
             
-            # 设置按钮样式
-            if date in holidays:
-                if holidays[date]:  # 调休上班
-                    btn.config(bg='lightblue')
-                else:  # 节假日
-                    btn.config(bg='pink')
-            elif date.weekday() >= 5:  # 周末
-                btn.config(bg='lightgray')
-            else:  # 工作日
-                btn.config(bg='white')
+            layout = [(last_month_days - first_weekday + i + 1, None)
+                      for i in range(first_weekday)]
+            layout.extend((day, date(year, month, day)) for day in range(1, days_in_month + 1))
+            layout.extend((i + 1, None) for i in range(42 - len(layout)))
+            self._layouts[(year, month)] = layout
+        return layout
+
+    def get_day_color(self, day, holidays):
+        """根据节假日设置和星期计算日期的背景色"""
+        if day in holidays:
+            return 'lightblue' if holidays[day] else 'pink'  # 调休上班 / 节假日
+        if day.weekday() >= 5:  # 周末
+            return 'lightgray'
+        return 'white'  # 工作日
+
+    def _set_cell(self, btn, **options):
+        """只把发生变化的属性配置到按钮上"""
+        current = self._cell_options.setdefault(btn, {})
+        changed = {key: value for key, value in options.items() if current.get(key) != value}
+        if changed:
+            btn.config(**changed)
+            current.update(changed)
+
+    def repaint_day(self, day):
+        """只重绘指定日期所在的按钮"""
+        btn = self._date_cells.get(day)
+        if btn is not None:
+            holidays = self.controller.get_holidays(day.year, day.month)
+            self._set_cell(btn, bg=self.get_day_color(day, holidays))
+        if self.year_mode:
+            self.year_view.repaint_day(day)
+
+    def prefetch_adjacent_months(self):
+        """预取前后两个月的网格布局、节假日和农历数据"""
+        try:
+            for year, month in (self._shift_month(-1), self._shift_month(1)):
+                self.get_layout(year, month)
+                self.controller.get_holidays(year, month)
+                self.controller.get_lunar_month(year, month)
+        except Exception as e:
+            self.logger.error(f"Error prefetching holidays: {e}")
+
+    def _shift_month(self, delta):
+        """返回当前月份前后 delta 个月的 (年, 月)"""
+        index = self.current_date.year * 12 + self.current_date.month - 1 + delta
+        return index // 12, index % 12 + 1
+
+    def toggle_year_view(self):
+        """在月视图和年视图之间切换"""
+        self.year_mode = not self.year_mode
+        if self.year_mode:
+            if self.year_view is None:
+                self.year_view = HolidayYearView(self.calendar_frame, self.controller,
+                                                 self.get_day_color, self.on_year_day_click)
+            self.month_grid.pack_forget()
+            self.year_view.pack(padx=5, pady=5)
+            self.view_mode_btn.config(text="月视图")
+        else:
+            self.year_view.pack_forget()
+            self.month_grid.pack(padx=5, pady=5)
+            self.view_mode_btn.config(text="年视图")
+        self.load_calendar()
+
+    def on_year_day_click(self, day):
+        """年视图中的日期点击事件"""
+        self._anchor_day = day
+        self.toggle_holiday(day)
+
+    def on_cell_click(self, row, col):
+        """日期按钮点击事件"""
+        if self._suppress_click:
+            # 本次点击已作为多天选择处理
+            return
+        day = self.cell_dates[row][col]
+        if day is not None:
+            self._anchor_day = day
+            self.toggle_holiday(day)
+
+    def on_cell_press(self, event, row, col):
+        """按下鼠标时开始选择，按住 Shift 时从上次点击的日期开始"""
+        day = self.cell_dates[row][col]
+        if day is None:
+            self._selection = None
+            return
+        start = day
+        if event.state & 0x0001 and self._anchor_day in self._date_cells:  # Shift
+            start = self._anchor_day
+        self._selection = [start, day]
+        self._highlight_selection()
+
+    def on_cell_drag(self, event):
+        """拖动时扩展选择范围"""
+        if self._selection is None:
+            return
+        day = self._day_at(event)
+        if day is not None and day != self._selection[1]:
+            self._selection[1] = day
+            self._highlight_selection()
+
+    def on_cell_release(self, event):
+        """松开鼠标时，选择了多天则一次设置整个范围"""
+        if self._selection is None:
+            return
+        start, end = sorted(self._selection)
+        self._selection = None
+        self._highlight_selection()
+        if start != end:
+            # 按钮自身的点击事件在此之后触发，需要忽略
+            self._suppress_click = True
+            self.after_idle(self._clear_suppress_click)
+            self.apply_range(start, end)
+
+    def _clear_suppress_click(self):
+        self._suppress_click = False
+
+    def _day_at(self, event):
+        """返回鼠标位置下的当月日期"""
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        position = self._cell_positions.get(widget)
+        if position is None:
+            return None
+        row, col = position
+        return self.cell_dates[row][col]
+
+    def _highlight_selection(self):
+        """高亮当前选中的日期范围"""
+        start = end = None
+        if self._selection is not None:
+            start, end = sorted(self._selection)
+        for day, btn in self._date_cells.items():
+            selected = start is not None and start <= day <= end
+            self._set_cell(btn, fg='blue' if selected else 'black')
+
+    def apply_range(self, start, end):
+        """将选中的日期范围一次设为节假日或调休上班，只重绘受影响的日期"""
+        try:
+            is_workday = self.holiday_type_var.get() == 'workday'
             
-            # 绑定点击事件
-            btn.config(command=lambda d=date: self.toggle_holiday(d))
+            def done(_):
+                for day in self._date_cells:
+                    if start <= day <= end:
+                        self.repaint_day(day)
             
-            current_col += 1
-            if current_col == 7:
-                current_col = 0
-                current_row += 1
-        
-        # 填充下个月的日期
-        next_month_day = 1
-        while current_row < 6:
-            while current_col < 7:
-                btn = self.day_buttons[current_row][current_col]
-                btn.config(text=f"{next_month_day}", state='disabled', bg='#F0F0F0')  # 浅灰色
-                next_month_day += 1
-                current_col += 1
-            current_col = 0
-            current_row += 1
+            self.controller.set_holiday_range(start, end, is_workday, on_done=done,
+                                              on_error=self._on_write_error)
+            self._anchor_day = end
+        except Exception as e:
+            self.logger.error(f"Error setting holiday range: {e}")
+            messagebox.showerror("错误", "设置节假日失败")
     
     def prev_month(self):
-        """显示上个月"""
-        if self.current_date.month == 1:
-            self.current_date = self.current_date.replace(year=self.current_date.year-1, month=12)
-        else:
-            self.current_date = self.current_date.replace(month=self.current_date.month-1)
+        """显示上个月（年视图中显示上一年）"""
+        year, month = self._shift_month(-12 if self.year_mode else -1)
+        self.current_date = self.current_date.replace(year=year, month=month)
         self.load_calendar()
     
     def next_month(self):
-        """显示下个月"""
-        if self.current_date.month == 12:
-            self.current_date = self.current_date.replace(year=self.current_date.year+1, month=1)
-        else:
-            self.current_date = self.current_date.replace(month=self.current_date.month+1)
+        """显示下个月（年视图中显示下一年）"""
+        year, month = self._shift_month(12 if self.year_mode else 1)
+        self.current_date = self.current_date.replace(year=year, month=month)
         self.load_calendar()
 
     def toggle_holiday(self, date):
@@ -248,56 +383,28 @@ class HolidayView(ttk.Frame):
         try:
             is_workday = self.holiday_type_var.get() == 'workday'
             
-            # 获取当前日期的节假日状态
-            cursor = self.db.conn.cursor()
-            cursor.execute('SELECT id, is_workday FROM holidays WHERE date = ?', 
-                         (date.strftime('%Y-%m-%d'),))
-            current = cursor.fetchone()
+            # 获取当前日期的节假日状态（None 表示未设置）
+            current = self.controller.get_holiday(date)
             
-            # 如果是周末
-            if date.weekday() >= 5:
-                if current:
-                    # 如果已经有记录，删除记录恢复默认状态
-                    cursor.execute('DELETE FROM holidays WHERE date = ?', 
-                                 (date.strftime('%Y-%m-%d'),))
-                else:
-                    # 如果没有记录，添加调休记录
-                    cursor.execute('''
-                        INSERT INTO holidays (date, name, is_workday)
-                        VALUES (?, ?, ?)
-                    ''', (date.strftime('%Y-%m-%d'),
-                         "调休" if is_workday else "节假日",
-                         1 if is_workday else 0))
+            # 写入完成后只刷新被点击的日期
+            callbacks = dict(on_done=lambda _: self.repaint_day(date),
+                             on_error=self._on_write_error)
+            if current is None:
+                # 没有记录时添加设置
+                self.controller.toggle_holiday(date, is_workday, **callbacks)
+            elif date.weekday() >= 5 or current == is_workday:
+                # 周末已有记录，或非周末记录状态相同，删除记录恢复默认状态
+                self.controller.clear_holiday(date, **callbacks)
             else:
-                # 非周末日期
-                if current:
-                    # 如果已有记录且状态相同，删除记录恢复默认状态
-                    if current['is_workday'] == (1 if is_workday else 0):
-                        cursor.execute('DELETE FROM holidays WHERE date = ?', 
-                                     (date.strftime('%Y-%m-%d'),))
-                    else:
-                        # 更新状态
-                        cursor.execute('''
-                            UPDATE holidays 
-                            SET is_workday = ?, name = ?
-                            WHERE date = ?
-                        ''', (1 if is_workday else 0, 
-                             "调休" if is_workday else "节假日",
-                             date.strftime('%Y-%m-%d')))
-                else:
-                    # 添加新记录
-                    cursor.execute('''
-                        INSERT INTO holidays (date, name, is_workday)
-                        VALUES (?, ?, ?)
-                    ''', (date.strftime('%Y-%m-%d'),
-                         "调休" if is_workday else "节假日",
-                         1 if is_workday else 0))
-            
-            self.db.conn.commit()
-            self.load_calendar()  # 刷新日历显示
+                # 更新状态
+                self.controller.toggle_holiday(date, is_workday, **callbacks)
             
         except Exception as e:
             self.logger.error(f"Error toggling holiday: {e}")
             messagebox.showerror("错误", "设置节假日失败")
 
+    def _on_write_error(self, error):
+        """后台写入节假日失败"""
+        messagebox.showerror("错误", "设置节假日失败")
+
     # ... (其他方法与原来的节假日管理相关方法相同) 
\ No newline at end of file
@@ -0,0 +1,105 @@
+import calendar
+import tkinter as tk
+from datetime import date
+
+# 年视图尺寸
+CELL_SIZE = 20
+MONTH_GAP = 10
+TITLE_HEIGHT = 18
+HEADER_HEIGHT = 16
+MONTHS_PER_ROW = 4
+
+
+class HolidayYearView(tk.Canvas):
+    """在一个 Canvas 上绘制整年的节假日日历
+
+    12 个月 × 42 个格子的画布项目只在创建时生成一次，切换年份或修改节假日时
+    只更新已有项目的文字、颜色和标签。当年日期的格子带有 day-YYYY-MM-DD 标签，
+    点击时据此找到对应日期。
+    """
+
+    def __init__(self, parent, controller, get_color, on_day_click):
+        month_width = 7 * CELL_SIZE + MONTH_GAP
+        month_height = TITLE_HEIGHT + HEADER_HEIGHT + 6 * CELL_SIZE + MONTH_GAP
+        super().__init__(parent,
+                         width=MONTHS_PER_ROW * month_width,
+                         height=(12 // MONTHS_PER_ROW) * month_height,
+                         bg='white', highlightthickness=0)
+        self.controller = controller
+        self.get_color = get_color
+        self.on_day_click = on_day_click
+        self.year = None
+        self._cells = []      # 每月 42 个 (矩形, 文字)
+        self._day_items = {}  # 当年日期 -> (矩形, 文字)
+
+        self._create_items(month_width, month_height)
+        self.tag_bind('cell', '<Button-1>', self._on_click)
+
+    def _create_items(self, month_width, month_height):
+        """创建全部画布项目"""
+        weekdays = ['一', '二', '三', '四', '五', '六', '日']
+        for index in range(12):
+            x0 = (index % MONTHS_PER_ROW) * month_width + MONTH_GAP // 2
+            y0 = (index // MONTHS_PER_ROW) * month_height + MONTH_GAP // 2
+
+            # 月份标题和星期
+            self.create_text(x0 + 7 * CELL_SIZE // 2, y0 + TITLE_HEIGHT // 2,
+                             text=f"{index + 1}月", font=('Arial', 9, 'bold'))
+            for col, name in enumerate(weekdays):
+                self.create_text(x0 + col * CELL_SIZE + CELL_SIZE // 2,
+                                 y0 + TITLE_HEIGHT + HEADER_HEIGHT // 2,
+                                 text=name, font=('Arial', 8), fill='gray')
+
+            # 日期格子，初始隐藏
+            top = y0 + TITLE_HEIGHT + HEADER_HEIGHT
+            cells = []
+            for i in range(42):
+                row, col = divmod(i, 7)
+                x = x0 + col * CELL_SIZE
+                y = top + row * CELL_SIZE
+                rect = self.create_rectangle(x + 1, y + 1, x + CELL_SIZE - 1, y + CELL_SIZE - 1,
+                                             outline='', state='hidden')
+                text = self.create_text(x + CELL_SIZE // 2, y + CELL_SIZE // 2,
+                                        font=('Arial', 8), state='hidden')
+                cells.append((rect, text))
+            self._cells.append(cells)
+
+    def show_year(self, year):
+        """显示指定年份，整年的节假日只查询一次"""
+        holidays = self.controller.get_year_holidays(year)
+        if year != self.year:
+            self._layout_year(year)
+        for day, (rect, _) in self._day_items.items():
+            self.itemconfig(rect, fill=self.get_color(day, holidays))
+
+    def _layout_year(self, year):
+        """把格子重新分配给指定年份的日期"""
+        self.year = year
+        self._day_items = {}
+        for month, cells in enumerate(self._cells, start=1):
+            first_weekday, days_in_month = calendar.monthrange(year, month)
+            for i, (rect, text) in enumerate(cells):
+                day_num = i - first_weekday + 1
+                if 1 <= day_num <= days_in_month:
+                    day = date(year, month, day_num)
+                    tags = ('cell', f"day-{day.isoformat()}")
+                    self.itemconfig(rect, state='normal', tags=tags)
+                    self.itemconfig(text, state='normal', text=f"{day_num}", tags=tags)
+                    self._day_items[day] = (rect, text)
+                else:
+                    self.itemconfig(rect, state='hidden', tags=())
+                    self.itemconfig(text, state='hidden', tags=())
+
+    def repaint_day(self, day):
+        """只重新着色指定日期的格子"""
+        items = self._day_items.get(day)
+        if items is not None:
+            holidays = self.controller.get_holidays(day.year, day.month)
+            self.itemconfig(items[0], fill=self.get_color(day, holidays))
+
+    def _on_click(self, event):
+        """根据被点击项目的日期标签找到日期"""
+        for tag in self.gettags('current'):
+            if tag.startswith('day-'):
+                self.on_day_click(date.fromisoformat(tag[4:]))
+                return
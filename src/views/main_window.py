@@ -1,9 +1,8 @@
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
-from lunar_python import Lunar
 import logging
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
 import random
 import os
 
@@ -11,14 +10,25 @@ from .bookmarks_view import BookmarksView
 from .files_view import FilesView
 from .tasks_view import TasksView
 from .holiday_view import HolidayView
+from .tk_dispatcher import TkDispatcher
+from ..models.lunar_dates import lunar_date_text
+from ..models.tasks_model import DUE_BUCKETS
+from ..controllers.workspace_controller import WorkspaceController
 
 class MainWindow(tk.Tk):
-    def __init__(self, db):
+    def __init__(self, db, backups=None):
         super().__init__()
         self.db = db
+        self.backups = backups
         self.setup_logging()
         self.setup_window()
         
+        # 后台读写线程的完成/失败回调在主线程中执行
+        self.dispatcher = TkDispatcher(self)
+        self.db.writes.set_dispatcher(self.dispatcher.call_soon)
+        self.db.reads.set_dispatcher(self.dispatcher.call_soon)
+        self.workspace = WorkspaceController(db)
+        
         # 创建自定义样式
         self.style = ttk.Style()
         # 设置不同标签页的样式
@@ -189,52 +199,34 @@ class MainWindow(tk.Tk):
         # 设置只读
         self.reminder_text.configure(state='disabled')
         
-        # 绑定大小变化
-        self.reminder_text.bind('<Configure>', lambda e: self.update_due_reminder())
+        # 绑定大小变化（只按新的宽度重新显示，不重新查询）
+        self._due_tasks = None
+        self.reminder_text.bind('<Configure>', lambda e: self.show_due_reminder())
         
-        # 立即更新一次
-        self.after(100, self.update_due_reminder)
+        # 立即更新一次，之后每分钟更新一次
+        self.after(100, self.refresh_due_reminder)
+
+    def refresh_due_reminder(self):
+        """定时更新到期提醒"""
+        self.update_due_reminder()
+        self.after(60000, self.refresh_due_reminder)
 
     def update_due_reminder(self):
-        """更新到期提醒"""
+        """在后台读线程中获取到期提醒，完成后在界面线程中显示"""
+        try:
+            # 通过一次查询获取各提醒分类下的未完成任务
+            self.tasks_view.controller.fetch_due_buckets(on_done=self.show_due_reminder)
+        except Exception as e:
+            self.logger.error(f"Error updating due reminder: {str(e)}")
+
+    def show_due_reminder(self, due_tasks=None):
+        """显示到期提醒；不传参数时按上次获取的结果重新显示"""
+        if due_tasks is None:
+            due_tasks = self._due_tasks
+            if due_tasks is None:
+                return
+        self._due_tasks = due_tasks
         try:
-            # 获取未完成任务
-            tasks = self.tasks_view.controller.get_tasks()
-            due_tasks = {
-                "需要今天完成": [],      # 节假日前需要完成的紧急任务，以及今明两天到期的紧急任务
-                "今天到期": [],         # 今天到期的普通任务
-                "明天到期": [],         # 明天到期的普通任务
-                "后天到期": []          # 后天到期的任务
-            }
-            
-            for task_row in tasks:
-                # 将 sqlite3.Row 转换为字典
-                task = dict(task_row)
-                
-                needs_reminder, message = self.tasks_view.controller.check_due_date(
-                    task['due_date'], 
-                    task_row
-                )
-                
-                if needs_reminder:
-                    # 获取任务的重要程度
-                    importance = task.get('importance', '普通')
-                    
-                    # 如果是紧急任务且今明两天到期，或需要今天完成，都���在"需要今天完成"分类下
-                    if importance == '紧急' and (
-                        "需要今天完成" in message or 
-                        "今天到期" in message or 
-                        "明天到期" in message or
-                        "需要提前完成" in message
-                    ):
-                        due_tasks["需要今天完成"].append(task)
-                    elif "今天到期" in message and importance != '紧急':
-                        due_tasks["今天到期"].append(task)
-                    elif "明天到期" in message and importance != '紧急':
-                        due_tasks["明天到期"].append(task)
-                    elif "后天到期" in message:
-                        due_tasks["后天到期"].append(task)
-            
             # 更新显示
             self.reminder_text.configure(state='normal')
             self.reminder_text.delete('1.0', tk.END)
@@ -264,8 +256,7 @@ class MainWindow(tk.Tk):
             # 显示任务
             has_content = False
             # 按固定顺序显示分类
-            categories = ["需要今天完成", "今天到期", "明天到期", "后天到期"]
-            for category in categories:
+            for category in DUE_BUCKETS:
                 tasks_list = due_tasks[category]
                 if tasks_list:
                     if has_content:
@@ -290,7 +281,7 @@ class MainWindow(tk.Tk):
                     
                     # 插入任务列表
                     for task in tasks_list:
-                        importance = task['importance'] if 'importance' in task else '普通'
+                        importance = task['importance'] or '普通'
                         importance_mark = '★' if importance == '紧急' else '•'
                         task_name = task['name']
                         # 添加到期日期显示（对于非今天到期的任务）
@@ -309,10 +300,7 @@ class MainWindow(tk.Tk):
             self.reminder_text.configure(state='disabled')
             
         except Exception as e:
-            self.logger.error(f"Error updating due reminder: {str(e)}")
-        finally:
-            # 每分钟更新一次
-            self.after(60000, self.update_due_reminder)
+            self.logger.error(f"Error showing due reminder: {str(e)}")
 
     def update_task_count(self):
         """更新务计数"""
@@ -344,6 +332,12 @@ class MainWindow(tk.Tk):
         self.menubar.add_cascade(label="文件", menu=file_menu)
         file_menu.add_command(label="刷新", command=self.refresh_current_view)
         file_menu.add_separator()
+        file_menu.add_command(label="导出数据(JSON Lines)...", command=lambda: self.export_data('jsonl'))
+        file_menu.add_command(label="导出数据(CSV)...", command=lambda: self.export_data('csv'))
+        file_menu.add_command(label="恢复数据...", command=self.restore_data)
+        if self.backups is not None:
+            file_menu.add_command(label="立即备份", command=self.backup_now)
+        file_menu.add_separator()
         file_menu.add_command(label="退出", command=self.quit)
 
         # 帮助菜单
@@ -354,9 +348,8 @@ class MainWindow(tk.Tk):
     def update_time(self):
         """Update time display"""
         now = datetime.now()
-        lunar = Lunar.fromDate(now)
         time_str = now.strftime("%Y-%m-%d %H:%M:%S")
-        lunar_str = f"农历 {lunar.getYearInChinese()}年 {lunar.getMonthInChinese()}月 {lunar.getDayInChinese()}"
+        lunar_str = lunar_date_text(now.date())  # 按月缓存，每天只计算一次
         self.time_label.config(text=f"{time_str} | {lunar_str}")
         self.after(1000, self.update_time)
 
@@ -425,6 +418,57 @@ class MainWindow(tk.Tk):
             self.logger.error(f"Error refreshing current view: {e}")
             messagebox.showerror("错误", f"刷新失败: {str(e)}")
 
+    def export_data(self, fmt):
+        """把工作区数据导出到选择的目录，每张表一个文件"""
+        directory = filedialog.askdirectory(title="选择导出目录")
+        if not directory:
+            return
+
+        def on_done(counts):
+            lines = "\n".join(f"{table}: {count} 行" for table, count in counts.items())
+            messagebox.showinfo("导出完成", f"数据已导出到 {directory}\n\n{lines}")
+
+        self.workspace.export_data(
+            directory, fmt, on_done=on_done,
+            on_error=lambda e: messagebox.showerror("错误", f"导出失败: {str(e)}"))
+
+    def restore_data(self):
+        """从导出目录恢复数据，相同 ID 的记录被覆盖"""
+        directory = filedialog.askdirectory(title="选择要恢复的导出目录")
+        if not directory:
+            return
+        if not messagebox.askyesno("确认", "恢复会覆盖相同 ID 的现有记录，确定继续吗？"):
+            return
+
+        def on_done(results):
+            self.reload_views()
+            restored = sum(result.restored for result in results.values())
+            skipped = sum(result.skipped for result in results.values())
+            message = f"已恢复 {restored} 条记录"
+            if skipped:
+                message += f"\n{skipped} 条记录与现有数据重复（同名分类已合并），未覆盖现有数据"
+            messagebox.showinfo("恢复完成", message)
+
+        self.workspace.restore_data(
+            directory, on_done=on_done,
+            on_error=lambda e: messagebox.showerror("错误", f"恢复失败: {str(e)}"))
+
+    def backup_now(self):
+        """在后台立即备份数据库"""
+        self.backups.backup_now(
+            on_done=lambda path: messagebox.showinfo("备份完成", f"数据库已备份到 {path}"),
+            on_error=lambda e: messagebox.showerror("错误", f"备份失败: {str(e)}"))
+
+    def reload_views(self):
+        """重新加载所有标签页的数据"""
+        self.bookmarks_view.load_bookmarks()
+        self.files_view.load_files()
+        self.tasks_view.load_tasks()
+        self.completed_tasks_view.load_tasks()
+        self.holiday_view.load_calendar()
+        self.update_task_count()
+        self.update_due_reminder()
+
     def show_about(self):
         """显示关于对话框"""
         about_text = """工作助手 v1.0
@@ -532,7 +576,9 @@ class MainWindow(tk.Tk):
             if self.tray_icon and self.tray_icon.visible:
                 self.tray_icon.stop()
             
-            # 关闭数据库连接
+            # 停止后台备份，关闭数据库连接（等待写队列中剩余的写操作提交）
+            if self.backups is not None:
+                self.backups.stop()
             self.db.close()
             
             # 退出程序
@@ -0,0 +1,67 @@
+import logging
+
+# 可见区域的下边缘滚动到列表的这个位置之后加载下一页
+LOAD_MORE_AT = 0.9
+
+
+class PagedList:
+    """Treeview 的分页显示
+
+    列表只显示已加载的页，滚动到接近底部时通过 fetch_more(token, on_done,
+    on_error) 在后台请求下一页并追加到末尾。重新加载期间不请求下一页，
+    避免旧的续页标记把新结果覆盖。
+    """
+
+    def __init__(self, tree, fetch_more, insert_row, scrollbar=None):
+        self.tree = tree
+        self.fetch_more = fetch_more
+        self.insert_row = insert_row
+        self.scrollbar = scrollbar
+        self.logger = logging.getLogger(__name__)
+        self.next_token = None
+        self.loading = False
+        tree.configure(yscrollcommand=self._on_scroll)
+
+    def begin_reload(self):
+        """开始重新加载第一页，在 show() 或 reload_failed() 之前不加载更多"""
+        self.next_token = None
+        self.loading = True
+
+    def reload_failed(self):
+        self.loading = False
+
+    def clear(self):
+        """清空列表"""
+        self.tree.delete(*self.tree.get_children())
+        self.next_token = None
+        self.loading = False
+
+    def show(self, page):
+        """用第一页替换列表内容"""
+        self.tree.delete(*self.tree.get_children())
+        self.append(page)
+
+    def append(self, page):
+        """把一页追加到列表末尾；翻页期间数据有变动时跳过已显示的行"""
+        for row in page.rows:
+            if not self.tree.exists(row.id):
+                self.insert_row(row)
+        self.next_token = page.next_token
+        self.loading = False
+
+    def load_more(self):
+        """请求下一页（没有更多数据或正在加载时忽略）"""
+        if self.next_token is None or self.loading:
+            return
+        self.loading = True
+        self.fetch_more(self.next_token, self.append, self._more_failed)
+
+    def _more_failed(self, error):
+        self.logger.error(f"Error loading next page: {error}")
+        self.loading = False
+
+    def _on_scroll(self, first, last):
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if float(last) >= LOAD_MORE_AT:
+            self.load_more()
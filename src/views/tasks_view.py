@@ -7,6 +7,14 @@ import os
 import subprocess
 from ..controllers.tasks_controller import TasksController
 from .task_dialog import TaskDialog
+from .paged_list import PagedList
+
+# 重要程度映射
+IMPORTANCE_STARS = {
+    '普通': '★',
+    '重要': '★★★',
+    '紧急': '★★★★★'
+}
 
 class TasksView(ttk.Frame):
     def __init__(self, parent, db, show_completed=False):
@@ -103,7 +111,9 @@ class TasksView(ttk.Frame):
         # 添加滚动条
         self.scrollbar = ttk.Scrollbar(self.tasks_frame, orient="vertical", 
                                      command=self.tasks_list.yview)
-        self.tasks_list.configure(yscrollcommand=self.scrollbar.set)
+        # 任务按页加载，滚动到接近底部时加载下一页
+        self.pages = PagedList(self.tasks_list, self.fetch_more_tasks, self.insert_task,
+                               scrollbar=self.scrollbar)
         
         # 绑定双击事件（打开文件）
         self.tasks_list.bind('<Double-1>', self.on_task_double_click)
@@ -124,42 +134,50 @@ class TasksView(ttk.Frame):
 
     def load_tasks(self):
         """载任务列表"""
+        def failed(e):
+            self.pages.reload_failed()
+            messagebox.showerror("错误", "加载任务列表失败")
         try:
-            # 清空现有数据
-            self.tasks_list.delete(*self.tasks_list.get_children())
-            
-            # 重要程度映射
-            importance_map = {
-                '普通': '★',
-                '重要': '★★★',
-                '紧急': '★★★★★'
-            }
-            
-            # 加载任务
-            tasks = self.controller.get_tasks(include_completed=self.show_completed)
-            for task in tasks:
-                # 将重要程度转换为星号显示
-                importance_stars = importance_map.get(task['importance'], '★')
-                
-                # 准备显示的值
-                values = [
-                    task['name'],
-                    task['due_date'],
-                    importance_stars,
-                    task['completed_at'] if self.show_completed else task['status']
-                ]
-                
-                # 插入任务
-                self.tasks_list.insert('', 'end', iid=task['id'],
-                                     values=values)
-                
-            # 加载完成后调整高度
-            self.after(100, self.adjust_tasks_height)
-                
+            # 在后台读线程中加载第一页，完成后在主线程中显示
+            self.pages.begin_reload()
+            self.controller.fetch_tasks(
+                include_completed=self.show_completed,
+                on_done=self.show_tasks,
+                on_error=failed)
         except Exception as e:
+            self.pages.reload_failed()
             self.logger.error(f"Error loading tasks: {e}")
             messagebox.showerror("错误", "加载任务列表失败")
 
+    def fetch_more_tasks(self, token, on_done, on_error):
+        """在后台加载下一页任务"""
+        self.controller.fetch_tasks(
+            include_completed=self.show_completed, token=token,
+            on_done=on_done, on_error=on_error)
+
+    def show_tasks(self, page):
+        """显示第一页任务"""
+        self.pages.show(page)
+        # 加载完成后调整高度
+        self.after(100, self.adjust_tasks_height)
+
+    def insert_task(self, task):
+        """在列表末尾插入一个任务"""
+        # 将重要程度转换为星号显示
+        importance_stars = IMPORTANCE_STARS.get(task['importance'], '★')
+        
+        # 准备显示的值
+        values = [
+            task['name'],
+            task['due_date'],
+            importance_stars,
+            task['completed_at'] if self.show_completed else task['status']
+        ]
+        
+        # 插入任务
+        self.tasks_list.insert('', 'end', iid=task['id'],
+                             values=values)
+
     def show_add_dialog(self):
         """显示添加任务对话框"""
         dialog = TaskDialog(self, "添加任务")
@@ -167,18 +185,21 @@ class TasksView(ttk.Frame):
         
         if result:  # 如果有结果（用户点击了确认）
             try:
+                def done(_):
+                    self.load_tasks()
+                    # 获取主窗口实例并更新计数
+                    main_window = self.winfo_toplevel()
+                    if hasattr(main_window, 'update_task_count'):
+                        main_window.update_task_count()
+                    messagebox.showinfo("成功", "任务添加成功")
                 self.controller.add_task(
                     name=result['name'],
                     due_date=result['due_date'],
                     file_path=result.get('file_path'),
-                    importance=result['importance']
+                    importance=result['importance'],
+                    on_done=done,
+                    on_error=lambda e: messagebox.showerror("错误", f"添加任务失败: {str(e)}")
                 )
-                self.load_tasks()
-                # 获取主窗口实例并更新计数
-                main_window = self.winfo_toplevel()
-                if hasattr(main_window, 'update_task_count'):
-                    main_window.update_task_count()
-                messagebox.showinfo("成功", "任务添加成功")
             except Exception as e:
                 self.logger.error(f"Error adding task: {e}")
                 messagebox.showerror("错误", f"添加任务失败: {str(e)}")
@@ -193,22 +214,10 @@ class TasksView(ttk.Frame):
         try:
             task_id = selected[0]
             # 获取任务数据
-            task_row = self.controller.get_task(task_id)
-            if task_row:
-                # 将 sqlite3.Row 对象转换为字典
-                task_data = dict(zip(task_row.keys(), task_row))  # 使用 keys() 方法获取列名
-                
-                # 确保所有必需的字段都存在
-                task_data = {
-                    'id': task_data.get('id'),
-                    'name': task_data.get('name', ''),
-                    'due_date': task_data.get('due_date', ''),
-                    'importance': task_data.get('importance', '普通'),
-                    'status': task_data.get('status', ''),
-                    'file_path': task_data.get('file_path', '')
-                }
-                
-                self.show_edit_dialog(task_id, task_data)
+            task = self.controller.get_task(task_id)
+            if task:
+                # 任务记录可直接传给对话框，缺少的字段为 None
+                self.show_edit_dialog(task_id, task)
             else:
                 messagebox.showerror("错误", "无法获取任务数据")
         except Exception as e:
@@ -222,16 +231,18 @@ class TasksView(ttk.Frame):
         
         if result:  # 如果有结果（用户点击了确认）
             try:
-                # 调用控制器更新任务
+                # 调用控制器更新任务，写入完成后刷新任务列表显示
+                def done(_):
+                    self.load_tasks()
+                    messagebox.showinfo("成功", "任务更新成功")
                 self.controller.update_task(
                     task_id=task_id,
                     name=result['name'],
                     due_date=result['due_date'],
-                    importance=result['importance']
+                    importance=result['importance'],
+                    on_done=done,
+                    on_error=lambda e: messagebox.showerror("错误", f"更新任务失败: {str(e)}")
                 )
-                # 刷新任务列表显示
-                self.load_tasks()
-                messagebox.showinfo("成功", "任务更新成功")
             except Exception as e:
                 self.logger.error(f"Error updating task: {e}")
                 messagebox.showerror("错误", f"更新任务失败: {str(e)}")
@@ -245,9 +256,12 @@ class TasksView(ttk.Frame):
         
         try:
             task_id = selected[0]
-            self.controller.complete_task(task_id)
-            self.load_tasks()
-            messagebox.showinfo("成功", "任务已标记为完成")
+            def done(_):
+                self.load_tasks()
+                messagebox.showinfo("成功", "任务已标记为完成")
+            self.controller.complete_task(
+                task_id, on_done=done,
+                on_error=lambda e: messagebox.showerror("错误", "标记任务失败"))
         except Exception as e:
             self.logger.error(f"Error completing task: {e}")
             messagebox.showerror("错误", "标记任务失败")
@@ -262,9 +276,12 @@ class TasksView(ttk.Frame):
         if messagebox.askyesno("确认", "确定要删除选中的任务吗？"):
             try:
                 task_id = selected[0]
-                self.controller.delete_task(task_id)
-                self.load_tasks()
-                messagebox.showinfo("成功", "任务删除功")
+                def done(_):
+                    self.load_tasks()
+                    messagebox.showinfo("成功", "任务删除功")
+                self.controller.delete_task(
+                    task_id, on_done=done,
+                    on_error=lambda e: messagebox.showerror("错误", "删除任务失败"))
             except Exception as e:
                 self.logger.error(f"Error deleting task: {e}")
                 messagebox.showerror("错误", "删除任务失败")
@@ -272,8 +289,7 @@ class TasksView(ttk.Frame):
     def cleanup_tasks(self):
         """清理已完成任务"""
         try:
-            self.controller.cleanup_completed_tasks()
-            self.load_tasks()
+            self.controller.cleanup_completed_tasks(on_done=lambda _: self.load_tasks())
         except Exception as e:
             self.logger.error(f"Error cleaning up tasks: {e}")
         finally:
@@ -310,9 +326,12 @@ class TasksView(ttk.Frame):
         
         try:
             task_id = selected[0]
-            self.controller.restore_task(task_id)
-            self.load_tasks()
-            messagebox.showinfo("成功", "任务已恢复到未完成状态")
+            def done(_):
+                self.load_tasks()
+                messagebox.showinfo("成功", "任务已恢复到未完成状态")
+            self.controller.restore_task(
+                task_id, on_done=done,
+                on_error=lambda e: messagebox.showerror("错误", "恢复任务失败"))
         except Exception as e:
             self.logger.error(f"Error restoring task: {e}")
             messagebox.showerror("错误", "恢复任务失败")
@@ -320,11 +339,12 @@ class TasksView(ttk.Frame):
     def repair_data(self):
         """修复任务数据"""
         try:
-            if self.controller.repair_tasks_data():
+            def done(_):
                 self.load_tasks()
                 messagebox.showinfo("成功", "任务数据已修复")
-            else:
-                messagebox.showerror("错误", "修复任务数据失败")
+            self.controller.repair_tasks_data(
+                on_done=done,
+                on_error=lambda e: messagebox.showerror("错误", "修复任务数据失败"))
         except Exception as e:
             self.logger.error(f"Error repairing data: {e}")
             messagebox.showerror("错误", "修复任务数据失败")
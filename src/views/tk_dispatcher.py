@@ -0,0 +1,41 @@
+import queue
+import logging
+import tkinter as tk
+
+# 检查回调队列的间隔（毫秒）
+POLL_INTERVAL = 20
+
+
+class TkDispatcher:
+    """把后台线程的回调交给 Tk 主线程执行
+
+    后台线程只调用 call_soon() 把回调放入队列，主线程通过 after 定时取出执行，
+    不在后台线程中直接操作任何 Tk 对象。
+    """
+
+    def __init__(self, widget, interval=POLL_INTERVAL):
+        self.widget = widget
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        self._queue = queue.Queue()
+        self._poll()
+
+    def call_soon(self, callback, *args):
+        """安排 callback(*args) 在主线程中执行（可在任意线程调用）"""
+        self._queue.put((callback, args))
+
+    def _poll(self):
+        while True:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                self.logger.error(f"Error in dispatched callback: {e}")
+        try:
+            self.widget.after(self.interval, self._poll)
+        except tk.TclError:
+            # 窗口已销毁
+            pass
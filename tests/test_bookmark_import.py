@@ -0,0 +1,87 @@
+import io
+import threading
+
+import pytest
+
+from src.controllers.bookmarks_controller import BookmarksController
+from src.models.bookmark_import import detect_browser, read_csv_bookmarks
+from src.models.database import Database
+
+CSV = """分类,名称,URL,用户名,浏览器
+工作,"周报, 月报",https://a.example/?q=1,me,edge
+"工作","看板",https://b.example,,
+生活,缺少列,https://c.example
+"生活, 旅行","机票",https://d.example,,chrome
+工作,重复,https://a.example/?q=1,,edge
+"""
+
+
+@pytest.mark.parametrize('path, browser', [
+    (r'C:\Users\me\AppData\Local\Microsoft\Edge\User Data\Default\Bookmarks', 'edge'),
+    ('/home/me/edge/bookmarks.html', 'edge'),
+    (r'C:\Users\me\AppData\Local\Google\Chrome\User Data\Default\Bookmarks', 'chrome'),
+    (r'D:\knowledge\hedge\ledger\bookmarks.html', 'chrome'),
+    ('edge_bookmarks.csv', 'chrome'),
+])
+def test_detect_browser_matches_whole_path_components(path, browser):
+    assert detect_browser(path) == browser
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "workspace.db"))
+    yield db
+    db.close()
+
+
+def test_csv_fields_with_quoted_commas():
+    bookmarks = list(read_csv_bookmarks(io.StringIO(CSV)))
+
+    assert bookmarks[0] == {'category': "工作", 'name': "周报, 月报",
+                            'url': "https://a.example/?q=1", 'username': "me",
+                            'browser': "edge"}
+    assert bookmarks[1]['browser'] == 'chrome'
+    assert bookmarks[2] is None
+    assert bookmarks[3]['category'] == "生活, 旅行"
+    assert len(bookmarks) == 5
+
+
+def test_import_csv_file(db, tmp_path):
+    path = tmp_path / "bookmarks.csv"
+    path.write_text(CSV, encoding='utf-8-sig')
+    controller = BookmarksController(db)
+
+    result = controller.import_bookmarks_file(str(path), chunk_size=2).future.result(5)
+
+    assert (result.rows, result.imported, result.skipped, result.invalid) == (5, 3, 1, 1)
+    assert not result.cancelled and result.fraction == 1.0
+    categories = {category.name: category.id for category in controller.get_categories()}
+    assert set(categories) == {"工作", "生活, 旅行"}
+    names = [bookmark['name'] for bookmark in controller.get_bookmarks(categories["工作"])]
+    assert names == ["周报, 月报", "看板"]
+
+
+def test_cancelled_import_keeps_committed_chunks(db, tmp_path):
+    path = tmp_path / "bookmarks.csv"
+    path.write_text("".join(f"分类,书签{i},https://{i}.example,,\n" for i in range(10)),
+                    encoding='utf-8')
+    controller = BookmarksController(db)
+    progress = []
+    jobs = []
+    started = threading.Event()
+
+    def on_progress(update):
+        # 进度回调在导入线程中执行（未设置调度函数），第一块提交后取消
+        progress.append(update)
+        started.wait(5)
+        jobs[0].cancel()
+
+    jobs.append(controller.import_bookmarks_file(
+        str(path), on_progress=on_progress, chunk_size=3))
+    started.set()
+    result = jobs[0].future.result(5)
+
+    assert result.cancelled
+    assert len(progress) == 1
+    assert (result.rows, result.imported) == (3, 3)
+    assert len(controller.get_bookmarks()) == 3
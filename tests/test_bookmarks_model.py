@@ -0,0 +1,87 @@
+import logging
+
+import pytest
+
+from src.models.bookmarks_model import BookmarksModel, DuplicateBookmarkError
+from src.models.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "workspace.db"))
+    yield db
+    db.close()
+
+
+def _bookmarks(db, category_id):
+    with db.reader() as conn:
+        return [(row['url'], row['order_index']) for row in conn.execute('''
+            SELECT url, order_index FROM bookmarks WHERE category_id = ? ORDER BY order_index
+        ''', (category_id,))]
+
+
+def test_batch_add_counts_and_keeps_order_index_continuous(db):
+    model = BookmarksModel(db)
+    work = model.add_category("工作")
+    home = model.add_category("生活")
+    model.add_bookmark(work, "已有", "https://a.example", "Chrome")
+
+    rows = [
+        {'category_id': work, 'name': "A", 'url': "https://a.example", 'browser': "Chrome"},
+        {'category_id': work, 'name': "B", 'url': "https://b.example", 'browser': "Edge"},
+        {'category_id': home, 'name': "A", 'url': "https://a.example", 'browser': "Chrome"},
+        {'category_id': work, 'name': "B2", 'url': "https://b.example", 'browser': "Edge"},
+        {'category_id': work, 'name': "C", 'url': "https://c.example", 'browser': "Chrome",
+         'username': "me"},
+        {'category_id': home, 'name': "D", 'url': "https://d.example", 'browser': "Chrome"},
+    ]
+
+    assert model.batch_add_bookmarks(rows) == (4, 2)
+    assert model.batch_add_bookmarks([]) == (0, 0)
+
+    # 跳过的书签不占用顺序号
+    assert _bookmarks(db, work) == [
+        ("https://a.example", 1), ("https://b.example", 2), ("https://c.example", 3)]
+    assert _bookmarks(db, home) == [("https://a.example", 1), ("https://d.example", 2)]
+
+
+def test_duplicate_url_in_category_raises_readable_error(db):
+    model = BookmarksModel(db)
+    work = model.add_category("工作")
+    home = model.add_category("生活")
+    model.add_bookmark(work, "A", "https://a.example", "Chrome")
+    other = model.add_bookmark(work, "B", "https://b.example", "Chrome")
+    # 不同分类可以有相同网址
+    model.add_bookmark(home, "A", "https://a.example", "Chrome")
+
+    with pytest.raises(DuplicateBookmarkError, match="该分类下已存在相同的网址"):
+        model.add_bookmark(work, "A2", "https://a.example", "Edge")
+    with pytest.raises(DuplicateBookmarkError):
+        model.update_bookmark(other, "B", "https://a.example", "Chrome")
+    assert _bookmarks(db, work) == [("https://a.example", 1), ("https://b.example", 2)]
+
+
+def test_url_index_migration_logs_removed_duplicates(tmp_path, caplog):
+    path = str(tmp_path / "workspace.db")
+    db = Database(path)
+    category = BookmarksModel(db).add_category("工作")
+    db.conn.execute("DROP INDEX idx_bookmarks_category_url")
+    db.conn.executemany('''
+        INSERT INTO bookmarks (id, category_id, name, url, browser, order_index)
+        VALUES (?, ?, ?, ?, 'Chrome', ?)
+    ''', [(1, category, "A", "https://a.example", 1),
+          (2, category, "B", "https://b.example", 2),
+          (3, category, "A2", "https://a.example", 3),
+          (4, category, "A3", "https://a.example", 4)])
+    db.conn.execute("PRAGMA user_version = 5")
+    db.conn.commit()
+    db.close()
+
+    with caplog.at_level(logging.INFO, logger="src.models.migrations"):
+        db = Database(path)
+    try:
+        assert "Removing 2 duplicate bookmarks" in caplog.text
+        assert "ids [3, 4]" in caplog.text
+        assert _bookmarks(db, category) == [("https://a.example", 1), ("https://b.example", 2)]
+    finally:
+        db.close()
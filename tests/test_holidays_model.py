@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+from src.models.database import Database
+from src.models.holidays_model import HolidaysModel
+from src.models.work_calendar import WorkCalendar
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "workspace.db"))
+    yield db
+    db.close()
+
+
+def test_get_month_is_read_only(db):
+    holidays = HolidaysModel.for_db(db).get_month(2025, 10)
+    with pytest.raises(TypeError):
+        holidays[date(2025, 10, 1)] = False
+
+
+def test_cache_updated_after_commit(db):
+    model = HolidaysModel.for_db(db)
+    calendar = WorkCalendar.for_db(db)
+    assert model.get_month(2025, 10) == {}
+    assert calendar.is_workday(date(2025, 10, 1))
+
+    db.writes.submit(model.upsert, date(2025, 10, 1), "国庆节", False).result()
+
+    assert model.get_month(2025, 10) == {date(2025, 10, 1): False}
+    assert not calendar.is_workday(date(2025, 10, 1))
+
+
+def test_rolled_back_write_leaves_no_trace_in_cache(db):
+    model = HolidaysModel.for_db(db)
+    calendar = WorkCalendar.for_db(db)
+    model.get_month(2025, 10)
+
+    def upsert_then_fail():
+        model.upsert(date(2025, 10, 1), "国庆节", False)
+        raise RuntimeError("fail after upsert")
+
+    with pytest.raises(RuntimeError):
+        db.writes.submit(upsert_then_fail).result()
+
+    assert model.get_month(2025, 10) == {}
+    assert calendar.is_workday(date(2025, 10, 1))
@@ -0,0 +1,122 @@
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.models.database import Database
+from src.models.tasks_model import TasksModel
+from src.models.bookmarks_model import BookmarksModel
+from src.models.holidays_model import HolidaysModel
+
+ROWS = 100_000
+
+# 整表扫描 "SCAN pending_tasks"，或沿索引扫描 "SCAN pending_tasks USING INDEX ..."
+_SCAN = re.compile(r'^SCAN (\w+)( USING (COVERING )?INDEX \w+)?$')
+
+
+def _populate(db, rows):
+    """写入 rows 条任务和书签测试数据，其中一半任务已完成并归档"""
+    today = datetime.now()
+    cursor = db.conn.cursor()
+
+    tasks = []
+    for i in range(rows):
+        created = today - timedelta(minutes=i * 7)
+        due = (today + timedelta(days=i % 900 - 300)).strftime('%Y-%m-%d')
+        if i % 2:
+            tasks.append((f"任务{i}", due, 'completed', created.strftime('%Y-%m-%d %H:%M:%S'),
+                          (created + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')))
+        else:
+            tasks.append((f"任务{i}", due, 'pending', created.strftime('%Y-%m-%d %H:%M:%S'), None))
+    cursor.executemany('''
+        INSERT INTO pending_tasks (name, due_date, status, created_at, completed_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''', tasks)
+    cursor.execute('''
+        INSERT INTO tasks_archive (id, name, due_date, status, created_at, completed_at, archive_month)
+        SELECT id + ?, name, due_date, status, created_at, completed_at, substr(completed_at, 1, 7)
+        FROM pending_tasks
+        WHERE status = 'completed'
+    ''', (rows,))
+
+    cursor.executemany('''
+        INSERT INTO categories (name, order_index) VALUES (?, ?)
+    ''', [(f"分类{i}", i) for i in range(1, 101)])
+    cursor.executemany('''
+        INSERT INTO bookmarks (category_id, name, url, browser, order_index)
+        VALUES (?, ?, ?, 'chrome', ?)
+    ''', [(i % 100 + 1, f"书签{i}", f"https://example.com/{i}", i // 100 + 1)
+          for i in range(rows)])
+    db.conn.commit()
+
+
+def _next_page(model_page, *args):
+    def run(model):
+        page = model_page(model)(*args, page_size=50)
+        model_page(model)(*args, page.next_token, page_size=50)
+    return run
+
+
+# 界面上频繁调用的模型查询
+HOT_QUERIES = {
+    'tasks page': lambda db: _next_page(lambda m: m.get_tasks_page, False)(TasksModel(db)),
+    'completed tasks page': lambda db: _next_page(lambda m: m.get_tasks_page, True)(TasksModel(db)),
+    'completed tasks': lambda db: TasksModel(db).get_tasks(include_completed=True),
+    'task': lambda db: TasksModel(db).get_task(1),
+    'today new tasks count': lambda db: TasksModel(db).get_today_new_tasks_count(),
+    'pending tasks count': lambda db: TasksModel(db).get_pending_tasks_count(),
+    'due buckets': lambda db: TasksModel(db).get_due_buckets(),
+    'bookmarks': lambda db: BookmarksModel(db).get_bookmarks(1),
+    'bookmarks page': lambda db: _next_page(lambda m: m.get_bookmarks_page, 1)(BookmarksModel(db)),
+    'holiday range': lambda db: HolidaysModel(db).get_range(
+        date.today().replace(day=1), date.today().replace(day=1) + timedelta(days=42)),
+}
+
+
+@pytest.fixture(scope='module')
+def db():
+    db = Database(':memory:')
+    _populate(db, ROWS)
+    yield db
+    db.close()
+
+
+# 允许的扫描步骤（查询名 -> 正则）：只读取部分索引，或沿索引顺序读到 LIMIT 即停止；
+# 不在此列出的查询不允许任何扫描
+EXPECTED_SCANS = {
+    # 第一页沿截止日期索引读取，LIMIT 截断
+    'tasks page': [r'SCAN pending_tasks USING INDEX idx_pending_tasks_due'],
+    # 待办表和归档表各沿完成时间索引倒序读取，合并后 LIMIT 截断
+    'completed tasks page': [r'SCAN pending_tasks USING INDEX idx_completed_tasks',
+                             r'SCAN tasks_archive USING INDEX idx_tasks_archive_completed'],
+    'completed tasks': [r'SCAN pending_tasks USING INDEX idx_completed_tasks',
+                        r'SCAN tasks_archive USING INDEX idx_tasks_archive_completed'],
+    # 计数只读取只含未完成任务的部分索引
+    'pending tasks count': [r'SCAN pending_tasks USING (COVERING )?INDEX idx_pending_tasks_\w+'],
+    # 到期提醒需要读取全部未完成任务（部分索引），再按主键查找日历表
+    'due buckets': [r'SCAN pending_tasks USING INDEX idx_pending_tasks_due'],
+}
+
+
+def _unexpected_scans(name, plan):
+    """执行计划中不在 EXPECTED_SCANS 中的扫描步骤"""
+    allowed = [re.compile(pattern + '$') for pattern in EXPECTED_SCANS.get(name, ())]
+    return [step for step in plan
+            if _SCAN.match(step) and not any(pattern.match(step) for pattern in allowed)]
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_hot_query_uses_indexes(db, name):
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    try:
+        HOT_QUERIES[name](db)
+    finally:
+        db.conn.set_trace_callback(None)
+
+    selects = [sql for sql in dict.fromkeys(statements)
+               if sql.lstrip().upper().startswith('SELECT')]
+    assert selects
+    for sql in selects:
+        plan = [row['detail'] for row in db.conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        assert not _unexpected_scans(name, plan), f"{' '.join(sql.split())}\n{plan}"
@@ -0,0 +1,86 @@
+import threading
+
+from src.models.read_executor import ReadExecutor
+
+
+def _blocker():
+    started = threading.Event()
+    release = threading.Event()
+
+    def run(value):
+        started.set()
+        release.wait(5)
+        return value
+    return run, started, release
+
+
+def test_newer_request_supersedes_older_with_same_key():
+    reads = ReadExecutor(max_workers=1)
+    try:
+        results = []
+        done = threading.Event()
+        run, started, release = _blocker()
+
+        running = reads.submit(run, "running", key="list", on_done=results.append)
+        started.wait(5)
+        queued = reads.submit(str, "queued", key="list", on_done=results.append)
+        latest = reads.submit(str, "latest", key="list",
+                              on_done=lambda value: (results.append(value), done.set()))
+        release.set()
+
+        assert done.wait(5)
+        # 已在执行的旧请求正常结束但不回调，排队中的旧请求被取消
+        assert running.result(5) == "running"
+        assert queued.cancelled()
+        assert latest.result(5) == "latest"
+        assert results == ["latest"]
+    finally:
+        reads.close()
+
+
+def test_different_keys_do_not_interfere():
+    reads = ReadExecutor(max_workers=2)
+    try:
+        results = {}
+        done = {key: threading.Event() for key in ("tasks", "bookmarks")}
+
+        def on_done(key):
+            def deliver(value):
+                results[key] = value
+                done[key].set()
+            return deliver
+
+        reads.submit(str, "tasks", key="tasks", on_done=on_done("tasks"))
+        reads.submit(str, "bookmarks", key="bookmarks", on_done=on_done("bookmarks"))
+
+        assert all(event.wait(5) for event in done.values())
+        assert results == {"tasks": "tasks", "bookmarks": "bookmarks"}
+    finally:
+        reads.close()
+
+
+def test_stale_result_dropped_when_superseded_while_dispatching():
+    reads = ReadExecutor(max_workers=1)
+    try:
+        pending = []
+        reads.set_dispatcher(lambda callback, item: pending.append((callback, item)))
+        results = []
+
+        def wait_for(count):
+            for _ in range(500):
+                if len(pending) >= count:
+                    return
+                threading.Event().wait(0.01)
+            raise AssertionError("callback was not dispatched")
+
+        reads.submit(str, "first", key="list", on_done=results.append)
+        wait_for(1)
+        reads.submit(str, "second", key="list", on_done=results.append)
+        wait_for(2)
+
+        # 界面线程稍后才处理回调：第一个结果排队期间已被替代
+        for callback, item in pending:
+            callback(item)
+        assert results == ["second"]
+    finally:
+        reads.close()
@@ -0,0 +1,36 @@
+import sqlite3
+
+import pytest
+
+from src.models.records import Holiday, Task
+
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(':memory:')
+    yield conn.cursor()
+    conn.close()
+
+
+def test_integer_index_follows_query_column_order(cursor):
+    cursor.row_factory = Task.row_factory
+    task = cursor.execute("SELECT 'Report' AS name, 7 AS id, '2026-01-05' AS due_date").fetchone()
+
+    assert (task[0], task[1], task[2]) == ('Report', 7, '2026-01-05')
+    assert task.keys() == ['name', 'id', 'due_date']
+    assert task['id'] == 7 and task.status is None
+    assert task.due_day == 739621
+
+
+def test_unknown_column_is_rejected(cursor):
+    cursor.row_factory = Holiday.row_factory
+    with pytest.raises(ValueError, match="Holiday has no field 'status'"):
+        cursor.execute("SELECT '2026-01-01' AS date, 'x' AS status").fetchone()
+
+
+def test_constructed_record_indexes_all_fields():
+    holiday = Holiday(date='2026-01-01', name='元旦', is_workday=0)
+
+    assert holiday[0] == '2026-01-01'
+    assert holiday.keys() == ['date', 'name', 'is_workday', 'day']
+    assert holiday['day'] == holiday.day == 739617
@@ -0,0 +1,230 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.controllers import tasks_controller
+from src.models.database import Database
+from src.models.tasks_model import DUE_BUCKETS, TasksModel
+
+# (日期, 是否调休上班)：春节、国庆、元旦及其调休
+HOLIDAYS = {
+    **{date(2025, 1, 28) + timedelta(days=i): False for i in range(8)},
+    date(2025, 1, 26): True,
+    date(2025, 2, 8): True,
+    **{date(2025, 10, 1) + timedelta(days=i): False for i in range(8)},
+    date(2025, 9, 28): True,
+    date(2025, 10, 11): True,
+    date(2026, 1, 1): False,
+    date(2026, 1, 2): False,
+    date(2026, 1, 4): True,
+}
+
+
+def _all_pages(model, include_completed, page_size):
+    rows, token = [], None
+    while True:
+        page = model.get_tasks_page(include_completed, token, page_size=page_size)
+        rows.extend(page.rows)
+        token = page.next_token
+        if token is None:
+            return rows
+
+
+def test_completed_pages_include_tasks_without_completed_at(tmp_path):
+    db = Database(str(tmp_path / "workspace.db"))
+    try:
+        db.conn.executemany('''
+            INSERT INTO pending_tasks (id, name, due_date, status, completed_at)
+            VALUES (?, ?, '2026-01-01', 'completed', ?)
+        ''', [(i, f"任务{i}", None if i % 3 == 0 else f"2026-01-{i % 28 + 1:02d} 10:00:00")
+              for i in range(1, 31)])
+        db.conn.execute('''
+            INSERT INTO tasks_archive (id, name, due_date, status, completed_at, archive_month)
+            VALUES (100, '归档', '2025-01-01', 'completed', '2025-01-05 10:00:00', '2025-01')
+        ''')
+        db.conn.commit()
+
+        rows = _all_pages(TasksModel(db), True, page_size=4)
+
+        ids = [task.id for task in rows]
+        assert sorted(ids) == list(range(1, 31)) + [100]
+        assert len(ids) == len(set(ids))
+        dated = [(task.completed_at, task.id) for task in rows if task.completed_at]
+        assert dated == sorted(dated, reverse=True)
+        # completed_at 为 NULL 的任务排在最后，按 id 降序
+        assert ids[-10:] == list(range(30, 0, -3))
+    finally:
+        db.close()
+
+
+def test_pending_pages_follow_due_date_order(tmp_path):
+    db = Database(str(tmp_path / "workspace.db"))
+    try:
+        db.conn.executemany('''
+            INSERT INTO pending_tasks (name, due_date, status) VALUES (?, ?, 'pending')
+        ''', [(f"任务{i}", f"2026-{i % 12 + 1:02d}-01") for i in range(50)])
+        db.conn.commit()
+
+        rows = _all_pages(TasksModel(db), False, page_size=7)
+
+        keys = [(task.due_date, task.id) for task in rows]
+        assert len(keys) == 50
+        assert keys == sorted(keys)
+    finally:
+        db.close()
+
+
+def _is_workday(day):
+    return HOLIDAYS.get(day, day.weekday() < 5)
+
+
+def _workday_before(day):
+    day -= timedelta(days=1)
+    while not _is_workday(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def _expected_bucket(today, due, importance):
+    """按逐日判断的规则计算提醒分类"""
+    days_left = (due - today).days
+    if importance == '紧急':
+        # 截止日期为节假日或节假日后第一个工作日：节假日前最后两个工作日内完成
+        if not _is_workday(due) or not _is_workday(due - timedelta(days=1)):
+            last = _workday_before(due)
+            if today <= _workday_before(last) or today == last:
+                return "需要今天完成"
+        if days_left in (0, 1):
+            return "需要今天完成"
+        if days_left <= 2:
+            return "后天到期"
+        return None
+    if days_left == 0:
+        return "今天到期"
+    if days_left == 1:
+        return "明天到期"
+    if days_left == 2 and _is_workday(due):
+        return "后天到期"
+    return None
+
+
+@pytest.fixture(scope="module")
+def due_db(tmp_path_factory):
+    db = Database(str(tmp_path_factory.mktemp("due") / "workspace.db"))
+    db.conn.executemany(
+        "INSERT INTO holidays (date, name, is_workday) VALUES (?, '测试', ?)",
+        [(day.isoformat(), int(is_workday)) for day, is_workday in HOLIDAYS.items()])
+    first = date(2025, 1, 15)
+    db.conn.executemany('''
+        INSERT INTO pending_tasks (name, due_date, status, importance)
+        VALUES (?, ?, 'pending', ?)
+    ''', [(f"{importance}{i}", (first + timedelta(days=i)).isoformat(), importance)
+          for i in range(375) for importance in ('普通', '紧急')])
+    db.conn.execute('''
+        INSERT INTO pending_tasks (name, due_date, status, completed_at, importance)
+        VALUES ('已完成', '2025-10-09', 'completed', '2025-09-30 10:00:00', '紧急')
+    ''')
+    db.conn.commit()
+    yield db
+    db.close()
+
+
+def _days(start, end):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+@pytest.mark.parametrize("today", (
+    _days(date(2025, 1, 20), date(2025, 2, 10))      # 春节及前后的调休
+    + _days(date(2025, 9, 22), date(2025, 10, 13))   # 国庆及前后的调休
+    + _days(date(2025, 12, 24), date(2026, 1, 6))    # 跨年
+))
+def test_due_buckets_follow_rules(due_db, today):
+    buckets = TasksModel(due_db).get_due_buckets(today)
+
+    assert tuple(buckets) == DUE_BUCKETS
+    actual = {task['name']: bucket for bucket, tasks in buckets.items() for task in tasks}
+    with due_db.reader() as conn:
+        tasks = conn.execute('''
+            SELECT name, due_date, importance FROM pending_tasks WHERE status != 'completed'
+        ''').fetchall()
+    expected = {}
+    for task in tasks:
+        bucket = _expected_bucket(today, date.fromisoformat(task['due_date']), task['importance'])
+        if bucket is not None:
+            expected[task['name']] = bucket
+    assert actual == expected
+
+
+def test_due_buckets_examples(due_db):
+    model = TasksModel(due_db)
+
+    def names(buckets, bucket, prefix):
+        return {task['name'] for task in buckets[bucket] if task['name'].startswith(prefix)}
+
+    # 任务名中的序号为截止日期距 2025-01-15 的天数：257 为 9-29，259 为 10-01
+    buckets = model.get_due_buckets(date(2025, 9, 29))
+    # 国庆前最后两个工作日内需完成截止在假期内和假期后第一天的紧急任务
+    urgent = names(buckets, "需要今天完成", '紧急')
+    assert {'紧急259', '紧急266', '紧急267'} <= urgent    # 10-01、10-08、10-09
+    assert '紧急268' not in urgent                         # 10-10 前一天不是节假日
+    # 普通任务后天（10-01）为节假日时不提醒
+    assert names(buckets, "后天到期", '普通') == set()
+
+    # 周日调休上班
+    buckets = model.get_due_buckets(date(2025, 9, 28))
+    assert names(buckets, "今天到期", '普通') == {'普通256'}
+    assert names(buckets, "明天到期", '普通') == {'普通257'}
+    assert names(buckets, "后天到期", '普通') == {'普通258'}
+    # 已完成的任务不提醒
+    assert all(task['name'] != '已完成' for tasks in buckets.values() for task in tasks)
+
+
+def test_cleanup_archives_completed_tasks_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(tasks_controller, 'ARCHIVE_BATCH_SIZE', 5)
+    db = Database(str(tmp_path / "workspace.db"))
+    try:
+        recent = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        db.conn.executemany('''
+            INSERT INTO pending_tasks (id, name, due_date, status, completed_at)
+            VALUES (?, ?, '2025-01-01', ?, ?)
+        ''', [(i, f"旧任务{i}", 'completed', f"2025-0{i % 3 + 1}-10 09:00:00") for i in range(1, 24)]
+             + [(i, f"新任务{i}", 'completed', recent) for i in range(24, 27)]
+             + [(i, f"待办{i}", 'pending', None) for i in range(27, 30)])
+        db.conn.commit()
+        controller = tasks_controller.TasksController(db)
+        batches = []
+        archive = controller.model.archive_completed_tasks
+
+        def record(cutoff, batch_size):
+            moved = archive(cutoff, batch_size)
+            batches.append(moved)
+            return moved
+        monkeypatch.setattr(controller.model, 'archive_completed_tasks', record)
+
+        assert controller.cleanup_completed_tasks().result(5) == 23
+        assert batches == [5, 5, 5, 5, 3]
+
+        with db.reader() as conn:
+            pending = [row[0] for row in conn.execute("SELECT id FROM pending_tasks ORDER BY id")]
+            archived = conn.execute('''
+                SELECT id, completed_at, archive_month FROM tasks_archive ORDER BY id
+            ''').fetchall()
+        assert pending == list(range(24, 30))
+        assert [row['id'] for row in archived] == list(range(1, 24))
+        assert all(row['archive_month'] == row['completed_at'][:7] for row in archived)
+
+        # 归档的任务仍出现在已办列表中，可以查看和恢复
+        model = TasksModel(db)
+        assert {task.id for task in _all_pages(model, True, page_size=4)} == set(range(1, 27))
+        assert model.get_task(7).name == "旧任务7"
+        model.restore_task(7)
+        assert model.get_task(7).status == 'pending'
+        with db.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM tasks_archive WHERE id = 7").fetchone()[0] == 0
+
+        # 再次清理没有可移动的任务
+        batches.clear()
+        assert controller.cleanup_completed_tasks().result(5) == 0
+        assert batches == [0]
+    finally:
+        db.close()
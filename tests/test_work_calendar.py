@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src.models.database import Database
+from src.models.work_calendar import WorkCalendar
+
+# (日期, 是否调休上班)：跨年的元旦、春节、国庆及其调休
+HOLIDAYS = {
+    date(2025, 1, 1): False,
+    date(2025, 1, 26): True,
+    **{date(2025, 1, 28) + timedelta(days=i): False for i in range(8)},
+    date(2025, 2, 8): True,
+    date(2025, 9, 28): True,
+    **{date(2025, 10, 1) + timedelta(days=i): False for i in range(8)},
+    date(2025, 10, 11): True,
+    date(2026, 1, 1): False,
+    date(2026, 1, 2): False,
+    date(2026, 1, 4): True,
+}
+
+STARTS = [
+    date(2024, 12, 27),  # 跨年前的周五
+    date(2024, 12, 31),
+    date(2025, 1, 1),    # 节假日
+    date(2025, 1, 26),   # 周日调休上班
+    date(2025, 1, 28),   # 春节第一天
+    date(2025, 2, 4),    # 春节最后一天
+    date(2025, 9, 28),   # 国庆前的调休上班日
+    date(2025, 10, 5),   # 国庆期间的周日
+    date(2025, 10, 11),  # 国庆后的周六调休
+    date(2025, 12, 31),
+    date(2026, 1, 3),    # 元旦后的周六
+    date(2026, 1, 4),    # 周日调休上班
+]
+
+OFFSETS = [1, 2, 3, 5, 8, 22, 260, 400]
+
+
+def _is_workday(day):
+    return HOLIDAYS.get(day, day.weekday() < 5)
+
+
+def _walk(day, n):
+    """逐日走到之后（n 为负数时之前）的第 |n| 个工作日"""
+    step = timedelta(days=1 if n > 0 else -1)
+    for _ in range(abs(n)):
+        day += step
+        while not _is_workday(day):
+            day += step
+    return day
+
+
+def _count(start, end):
+    """逐日统计 [start, end) 中的工作日数，end 早于 start 时为负数"""
+    if end < start:
+        return -_count(end, start)
+    return sum(_is_workday(start + timedelta(days=i)) for i in range((end - start).days))
+
+
+@pytest.fixture(scope="module")
+def calendar(tmp_path_factory):
+    db = Database(str(tmp_path_factory.mktemp("calendar") / "workspace.db"))
+    db.conn.executemany(
+        "INSERT INTO holidays (date, name, is_workday) VALUES (?, '测试', ?)",
+        [(day.isoformat(), int(is_workday)) for day, is_workday in HOLIDAYS.items()])
+    db.conn.commit()
+    yield WorkCalendar.for_db(db)
+    db.close()
+
+
+@pytest.mark.parametrize("day", STARTS)
+def test_is_workday(calendar, day):
+    for i in range(-10, 11):
+        current = day + timedelta(days=i)
+        assert calendar.is_workday(current) == _is_workday(current), current
+
+
+@pytest.mark.parametrize("day", STARTS)
+@pytest.mark.parametrize("n", OFFSETS)
+def test_nth_workday_before(calendar, day, n):
+    assert calendar.nth_workday_before(day, n) == _walk(day, -n)
+
+
+def test_nth_workday_before_rejects_non_positive(calendar):
+    with pytest.raises(ValueError):
+        calendar.nth_workday_before(date(2025, 1, 1), 0)
+
+
+@pytest.mark.parametrize("day", STARTS)
+@pytest.mark.parametrize("n", [0] + OFFSETS + [-n for n in OFFSETS])
+def test_add_workdays(calendar, day, n):
+    assert calendar.add_workdays(day, n) == _walk(day, n)
+
+
+@pytest.mark.parametrize("start", STARTS)
+@pytest.mark.parametrize("end", STARTS + [date(2023, 6, 1), date(2027, 3, 1)])
+def test_workdays_between(calendar, start, end):
+    assert calendar.workdays_between(start, end) == _count(start, end)
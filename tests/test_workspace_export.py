@@ -0,0 +1,106 @@
+from src.models.database import Database
+from src.models.workspace_export import export_workspace, restore_workspace
+
+
+def _open(path):
+    return Database(str(path))
+
+
+def test_restore_merges_same_name_category_instead_of_deleting_it(tmp_path):
+    db = _open(tmp_path / "workspace.db")
+    try:
+        db.conn.execute("INSERT INTO categories (id, name, order_index) VALUES (1, '工作', 1)")
+        db.conn.execute('''
+            INSERT INTO bookmarks (id, category_id, name, url, browser, order_index)
+            VALUES (1, 1, 'A', 'https://a.example', 'chrome', 1)
+        ''')
+        db.conn.commit()
+        export_workspace(db, tmp_path / "export")
+
+        # 导出后删除分类，再以不同的 id 新建同名分类和其中的书签
+        db.conn.execute("DELETE FROM bookmarks")
+        db.conn.execute("DELETE FROM categories")
+        db.conn.execute("INSERT INTO categories (id, name, order_index) VALUES (7, '工作', 1)")
+        db.conn.execute('''
+            INSERT INTO bookmarks (id, category_id, name, url, browser, order_index)
+            VALUES (9, 7, 'B', 'https://b.example', 'chrome', 1)
+        ''')
+        db.conn.commit()
+
+        results = restore_workspace(db, tmp_path / "export")
+
+        categories = [tuple(row) for row in db.conn.execute("SELECT id, name FROM categories")]
+        assert categories == [(7, '工作')]
+        bookmarks = [tuple(row) for row in db.conn.execute(
+            "SELECT id, category_id, url FROM bookmarks ORDER BY id")]
+        assert bookmarks == [(1, 7, 'https://a.example'), (9, 7, 'https://b.example')]
+        assert results['categories'].skipped == 1
+        assert results['bookmarks'].restored == 1
+    finally:
+        db.close()
+
+
+def test_restore_skips_rows_conflicting_on_other_unique_keys(tmp_path):
+    db = _open(tmp_path / "workspace.db")
+    try:
+        db.conn.execute("INSERT INTO file_shortcuts (id, name, file_path) VALUES (1, '报表', 'C:/a.xlsx')")
+        db.conn.execute("INSERT INTO holidays (id, date, name, is_workday) VALUES (1, '2026-10-01', '国庆节', 0)")
+        db.conn.commit()
+        export_workspace(db, tmp_path / "export", fmt='csv')
+
+        db.conn.execute("DELETE FROM file_shortcuts")
+        db.conn.execute("DELETE FROM holidays")
+        db.conn.execute("INSERT INTO file_shortcuts (id, name, file_path) VALUES (5, '本地', 'C:/a.xlsx')")
+        db.conn.execute("INSERT INTO holidays (id, date, name, is_workday) VALUES (5, '2026-10-01', '调休', 1)")
+        db.conn.commit()
+
+        results = restore_workspace(db, tmp_path / "export")
+
+        assert [tuple(row) for row in db.conn.execute("SELECT id, name FROM file_shortcuts")] == [(5, '本地')]
+        assert [tuple(row) for row in db.conn.execute("SELECT id, name FROM holidays")] == [(5, '调休')]
+        assert results['file_shortcuts'] == (0, 1)
+        assert results['holidays'] == (0, 1)
+    finally:
+        db.close()
+
+
+def test_restore_updates_rows_with_the_same_id(tmp_path):
+    db = _open(tmp_path / "workspace.db")
+    try:
+        db.conn.execute("INSERT INTO categories (id, name, order_index) VALUES (1, '工作', 1)")
+        db.conn.commit()
+        export_workspace(db, tmp_path / "export", compress=True)
+        db.conn.execute("UPDATE categories SET name = '改名', order_index = 3 WHERE id = 1")
+        db.conn.execute("INSERT INTO categories (id, name, order_index) VALUES (2, '其他', 2)")
+        db.conn.commit()
+
+        restore_workspace(db, tmp_path / "export")
+
+        assert [tuple(row) for row in db.conn.execute(
+            "SELECT id, name, order_index FROM categories ORDER BY id")] == [(1, '工作', 1), (2, '其他', 2)]
+    finally:
+        db.close()
+
+
+def test_csv_round_trip_keeps_empty_strings_distinct_from_null(tmp_path):
+    db = _open(tmp_path / "workspace.db")
+    try:
+        db.conn.execute("INSERT INTO categories (id, name, order_index) VALUES (1, '工作', 1)")
+        db.conn.executemany('''
+            INSERT INTO bookmarks (id, category_id, name, url, browser, username, order_index)
+            VALUES (?, 1, ?, ?, 'chrome', ?, ?)
+        ''', [(1, '', 'https://a.example', None, 1),
+              (2, '\\N', 'https://b.example', '', 2),
+              (3, '\\\\N', 'https://c.example', 'me', 3)])
+        db.conn.commit()
+        export_workspace(db, tmp_path / "export", fmt='csv')
+        db.conn.execute("UPDATE bookmarks SET name = 'x', username = 'x'")
+        db.conn.commit()
+
+        restore_workspace(db, tmp_path / "export")
+
+        assert [tuple(row) for row in db.conn.execute(
+            "SELECT name, username FROM bookmarks ORDER BY id")] == [
+            ('', None), ('\\N', ''), ('\\\\N', 'me')]
+    finally:
+        db.close()
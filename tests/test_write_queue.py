@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src.models.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "workspace.db"))
+    yield db
+    db.close()
+
+
+def _add_file(db, name):
+    with db.transaction():
+        db.conn.execute(
+            "INSERT INTO file_shortcuts (name, file_path) VALUES (?, ?)", (name, f"C:/{name}"))
+
+
+def _file_names(db):
+    with db.reader() as conn:
+        return [row[0] for row in conn.execute("SELECT name FROM file_shortcuts ORDER BY id")]
+
+
+def _hold_writer(db):
+    """让写线程等待，之后提交的写操作合并到同一批中"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def wait():
+        started.set()
+        release.wait(5)
+    db.writes.submit(wait)
+    started.wait(5)
+    return release
+
+
+def _committed_names(db):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT name FROM file_shortcuts ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_failed_command_rolls_back_only_itself(db):
+    release = _hold_writer(db)
+    seen = []
+
+    def add_then_fail():
+        _add_file(db, "b")
+        # 与前一个写操作在同一个尚未提交的事务中
+        seen.append((_file_names(db), _committed_names(db)))
+        raise RuntimeError("fail after insert")
+
+    first = db.writes.submit(_add_file, db, "a")
+    failed = db.writes.submit(add_then_fail)
+    last = db.writes.submit(_add_file, db, "c")
+    release.set()
+
+    first.result(5)
+    last.result(5)
+    with pytest.raises(RuntimeError):
+        failed.result(5)
+    assert seen == [(["a", "b"], [])]
+    assert _file_names(db) == ["a", "c"]
+
+
+def test_close_drains_queued_writes(db):
+    release = _hold_writer(db)
+    futures = [db.writes.submit(_add_file, db, f"file{i}") for i in range(100)]
+    release.set()
+
+    db.writes.close()
+
+    assert all(future.done() and future.exception() is None for future in futures)
+    assert len(_file_names(db)) == 100
+    with pytest.raises(RuntimeError):
+        db.writes.submit(_add_file, db, "late")
+
+
+def test_callbacks_run_after_commit(db):
+    seen = []
+    done = threading.Event()
+
+    def on_done(_):
+        seen.append(_file_names(db))
+        done.set()
+
+    db.writes.submit(_add_file, db, "a", on_done=on_done)
+    assert done.wait(5)
+    assert seen == [["a"]]
+
+
+def test_nested_transaction_commits_at_outermost_scope(db):
+    with db.transaction() as outer:
+        _add_file(db, "a")
+        with pytest.raises(RuntimeError):
+            with db.transaction() as inner:
+                _add_file(db, "b")
+                raise RuntimeError("inner scope fails")
+        _add_file(db, "c")
+        # 内层的提交延后到最外层
+        assert _committed_names(db) == []
+        assert not outer.nested and inner.nested
+    assert _committed_names(db) == ["a", "c"]
+
+
+def test_failed_outermost_transaction_rolls_back_everything(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            _add_file(db, "a")
+            _add_file(db, "b")
+            raise RuntimeError("outer scope fails")
+    assert _committed_names(db) == []
+    assert not db.conn.in_transaction